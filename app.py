@@ -8,6 +8,7 @@ Author: Pratyush Srivastava
 Email: pratyushsrivastava500@gmail.com
 """
 
+import logging
 import sys
 from pathlib import Path
 
@@ -16,11 +17,12 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from src.gui import AttendanceSystemGUI
-from config.config import ensure_directories
+from config.config import ensure_directories, LOG_LEVEL, LOG_FORMAT
 
 
 def main():
     """Main entry point for the application."""
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
     # Ensure all necessary directories exist
     ensure_directories()
     
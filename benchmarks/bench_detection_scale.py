@@ -0,0 +1,93 @@
+"""
+Benchmark: face detection speed and recall at several detection scales.
+
+Frames are read from a recording of the kiosk camera (or a live camera)
+and detected once at full resolution without size hints, which serves as
+the reference. Each configuration is then timed on the same frames, and
+its recall is the share of reference faces it finds with an IoU of at
+least 0.5 after its boxes are mapped back to full resolution.
+
+Usage:
+    python benchmarks/bench_detection_scale.py --source kiosk.mp4 --frames 300 --threads 1
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+from config.config import KIOSK_DISTANCE_RANGE
+from src.detection import FaceDetector, kiosk_face_size_range
+from src.tracking import box_iou
+
+
+def read_frames(source, count):
+    """Read up to count grayscale frames from a camera index or video file."""
+    cam = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cam.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cam.release()
+    return frames
+
+
+def run(detector, frames):
+    """Detect faces in every frame, returning (boxes per frame, frames per second)."""
+    start = time.perf_counter()
+    boxes = [detector.detect(gray) for gray in frames]
+    elapsed = time.perf_counter() - start
+    return boxes, len(frames) / elapsed
+
+
+def recall(reference, boxes):
+    """Share of reference boxes matched by a box with IoU >= 0.5."""
+    total = sum(len(faces) for faces in reference)
+    found = sum(
+        1
+        for ref_faces, faces in zip(reference, boxes)
+        for ref in ref_faces
+        if any(box_iou(tuple(ref), tuple(box)) >= 0.5 for box in faces)
+    )
+    return found / total if total else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--source', default='0', help="Video file or camera index")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=1,
+                        help="OpenCV threads, 1 approximates a low-power kiosk CPU")
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.75, 0.5, 0.35])
+    args = parser.parse_args()
+    
+    cv2.setNumThreads(args.threads)
+    frames = read_frames(args.source, args.frames)
+    if not frames:
+        print(f"Could not read frames from {args.source}")
+        return
+    height, width = frames[0].shape
+    
+    reference, reference_fps = run(FaceDetector(1.0, None, 1.2, 5), frames)
+    faces = sum(len(f) for f in reference)
+    min_size, max_size = kiosk_face_size_range(width)
+    print(f"{len(frames)} frames of {width}x{height}, {faces} reference faces, "
+          f"{args.threads} thread(s)")
+    print(f"kiosk range {KIOSK_DISTANCE_RANGE} m -> faces of {min_size}-{max_size} px")
+    print(f"{'scale':>6} {'size hints':>10} {'fps':>8} {'speedup':>8} {'recall':>7}")
+    for scale in args.scales:
+        for hints in (None, KIOSK_DISTANCE_RANGE):
+            boxes, fps = run(FaceDetector(scale, hints, 1.2, 5), frames)
+            print(f"{scale:6.2f} {'on' if hints else 'off':>10} {fps:8.1f} "
+                  f"{fps / reference_fps:7.1f}x {recall(reference, boxes):7.1%}")
+
+
+if __name__ == "__main__":
+    main()
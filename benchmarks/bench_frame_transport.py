@@ -0,0 +1,109 @@
+"""
+Benchmark: multiprocessing.Queue vs the shared-memory frame ring.
+
+A producer process sends synthetic camera frames to the main process,
+either pickled through a multiprocessing.Queue or written into a FrameRing
+with only slot indexes sent through the queue. The consumer converts each
+frame to grayscale, as the detection stage does, and the benchmark reports
+frames per second and the mean producer-to-consumer latency.
+
+Usage:
+    python benchmarks/bench_frame_transport.py --frames 2000 --width 640 --height 480
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from src.frame_transport import FrameRing
+
+
+def queue_producer(frames, shape, out, ready):
+    """Send pickled frames through the queue."""
+    frame = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    ready.wait()
+    for _ in range(frames):
+        out.put((time.perf_counter(), frame))
+    out.put(None)
+
+
+def ring_producer(frames, spec, out, free, ready):
+    """Write frames into free ring slots and send only the slot index."""
+    ring = FrameRing.attach(spec)
+    frame = np.random.default_rng(0).integers(0, 256, spec['shape'], dtype=np.uint8)
+    ready.wait()
+    for _ in range(frames):
+        slot = free.get()
+        ring.slot(slot)[:] = frame
+        out.put((time.perf_counter(), slot))
+    out.put(None)
+    ring.close()
+
+
+def consume(out, release=None, ring=None):
+    """Receive frames until the end marker, returning (fps, mean latency)."""
+    count, latency = 0, 0.0
+    start = time.perf_counter()
+    while True:
+        message = out.get()
+        if message is None:
+            break
+        sent, payload = message
+        frame = payload if ring is None else ring.slot(payload)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        latency += time.perf_counter() - sent
+        if release is not None:
+            release.put(payload)
+        count += 1
+    elapsed = time.perf_counter() - start
+    return count / elapsed, latency / max(count, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--slots', type=int, default=12)
+    args = parser.parse_args()
+    
+    ctx = mp.get_context('spawn')
+    shape = (args.height, args.width, 3)
+    
+    out, ready = ctx.Queue(maxsize=args.slots), ctx.Event()
+    producer = ctx.Process(target=queue_producer, args=(args.frames, shape, out, ready))
+    producer.start()
+    ready.set()
+    queue_fps, queue_latency = consume(out)
+    producer.join()
+    
+    ring = FrameRing.create(shape, args.slots)
+    out, free, ready = ctx.Queue(), ctx.Queue(), ctx.Event()
+    for slot in range(args.slots):
+        free.put(slot)
+    producer = ctx.Process(target=ring_producer,
+                           args=(args.frames, ring.spec, out, free, ready))
+    producer.start()
+    ready.set()
+    ring_fps, ring_latency = consume(out, free, ring)
+    producer.join()
+    ring.unlink()
+    
+    print(f"frames: {args.frames} x {args.width}x{args.height}x3 "
+          f"({np.prod(shape) / 1e6:.2f} MB each)")
+    print(f"multiprocessing.Queue: {queue_fps:8.1f} frames/s, "
+          f"latency {queue_latency * 1e3:6.2f} ms")
+    print(f"shared memory ring:    {ring_fps:8.1f} frames/s, "
+          f"latency {ring_latency * 1e3:6.2f} ms ({ring_fps / queue_fps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: OpenCV LBPH predict vs the vectorized NumPy matcher.
+
+Builds a synthetic gallery (or uses a trained model with --model), then times
+recognizer.predict, LBPHMatcher.predict and LBPHMatcher.predict_batch on the
+same query faces and checks that both paths return the same labels.
+
+Usage:
+    python benchmarks/bench_lbph_matcher.py --labels 50 --per-label 100
+    python benchmarks/bench_lbph_matcher.py --model TrainingImageLabel/Trainner.yml
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from src.recognition import LBPHMatcher
+
+
+def synthetic_faces(num_labels: int, per_label: int, size: int, seed: int):
+    """Generate noisy variations of smooth random textures, one per label."""
+    rng = np.random.default_rng(seed)
+    bases = [
+        cv2.normalize(
+            cv2.GaussianBlur(rng.integers(0, 256, (size, size), dtype=np.uint8), (0, 0), 4),
+            None, 0, 255, cv2.NORM_MINMAX
+        )
+        for _ in range(num_labels)
+    ]
+    
+    def variant(base):
+        noise = rng.integers(-8, 9, base.shape)
+        return np.clip(base.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    
+    faces, labels = [], []
+    for label, base in enumerate(bases, start=1):
+        for _ in range(per_label):
+            faces.append(variant(base))
+            labels.append(label)
+    return bases, faces, labels, variant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', help='Existing LBPH model (Trainner.yml) to benchmark')
+    parser.add_argument('--labels', type=int, default=50)
+    parser.add_argument('--per-label', type=int, default=100)
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    rng = np.random.default_rng(args.seed + 1)
+    if args.model:
+        recognizer.read(args.model)
+        queries = [
+            rng.integers(0, 256, (args.size, args.size), dtype=np.uint8)
+            for _ in range(args.queries)
+        ]
+    else:
+        bases, faces, labels, variant = synthetic_faces(
+            args.labels, args.per_label, args.size, args.seed
+        )
+        start = time.perf_counter()
+        recognizer.train(faces, np.array(labels))
+        print(f"train: {len(faces)} images in {time.perf_counter() - start:.2f}s")
+        queries = [variant(bases[i % len(bases)]) for i in range(args.queries)]
+    
+    start = time.perf_counter()
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    export_time = time.perf_counter() - start
+    print(f"gallery: {len(matcher)} histograms x {matcher.histograms.shape[1]} bins "
+          f"({matcher.histograms.nbytes / 1e6:.1f} MB), export {export_time:.2f}s")
+    
+    start = time.perf_counter()
+    expected = [recognizer.predict(face) for face in queries]
+    opencv_time = (time.perf_counter() - start) / len(queries)
+    
+    start = time.perf_counter()
+    single = [matcher.predict(face) for face in queries]
+    single_time = (time.perf_counter() - start) / len(queries)
+    
+    start = time.perf_counter()
+    batch = matcher.predict_batch(queries)
+    batch_time = (time.perf_counter() - start) / len(queries)
+    
+    agree = sum(
+        e[0] == s[0] == b[0] and abs(e[1] - s[1]) < 1e-3
+        for e, s, b in zip(expected, single, batch)
+    )
+    print(f"opencv predict:        {opencv_time * 1e3:8.2f} ms/face")
+    print(f"matcher predict:       {single_time * 1e3:8.2f} ms/face "
+          f"({opencv_time / single_time:.1f}x)")
+    print(f"matcher predict_batch: {batch_time * 1e3:8.2f} ms/face "
+          f"({opencv_time / batch_time:.1f}x)")
+    print(f"agreement: {agree}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: YAML model vs the binary .npz model format.
+
+Trains a synthetic LBPH model (or uses a trained model with --model), saves
+it in both formats and compares file size and load time. The YAML load is
+timed both on its own and including the export to a matcher, which is what
+the attendance tracker needs.
+
+Usage:
+    python benchmarks/bench_model_format.py --labels 50 --per-label 100
+    python benchmarks/bench_model_format.py --model TrainingImageLabel/Trainner.yml
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from src.model_store import load_model, save_model
+from src.recognition import LBPHMatcher
+from bench_lbph_matcher import synthetic_faces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', help='Existing LBPH model (Trainner.yml) to convert')
+    parser.add_argument('--labels', type=int, default=50)
+    parser.add_argument('--per-label', type=int, default=100)
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = args.model or os.path.join(tmp, 'model.yml')
+        npz_path = os.path.join(tmp, 'model.npz')
+        
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        if args.model:
+            recognizer.read(yaml_path)
+        else:
+            _, faces, labels, _ = synthetic_faces(
+                args.labels, args.per_label, args.size, args.seed
+            )
+            recognizer.train(faces, np.array(labels))
+            start = time.perf_counter()
+            recognizer.save(yaml_path)
+            print(f"yaml save: {time.perf_counter() - start:.2f}s")
+        
+        matcher = LBPHMatcher.from_recognizer(recognizer)
+        start = time.perf_counter()
+        save_model(npz_path, matcher)
+        print(f"npz save:  {time.perf_counter() - start:.2f}s")
+        
+        start = time.perf_counter()
+        loaded = cv2.face.LBPHFaceRecognizer_create()
+        loaded.read(yaml_path)
+        yaml_time = time.perf_counter() - start
+        LBPHMatcher.from_recognizer(loaded)
+        export_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        binary = load_model(npz_path)
+        npz_time = time.perf_counter() - start
+        
+        same = (np.array_equal(binary.labels, matcher.labels)
+                and np.allclose(binary.histograms, matcher.histograms, equal_nan=True))
+        yaml_size = os.path.getsize(yaml_path)
+        npz_size = os.path.getsize(npz_path)
+        print(f"histograms: {len(matcher)}")
+        print(f"yaml: {yaml_size / 1e6:8.1f} MB, load {yaml_time:6.2f}s, "
+              f"load + export {export_time:6.2f}s")
+        print(f"npz:  {npz_size / 1e6:8.1f} MB, load {npz_time:6.2f}s "
+              f"({export_time / npz_time:.0f}x faster, {yaml_size / npz_size:.1f}x smaller)")
+        print(f"identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
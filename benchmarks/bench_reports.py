@@ -0,0 +1,92 @@
+"""
+Benchmark: attendance reports from the bitmap cache vs rescanning daily CSVs.
+
+Writes a synthetic term of daily attendance files, then computes every
+student's attendance percentage for the whole term by reading all files
+with the csv module, as a reporting script would. The same report is then
+timed from the attendance cache: the first build, loading it again, an
+incremental refresh after one more day is written, and the query itself.
+
+Usage:
+    python benchmarks/bench_reports.py --students 500 --days 180
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.reports import AttendanceCache
+from src.storage import CSVStorage
+from bench_storage import synthetic_term
+
+
+def rescan_report(directory):
+    """Attendance percentage per student from reading every daily CSV."""
+    attended, days = Counter(), 0
+    for path in Path(directory).glob('Attendance_*.csv'):
+        with open(path, 'r', newline='') as csvFile:
+            reader = csv.reader(csvFile)
+            next(reader, None)
+            ids = {row[0] for row in reader if row}
+        if ids:
+            days += 1
+            attended.update(ids)
+    return {student_id: count * 100.0 / days for student_id, count in attended.items()}
+
+
+def timed(function):
+    """Run a function, returning (result, milliseconds)."""
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--presence', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    term = synthetic_term(args.students, args.days + 1, args.presence, args.seed)
+    dates = list(term)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = CSVStorage(os.path.join(tmp, 'students.csv'), tmp, durable=False)
+        for date in dates[:-1]:
+            storage.add_attendance(date, term[date])
+        cache_path = os.path.join(tmp, 'cache.npz')
+        first, last = dates[0], dates[-1]
+        
+        expected, rescan_ms = timed(lambda: rescan_report(tmp))
+        cache = AttendanceCache(storage, cache_path)
+        _, build_ms = timed(cache.refresh)
+        cache, load_ms = timed(lambda: AttendanceCache(storage, cache_path))
+        _, unchanged_ms = timed(cache.refresh)
+        storage.add_attendance(last, term[last])
+        _, refresh_ms = timed(cache.refresh)
+        (_, summary), query_ms = timed(lambda: cache.student_summary(first, dates[-2]))
+        
+        # The cache covers one more day now, so compare against the term without it
+        mismatches = sum(abs(expected.get(s, 0.0) - p) > 1e-9 for s, _, _, p in summary)
+        print(f"{args.students} students, {args.days} daily files, "
+              f"cache {os.path.getsize(cache_path) / 1e3:.0f} KB")
+        print(f"rescan all CSVs:       {rescan_ms:8.1f} ms")
+        print(f"cache first build:     {build_ms:8.1f} ms")
+        print(f"cache load:            {load_ms:8.1f} ms")
+        print(f"refresh, no new days:  {unchanged_ms:8.1f} ms")
+        print(f"refresh, one new day:  {refresh_ms:8.1f} ms")
+        print(f"term report query:     {query_ms:8.2f} ms ({mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    main()
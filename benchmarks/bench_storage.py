@@ -0,0 +1,118 @@
+"""
+Benchmark: CSV vs SQLite storage, attendance insert rate and range queries.
+
+Generates a synthetic term of attendance (every student present on most
+days) and writes it to both backends, first one row per commit as a
+tracker marks students, then in batches as the attendance writer groups
+them. It then times a query over a range of days for the whole class and
+a query for one student over the whole term.
+
+Usage:
+    python benchmarks/bench_storage.py --students 500 --days 180 --batch 16
+    python benchmarks/bench_storage.py --no-fsync
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+from config.config import DATE_FORMAT
+from src.storage import CSVStorage, SQLiteStorage
+
+
+def synthetic_term(students, days, presence, seed):
+    """Attendance rows grouped by day, as {DD-MM-YYYY: [row, ...]}."""
+    rng = np.random.default_rng(seed)
+    first = datetime.date(2025, 1, 1)
+    term = {}
+    for day in range(days):
+        date = (first + datetime.timedelta(days=day)).strftime(DATE_FORMAT)
+        present = np.flatnonzero(rng.random(students) < presence)
+        term[date] = [
+            [str(1000 + i), '', f"Student {i}", '', date, '', f"09:{i // 60 % 60:02d}:{i % 60:02d}"]
+            for i in present
+        ]
+    return term
+
+
+def insert(storage, term, batch):
+    """Write the term in batches of rows, returning rows per second."""
+    start = time.perf_counter()
+    rows = 0
+    for date, records in term.items():
+        for i in range(0, len(records), batch):
+            rows += len(storage.add_attendance(date, records[i:i + batch]))
+    return rows / (time.perf_counter() - start)
+
+
+def query_ms(query, repeat):
+    """Median latency of a query in milliseconds, with its result size."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = query()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e3, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--presence', type=float, default=0.9)
+    parser.add_argument('--batch', type=int, default=16,
+                        help="Rows per commit in the batched run (ATTENDANCE_COMMIT_RECORDS)")
+    parser.add_argument('--single-days', type=int, default=5,
+                        help="Days written one row per commit (slow with fsync)")
+    parser.add_argument('--range-days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-fsync', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    durable = not args.no_fsync
+    term = synthetic_term(args.students, args.days, args.presence, args.seed)
+    total = sum(len(records) for records in term.values())
+    dates = list(term)
+    print(f"{args.students} students, {args.days} days, {total} attendance rows, "
+          f"fsync {'on' if durable else 'off'}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            'csv': lambda name: CSVStorage(os.path.join(tmp, name, 'students.csv'),
+                                           os.path.join(tmp, name), durable),
+            'sqlite': lambda name: SQLiteStorage(os.path.join(tmp, name, 'attendance.db'),
+                                                 durable)
+        }
+        single = {date: term[date] for date in dates[:args.single_days]}
+        
+        print(f"{'backend':<8} {'1 row/commit':>14} {f'{args.batch} rows/commit':>16} "
+              f"{f'{args.range_days}-day range':>16} {'1 student, term':>16}")
+        for name, open_backend in backends.items():
+            with open_backend(name + '-single') as storage:
+                single_rate = insert(storage, single, 1)
+            with open_backend(name) as storage:
+                batch_rate = insert(storage, term, args.batch)
+                start, end = dates[len(dates) // 2], dates[min(len(dates) - 1,
+                                                              len(dates) // 2 + args.range_days - 1)]
+                range_ms, range_rows = query_ms(
+                    lambda: storage.attendance_between(start, end), args.repeat
+                )
+                student_ms, student_rows = query_ms(
+                    lambda: storage.attendance_between(dates[0], dates[-1], '1000'), args.repeat
+                )
+            print(f"{name:<8} {single_rate:10.0f} r/s {batch_rate:12.0f} r/s "
+                  f"{range_ms:10.1f} ms ({range_rows}) {student_ms:8.1f} ms ({student_rows})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Evaluation: recognition accuracy of captured samples with and without the filter.
+
+Simulates a capture session per student: a synthetic face that changes pose
+every few frames, with sensor noise and occasional motion blur. Without the
+filter, capture keeps the first NUM_TRAINING_IMAGES crops like the original
+loop. With the filter, capture runs like FaceCapture.capture_images: blurry
+and near-duplicate crops are skipped until NUM_TRAINING_IMAGES are kept or
+CAPTURE_MAX_FRAMES frames were read. An LBPH model is trained on each sample
+set and tested on unseen poses of every student.
+
+Usage:
+    python benchmarks/eval_capture_filter.py
+    python benchmarks/eval_capture_filter.py --students 20 --distance 3 --sharpness 40
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from config.config import (
+    NUM_TRAINING_IMAGES, CAPTURE_MAX_FRAMES,
+    CAPTURE_DUPLICATE_DISTANCE, CAPTURE_MIN_SHARPNESS
+)
+from src.sample_filter import SampleFilter
+
+
+def synthetic_face(seed: int, size: int = 200) -> np.ndarray:
+    """Draw a face with eyes, brows, nose and mouth over an identity texture."""
+    rng = np.random.default_rng(seed)
+    img = np.full((size, size), 90, np.uint8)
+    c = size // 2
+    cv2.ellipse(img, (c, c), (int(size * .33), int(size * .42)), 0, 0, 360, 200, -1)
+    eye_y, eye_x = int(c - size * .1), int(size * .13)
+    for side in (-1, 1):
+        x = c + side * eye_x
+        cv2.ellipse(img, (x, eye_y), (int(size * .07), int(size * .035)), 0, 0, 360, 40, -1)
+        cv2.line(img, (x - int(size * .08), eye_y - int(size * .08)),
+                 (x + int(size * .08), eye_y - int(size * .08)), 60, max(1, size // 50))
+    cv2.line(img, (c, eye_y + 10), (c - 5, c + int(size * .1)), 140, 2)
+    cv2.ellipse(img, (c, c + int(size * .2)), (int(size * .12), int(size * .04)),
+                0, 0, 360, 70, -1)
+    noise = rng.normal(0, 6 + seed % 5, img.shape)
+    texture = cv2.GaussianBlur(rng.integers(0, 60, (size, size)).astype(np.float32), (0, 0), 6)
+    return np.clip(img + noise + texture - 30, 0, 255).astype(np.uint8)
+
+
+def random_pose(rng: np.random.Generator) -> np.ndarray:
+    """Roll in degrees, relative scale, x and y shift, and brightness gain."""
+    return np.array([rng.uniform(-12, 12), rng.uniform(-.1, .1),
+                     rng.uniform(-8, 8), rng.uniform(-8, 8), rng.uniform(.8, 1.2)])
+
+
+def render(face: np.ndarray, pose: np.ndarray, rng: np.random.Generator,
+           blur: int = 0) -> np.ndarray:
+    """Render a face in a pose with sensor noise and optional horizontal motion blur."""
+    size = face.shape[0]
+    matrix = cv2.getRotationMatrix2D((size / 2, size / 2), pose[0], 1 + pose[1])
+    matrix[:, 2] += pose[2:4]
+    img = cv2.warpAffine(face.astype(np.float32), matrix, (size, size),
+                         borderMode=cv2.BORDER_REFLECT) * pose[4]
+    img += rng.normal(0, 2, img.shape)
+    if blur:
+        img = cv2.filter2D(img, -1, np.full((1, blur), 1.0 / blur))
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def capture_session(face: np.ndarray, rng: np.random.Generator, frames: int,
+                    pose_frames: int, blur_rate: float, blur: int):
+    """Yield the crops of a capture session, moving to a new pose every pose_frames."""
+    for i in range(frames):
+        if i % pose_frames == 0:
+            pose = random_pose(rng)
+        yield render(face, pose, rng, blur if rng.random() < blur_rate else 0)
+
+
+def collect(face, rng, args, sample_filter=None):
+    """Collect training samples the way the capture loop does."""
+    frames = CAPTURE_MAX_FRAMES if sample_filter is not None else NUM_TRAINING_IMAGES
+    samples, read = [], 0
+    for crop in capture_session(face, rng, frames, args.pose_frames, args.blur_rate, args.blur):
+        read += 1
+        if sample_filter is None or sample_filter.accept(crop)[0]:
+            samples.append(crop)
+        if len(samples) >= NUM_TRAINING_IMAGES:
+            break
+    return samples, read
+
+
+def evaluate(faces, tests, args, use_filter: bool):
+    """Train on captured samples and return (samples, frames read, accuracy)."""
+    rng = np.random.default_rng(args.seed + 1)
+    samples, labels, frames = [], [], 0
+    for label, face in enumerate(faces):
+        sample_filter = SampleFilter(args.distance, args.sharpness) if use_filter else None
+        kept, read = collect(face, rng, args, sample_filter)
+        samples.extend(kept)
+        labels.extend([label] * len(kept))
+        frames += read
+    
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(samples, np.array(labels))
+    correct = sum(recognizer.predict(crop)[0] == label for label, crop in tests)
+    return len(samples), frames, correct / len(tests)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=10)
+    parser.add_argument('--pose-frames', type=int, default=15,
+                        help='Frames the student holds each pose for')
+    parser.add_argument('--blur-rate', type=float, default=0.1,
+                        help='Share of frames with motion blur')
+    parser.add_argument('--blur', type=int, default=9, help='Motion blur length in pixels')
+    parser.add_argument('--queries', type=int, default=20, help='Test poses per student')
+    parser.add_argument('--distance', type=int, default=CAPTURE_DUPLICATE_DISTANCE)
+    parser.add_argument('--sharpness', type=float, default=CAPTURE_MIN_SHARPNESS)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    faces = [synthetic_face(seed) for seed in range(args.students)]
+    tests = [(label, render(face, random_pose(rng), rng))
+             for label, face in enumerate(faces) for _ in range(args.queries)]
+    
+    print(f"{args.students} students, {len(tests)} test crops, "
+          f"{NUM_TRAINING_IMAGES} samples wanted, at most {CAPTURE_MAX_FRAMES} frames")
+    for name, use_filter in (('every crop', False), ('filtered', True)):
+        samples, frames, accuracy = evaluate(faces, tests, args, use_filter)
+        print(f"{name:<12} {samples:>6} samples from {frames:>6} frames   "
+              f"accuracy {accuracy:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+"""
+Command line tools for the Face Recognition Attendance System.
+
+Maintenance tasks that do not need the Tkinter interface.
+
+Usage:
+    python cli.py migrate-images [--delete]
+    python cli.py convert-model
+    python cli.py prune-model --max-per-label K [--dry-run]
+    python cli.py track [--source 0 ...] [--duration SECONDS] [--events FILE]
+    python cli.py video RECORDING [...] [--start "DD-MM-YYYY HH:MM:SS"]
+    python cli.py enroll MANIFEST.csv [--no-train]
+    python cli.py import-csv [--database FILE]
+    python cli.py report --month MM-YYYY | --from DD-MM-YYYY --to DD-MM-YYYY
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from config.config import (
+    ensure_directories, TRAINING_IMAGE_DIR, TRAINER_FILE, TRAINER_BINARY_FILE,
+    CAMERA_SOURCES, VIDEO_CHUNK_SECONDS, VIDEO_FRAME_STEP, VIDEO_WORKERS,
+    ENROLL_WORKERS, GALLERY_MAX_PER_LABEL, LOG_LEVEL, LOG_FORMAT, DATABASE_FILE,
+    STUDENT_DETAILS_CSV, ATTENDANCE_DIR, STORAGE_BACKEND, DEFAULTER_THRESHOLD, MONTH_NAMES,
+    DATE_FORMAT
+)
+
+
+def migrate_images(args: argparse.Namespace) -> int:
+    """Convert loose training JPEGs into one pack file per student."""
+    from src.image_store import migrate_image_directory
+    from src.training import load_training_manifest, save_training_manifest
+    
+    manifest = load_training_manifest()
+    backup_dir = None if args.delete else str(TRAINING_IMAGE_DIR / 'legacy')
+    updated, packed = migrate_image_directory(
+        str(TRAINING_IMAGE_DIR), manifest, backup_dir=backup_dir
+    )
+    if manifest is not None:
+        save_training_manifest(updated)
+    
+    for pack_name, count in packed.items():
+        print(f"{pack_name}: {count} images packed")
+    print(f"Migrated {sum(packed.values())} images into {len(packed)} packs")
+    if backup_dir is not None and packed:
+        print(f"Original images moved to {backup_dir}")
+    return 0
+
+
+def convert_model(args: argparse.Namespace) -> int:
+    """Convert Trainner.yml to the binary Trainner.npz model format."""
+    from src.model_store import convert_yaml_model
+    
+    source = Path(args.source)
+    if not source.is_file():
+        print(f"Model not found: {source}")
+        return 1
+    
+    matcher = convert_yaml_model(str(source), args.output)
+    print(f"Converted {len(matcher)} histograms: "
+          f"{source.stat().st_size / 1e6:.1f} MB -> "
+          f"{Path(args.output).stat().st_size / 1e6:.1f} MB ({args.output})")
+    return 0
+
+
+def prune_model(args: argparse.Namespace) -> int:
+    """Keep a bounded, diverse set of samples per student in Trainner.npz."""
+    from src.gallery_pruning import evaluate_pruning, prune_gallery
+    from src.model_store import load_model, save_model
+    
+    if args.max_per_label <= 0:
+        print("--max-per-label must be positive")
+        return 1
+    model_path = Path(args.model)
+    if not model_path.is_file():
+        print(f"Model not found: {model_path} (run convert-model first)")
+        return 1
+    
+    matcher = load_model(str(model_path))
+    report = evaluate_pruning(matcher, args.max_per_label, holdout=args.holdout)
+    print(f"Held-out evaluation ({args.holdout:.0%} of each student's samples):")
+    for name, result in report.items():
+        print(f"  {name:<7} {result['samples']:>7} samples {result['size_mb']:8.1f} MB "
+              f"{result['latency_ms']:8.2f} ms/predict  accuracy {result['accuracy']:.1%}")
+    
+    pruned = prune_gallery(matcher, args.max_per_label)
+    print(f"Model: {len(matcher)} -> {len(pruned)} samples "
+          f"({matcher.gallery.nbytes / 1e6:.1f} MB -> {pruned.gallery.nbytes / 1e6:.1f} MB)")
+    if not args.dry_run and pruned is not matcher:
+        save_model(str(model_path), pruned)
+        print(f"Saved {model_path}")
+    return 0
+
+
+def track(args: argparse.Namespace) -> int:
+    """Track attendance without a window and stream recognition events."""
+    from src.attendance import AttendanceTracker
+    from src.attendance_log import AttendanceSink, AttendanceWriter
+    from src.multi_camera import MultiCameraTracker
+    from src.pipeline import format_stats
+    
+    sources = [int(s) if s.isdigit() else s for s in args.source] or CAMERA_SOURCES
+    events = sys.stdout if args.events == '-' else open(args.events, 'a')
+    
+    # Ctrl+C and SIGTERM stop tracking cleanly; marks are already on disk
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: stop.set())
+    if args.duration:
+        timer = threading.Timer(args.duration, stop.set)
+        timer.daemon = True
+        timer.start()
+    
+    def emit(source, label: int, attendance: list) -> None:
+        event = {
+            'event': 'recognized',
+            'source': source,
+            'id': attendance[0],
+            'name': attendance[2],
+            'date': attendance[4],
+            'time': attendance[6]
+        }
+        events.write(json.dumps(event) + "\n")
+        events.flush()
+    
+    try:
+        if len(sources) > 1:
+            tracker = MultiCameraTracker(sources)
+            success, message, records = tracker.start_tracking(
+                display=False, stop_signal=stop, on_recognized=emit
+            )
+        else:
+            tracker = AttendanceTracker()
+            
+            def recognized(label: int, attendance: list) -> None:
+                if sink.add(sources[0], label, attendance):
+                    emit(sources[0], label, attendance)
+            
+            with AttendanceWriter() as writer:
+                sink = AttendanceSink(writer=writer)
+                opened = tracker.track(sources[0], recognized, display=False, stop=stop)
+            if not opened:
+                print(f"Error: Could not access camera {sources[0]}", file=sys.stderr)
+                return 1
+            print(f"{tracker.capture_stats['frames_read']} frames read, "
+                  f"{tracker.capture_stats['frames_dropped']} dropped by the reader",
+                  file=sys.stderr)
+            print(format_stats(tracker.pipeline_stats), file=sys.stderr)
+            success = bool(sink.records)
+            message = f"{len(sink.records)} students recorded"
+    finally:
+        if events is not sys.stdout:
+            events.close()
+    
+    print(message, file=sys.stderr)
+    return 0 if success else 1
+
+
+def process_videos(args: argparse.Namespace) -> int:
+    """Mark attendance from recorded session videos."""
+    from src.video_batch import VideoAttendanceProcessor
+    
+    start_times = None
+    if args.start:
+        if len(args.videos) > 1:
+            print("--start can only be used with a single video")
+            return 1
+        start = datetime.datetime.strptime(args.start, '%d-%m-%Y %H:%M:%S')
+        start_times = {args.videos[0]: start.timestamp()}
+    
+    processor = VideoAttendanceProcessor(args.workers, args.chunk_seconds, args.frame_step)
+    success, message, records = processor.process(
+        args.videos, start_times, save=not args.dry_run
+    )
+    for record in records:
+        print(f"{record[0]:>10}  {record[2]:<30} {record[4]} {record[6]}")
+    
+    stats = processor.stats
+    print(f"{message}: {stats['video_seconds']:.0f}s of video in "
+          f"{stats['elapsed_seconds']:.1f}s ({stats['speedup']:.1f}x real time, "
+          f"{stats['chunks']} chunks, {stats['frames_processed']} frames processed)")
+    return 0
+
+
+def enroll(args: argparse.Namespace) -> int:
+    """Enroll the students listed in a manifest."""
+    from src.enrollment import BulkEnrollment, read_manifest
+    
+    entries, errors = read_manifest(args.manifest)
+    for error in errors:
+        print(error)
+    if not entries:
+        print("No valid students in the manifest")
+        return 1
+    
+    success, message, saved = BulkEnrollment(args.workers).enroll(
+        entries, train=not args.no_train
+    )
+    for student_id, count in saved.items():
+        print(f"{student_id}: {count} face images")
+    print(message)
+    return 0 if success else 1
+
+
+def import_csv(args: argparse.Namespace) -> int:
+    """Copy StudentDetails.csv and the per-day attendance CSVs into SQLite."""
+    from src.storage import SQLiteStorage
+    
+    with SQLiteStorage(args.database) as storage:
+        students, rows = storage.import_csv(args.students, args.attendance)
+    print(f"Imported {students} students and {rows} attendance rows into {args.database}")
+    if STORAGE_BACKEND != 'sqlite':
+        print("Set STORAGE_BACKEND = 'sqlite' in config/config.py to use the database")
+    return 0
+
+
+def report(args: argparse.Namespace) -> int:
+    """Print attendance percentages and defaulters for a month or range of days."""
+    from src.reports import AttendanceCache, month_range
+    from src.utils import get_month_name
+    
+    try:
+        if args.month:
+            month, year = args.month.split('-')
+            start, end = month_range(month, year)
+            title = f"{get_month_name(month.zfill(2), MONTH_NAMES)} {year}"
+        elif args.start and args.end:
+            start, end = args.start, args.end
+            datetime.datetime.strptime(start, DATE_FORMAT)
+            datetime.datetime.strptime(end, DATE_FORMAT)
+            title = f"{start} to {end}"
+        else:
+            print("Give --month MM-YYYY or both --from and --to")
+            return 1
+    except ValueError:
+        print("Dates must be given as MM-YYYY or DD-MM-YYYY")
+        return 1
+    
+    with AttendanceCache() as cache:
+        cache.refresh()
+        class_days, summary = cache.student_summary(start, end)
+        print(f"Attendance for {title}: {class_days} class days")
+        if args.days:
+            for date, count in cache.head_counts(start, end):
+                print(f"  {date}  {count:>5} present")
+        defaulters = cache.defaulters(start, end, args.threshold)
+    
+    print(f"{'ID':<12} {'Name':<24} {'Days':>5} {'Attendance':>10}")
+    for student_id, name, days, percentage in summary:
+        print(f"{student_id:<12} {name:<24} {days:>5} {percentage:9.1f}%")
+    print(f"{len(defaulters)} students below {args.threshold:.0f}%")
+    for student_id, name, days, percentage in defaulters:
+        print(f"  {student_id:<12} {name:<24} {percentage:5.1f}%")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser.
+    
+    Returns:
+        Argument parser with one sub-command per tool
+    """
+    parser = argparse.ArgumentParser(description="Face Recognition Attendance System tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    migrate = commands.add_parser(
+        'migrate-images', help="Pack loose training JPEGs into one file per student"
+    )
+    migrate.add_argument('--delete', action='store_true',
+                         help="Delete the JPEGs instead of moving them to TrainingImage/legacy")
+    migrate.set_defaults(handler=migrate_images)
+    
+    convert = commands.add_parser(
+        'convert-model', help="Convert Trainner.yml to the binary model format"
+    )
+    convert.add_argument('--source', default=str(TRAINER_FILE))
+    convert.add_argument('--output', default=str(TRAINER_BINARY_FILE))
+    convert.set_defaults(handler=convert_model)
+    
+    prune = commands.add_parser(
+        'prune-model', help="Keep at most K representative samples per student"
+    )
+    prune.add_argument('--max-per-label', type=int, default=GALLERY_MAX_PER_LABEL,
+                       help="Samples kept per student (default: GALLERY_MAX_PER_LABEL)")
+    prune.add_argument('--holdout', type=float, default=0.2,
+                       help="Share of samples held out for the accuracy report")
+    prune.add_argument('--model', default=str(TRAINER_BINARY_FILE))
+    prune.add_argument('--dry-run', action='store_true',
+                       help="Only report, do not rewrite the model")
+    prune.set_defaults(handler=prune_model)
+    
+    tracking = commands.add_parser(
+        'track', help="Track attendance without a window, streaming events as JSON lines"
+    )
+    tracking.add_argument('--source', action='append', default=[],
+                          help="Camera index or video file, repeat for several (default: CAMERA_SOURCES)")
+    tracking.add_argument('--duration', type=float,
+                          help="Stop after this many seconds (default: until Ctrl+C or SIGTERM)")
+    tracking.add_argument('--events', default='-',
+                          help="File to append recognition events to (default: stdout)")
+    tracking.set_defaults(handler=track)
+    
+    video = commands.add_parser(
+        'video', help="Mark attendance from recorded videos"
+    )
+    video.add_argument('videos', nargs='+', help="Video files")
+    video.add_argument('--start',
+                       help="Recording start as 'DD-MM-YYYY HH:MM:SS' "
+                            "(default: file modification time minus its length)")
+    video.add_argument('--workers', type=int, default=VIDEO_WORKERS)
+    video.add_argument('--chunk-seconds', type=float, default=VIDEO_CHUNK_SECONDS)
+    video.add_argument('--frame-step', type=int, default=VIDEO_FRAME_STEP,
+                       help="Process every Nth frame")
+    video.add_argument('--dry-run', action='store_true',
+                       help="Print the attendance without saving it")
+    video.set_defaults(handler=process_videos)
+    
+    enrollment = commands.add_parser(
+        'enroll', help="Register students in bulk from photo folders or videos"
+    )
+    enrollment.add_argument('manifest',
+                            help="CSV with id, name and source (photo folder or video) columns")
+    enrollment.add_argument('--workers', type=int, default=ENROLL_WORKERS)
+    enrollment.add_argument('--no-train', action='store_true',
+                            help="Only save the face images, train later from the GUI")
+    enrollment.set_defaults(handler=enroll)
+    
+    importer = commands.add_parser(
+        'import-csv', help="Import the student and attendance CSV files into SQLite"
+    )
+    importer.add_argument('--database', default=str(DATABASE_FILE))
+    importer.add_argument('--students', default=str(STUDENT_DETAILS_CSV))
+    importer.add_argument('--attendance', default=str(ATTENDANCE_DIR),
+                          help="Directory of the Attendance_<date>.csv files")
+    importer.set_defaults(handler=import_csv)
+    
+    reporting = commands.add_parser(
+        'report', help="Attendance percentages, head counts and defaulters"
+    )
+    reporting.add_argument('--month', help="Month as MM-YYYY")
+    reporting.add_argument('--from', dest='start', help="First day as DD-MM-YYYY")
+    reporting.add_argument('--to', dest='end', help="Last day as DD-MM-YYYY")
+    reporting.add_argument('--threshold', type=float, default=DEFAULTER_THRESHOLD,
+                           help="Attendance percentage below which students are listed")
+    reporting.add_argument('--days', action='store_true',
+                           help="Also print the head count of every class day")
+    reporting.set_defaults(handler=report)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    """Main entry point for the command line tools."""
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+    ensure_directories()
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
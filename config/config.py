@@ -21,14 +21,99 @@ HAARCASCADE_PATH = BASE_DIR / "haarcascade_frontalface_default.xml"
 # File Paths
 PASSWORD_FILE = TRAINING_LABEL_DIR / "psd.txt"
 TRAINER_FILE = TRAINING_LABEL_DIR / "Trainner.yml"
+TRAINER_BINARY_FILE = TRAINING_LABEL_DIR / "Trainner.npz"
+TRAINING_MANIFEST_FILE = TRAINING_LABEL_DIR / "TrainingManifest.json"
+GALLERY_DIR = TRAINING_LABEL_DIR / "Gallery"
 STUDENT_DETAILS_CSV = STUDENT_DETAILS_DIR / "StudentDetails.csv"
+DATABASE_FILE = BASE_DIR / "Attendance.db"
+ATTENDANCE_CACHE_FILE = ATTENDANCE_DIR / "AttendanceCache.npz"
 
 # Face Detection Parameters
 SCALE_FACTOR = 1.3
 MIN_NEIGHBORS = 5
+DETECTION_SCALE = 0.5  # Detect on a frame resized by this factor, boxes are mapped back
+KIOSK_DISTANCE_RANGE = (0.3, 1.5)  # Nearest and farthest face distance in metres, None for any size
+CAMERA_HFOV_DEGREES = 60.0  # Horizontal field of view used to turn distances into face sizes
+FACE_WIDTH_METERS = 0.16
 CONFIDENCE_THRESHOLD = 50
 NUM_TRAINING_IMAGES = 100
 CAMERA_INDEX = 0
+CAMERA_SOURCES = [CAMERA_INDEX]  # Cameras or video files tracked together, one process each
+
+# Capture Sample Filter
+CAPTURE_FILTER = True  # Skip blurry and near-duplicate crops until NUM_TRAINING_IMAGES are kept
+CAPTURE_DUPLICATE_DISTANCE = 3  # Max differing dHash bits (of 64) for a duplicate
+CAPTURE_MIN_SHARPNESS = 50.0  # Min Laplacian variance of a crop resized to CAPTURE_FILTER_SIZE
+CAPTURE_FILTER_SIZE = (100, 100)
+CAPTURE_MAX_FRAMES = 300  # Stop capturing after this many frames even if samples are missing
+
+# Camera Capture
+FRAME_BUFFER_SIZE = 2
+FRAME_READ_TIMEOUT = 2.0
+FRAME_TRANSPORT = 'thread'  # 'thread' or 'shared_memory' (separate capture process)
+FRAME_RING_SLOTS = 12  # Shared memory frame slots for the 'shared_memory' transport
+
+# Face Tracking Parameters
+DETECTION_INTERVAL = 5  # Run the full cascade every N frames (1 = every frame)
+TRACK_IOU_THRESHOLD = 0.3
+TRACK_MATCH_THRESHOLD = 0.6
+TRACK_SEARCH_MARGIN = 0.5
+TRACK_TEMPLATE_SIZE = 32
+RECOGNITION_VOTES = 3  # Confident predictions of the same student before a track is identified
+RECOGNITION_MAX_PREDICTIONS = 30  # Predictions per track before it stays Unknown until lost
+
+# Performance Governor
+TARGET_FPS = 15  # Frame rate held by adapting the detection settings below, 0 disables it
+GOVERNOR_WINDOW = 30  # Frames measured before each adjustment
+GOVERNOR_HEADROOM = 0.5  # Raise quality when frames take less than this share of the budget
+GOVERNOR_INTERVAL_RANGE = (1, 15)  # Bounds of the detection interval
+GOVERNOR_SCALE_RANGE = (0.3, 1.0)  # Bounds of the detection scale
+GOVERNOR_SCALE_FACTOR_RANGE = (1.1, 1.5)  # Bounds of the cascade scale factor
+
+# Attendance Log
+ATTENDANCE_COMMIT_RECORDS = 16  # Most rows written and synced to disk together
+ATTENDANCE_COMMIT_MS = 200  # Longest a recognized student waits before being written
+ATTENDANCE_FSYNC = True  # Sync every commit so marks survive a crash or power loss
+ATTENDANCE_LOCK_FILE = '.attendance.lock'  # Lock shared by processes appending to a day file
+
+# Storage
+STORAGE_BACKEND = 'csv'  # 'csv' (StudentDetails.csv and one CSV per day) or 'sqlite' (DATABASE_FILE)
+SQLITE_BUSY_TIMEOUT_MS = 5000  # How long a writer waits for another process holding the database
+STORAGE_IMPORT_BATCH = 5000  # Rows inserted per transaction when importing CSV files
+STUDENT_DETAILS_LOCK_FILE = '.students.lock'  # Lock shared by processes registering students
+
+# Attendance Reports
+DEFAULTER_THRESHOLD = 75.0  # Students below this attendance percentage are defaulters
+
+# Logging
+LOG_LEVEL = 'INFO'
+LOG_FORMAT = '%(asctime)s %(name)s: %(message)s'
+
+# Pipeline Parameters
+PIPELINE_QUEUE_SIZE = 2  # Items buffered between two stages
+PIPELINE_DROP_POLICY = 'drop_oldest'  # 'drop_oldest' or 'drop_newest' when a stage falls behind
+
+# Bulk Enrollment
+ENROLL_WORKERS = os.cpu_count() or 1
+
+# Offline Video Processing
+VIDEO_CHUNK_SECONDS = 60  # Length of the video pieces processed in parallel
+VIDEO_FRAME_STEP = 5  # Run detection on every Nth frame of a recording
+VIDEO_WORKERS = os.cpu_count() or 1
+
+# Face Recognition Parameters
+MODEL_FORMAT = 'binary'  # 'binary' (Trainner.npz) or 'yaml' (Trainner.yml)
+USE_VECTORIZED_MATCHER = True
+MATCHER_BLOCK_SIZE = 512  # Gallery images scored per NumPy block
+
+# Training Parameters
+TRAINING_STORE_FORMAT = 'packed'  # 'packed' (one file per student) or 'jpeg'
+TRAINING_LOAD_WORKERS = min(8, os.cpu_count() or 1)
+TRAINING_LOAD_CHUNK_SIZE = 256
+TRAIN_FROM_GALLERY = False  # Train from the memory-mapped gallery to bound RAM use
+GALLERY_FACE_SIZE = (100, 100)  # (width, height) of normalized gallery crops
+GALLERY_TRAIN_BATCH = 1000
+GALLERY_MAX_PER_LABEL = 0  # Keep at most this many samples per student in the binary model, 0 keeps all
 
 # UI Configuration
 WINDOW_TITLE = "Face Recognition Attendance System"
@@ -6,52 +6,93 @@ This module handles real-time face recognition and attendance marking.
 
 import cv2
 import os
-import csv
-import pandas as pd
-from typing import List, Tuple, Optional
+import logging
+from typing import Callable, List, Optional, Tuple, Union
+import numpy as np
 from config.config import (
-    HAARCASCADE_PATH, TRAINER_FILE, STUDENT_DETAILS_CSV,
-    ATTENDANCE_DIR, ATTENDANCE_COLUMNS, CONFIDENCE_THRESHOLD,
-    CAMERA_INDEX
-)
-from src.utils import (
-    assure_path_exists, get_current_timestamp,
-    format_date, format_time
+    TRAINER_FILE, TRAINER_BINARY_FILE, MODEL_FORMAT,
+    CONFIDENCE_THRESHOLD,
+    CAMERA_INDEX, DETECTION_INTERVAL, USE_VECTORIZED_MATCHER,
+    PIPELINE_QUEUE_SIZE, PIPELINE_DROP_POLICY, TARGET_FPS
 )
+from src.utils import get_current_timestamp, format_date, format_time
+from src.detection import FaceDetector
+from src.attendance_log import AttendanceSink, AttendanceWriter
+from src.frame_transport import open_frame_source
+from src.governor import PerformanceGovernor
+from src.tracking import Box, FaceTrack, FaceTracker
+from src.pipeline import Pipeline, format_stats
+from src.recognition import LBPHMatcher
+from src.model_store import load_model
+from src.storage import Storage, open_storage
+
+logger = logging.getLogger(__name__)
 
 
 class AttendanceTracker:
     """Class for tracking attendance using face recognition."""
     
-    def __init__(self):
-        """Initialize the attendance tracker."""
+    def __init__(self, detection_interval: int = DETECTION_INTERVAL,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 drop_policy: str = PIPELINE_DROP_POLICY,
+                 matcher: Optional[LBPHMatcher] = None,
+                 target_fps: float = TARGET_FPS):
+        """
+        Initialize the attendance tracker.
+        
+        Args:
+            detection_interval: Run the full face cascade every N frames and
+                follow faces with the tracker in between (1 = every frame)
+            queue_size: Frames buffered between two pipeline stages
+            drop_policy: 'drop_oldest' or 'drop_newest' when a stage falls behind
+            matcher: Already loaded model to use instead of the trained model file
+            target_fps: Frame rate the performance governor holds by adapting
+                the detection interval, scale and cascade scale factor, 0 to
+                keep them fixed
+        """
+        self.detection_interval = max(1, detection_interval)
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
         self.recognizer = cv2.face.LBPHFaceRecognizer_create()
-        self.face_cascade = None
-        self.student_df = None
+        self.detector = None
+        self.matcher = matcher
+        self.students = None
+        self.capture_stats = {}
+        self.pipeline_stats = {}
+        self.recognition_stats = {}
+        # Opened on first use and kept, so the CSV backend only reads what
+        # was appended to today's file since the last call
+        self._storage: Optional[Storage] = None
         self._load_models()
+        
+        # Settings the governor finds carry over to the next tracking session
+        self.governor = None
+        if target_fps:
+            self.governor = PerformanceGovernor(self.detector, self.detection_interval,
+                                                target_fps)
     
     def _load_models(self) -> None:
         """Load the trained model and student details."""
         # Load face cascade
-        if not os.path.isfile(str(HAARCASCADE_PATH)):
-            raise FileNotFoundError(
-                f"Haarcascade file not found at {HAARCASCADE_PATH}"
-            )
-        self.face_cascade = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
+        self.detector = FaceDetector(scale_factor=1.2, min_neighbors=5)
         
-        # Load trained model
-        if not os.path.isfile(str(TRAINER_FILE)):
+        # Load trained model, preferring the binary format
+        if self.matcher is not None:
+            pass
+        elif MODEL_FORMAT == 'binary' and os.path.isfile(str(TRAINER_BINARY_FILE)):
+            self.matcher = load_model(str(TRAINER_BINARY_FILE))
+        elif os.path.isfile(str(TRAINER_FILE)):
+            self.recognizer.read(str(TRAINER_FILE))
+            if USE_VECTORIZED_MATCHER:
+                self.matcher = LBPHMatcher.from_recognizer(self.recognizer)
+        else:
             raise FileNotFoundError(
                 "Trained model not found. Please train the model first!"
             )
-        self.recognizer.read(str(TRAINER_FILE))
         
         # Load student details
-        if not os.path.isfile(str(STUDENT_DETAILS_CSV)):
-            raise FileNotFoundError(
-                "Student details not found. Please register students first!"
-            )
-        self.student_df = pd.read_csv(str(STUDENT_DETAILS_CSV))
+        with open_storage() as storage:
+            self.students = storage.load_students()
     
     def start_tracking(self, update_callback=None) -> Tuple[bool, str, List]:
         """
@@ -63,106 +104,188 @@ class AttendanceTracker:
         Returns:
             Tuple of (success: bool, message: str, attendance_records: List)
         """
-        # Ensure attendance directory exists
-        assure_path_exists(str(ATTENDANCE_DIR))
+        # Every mark is written as it happens, not when tracking stops. The
+        # writer opens the storage backend and closes it when tracking ends.
+        writer = AttendanceWriter()
+        sink = AttendanceSink(update_callback, writer)
+        
+        def record(label: int, attendance: List) -> None:
+            sink.add(CAMERA_INDEX, label, attendance)
+        
+        try:
+            if not self.track(CAMERA_INDEX, record):
+                return False, "Error: Could not access camera", []
+        finally:
+            writer.close()
+            self.close()
+        logger.info("Pipeline stats:\n%s", format_stats(self.pipeline_stats))
+        
+        if sink.records:
+            return True, "Attendance recorded successfully", sink.records
+        else:
+            return False, "No faces recognized", []
+    
+    def track(self, source: Union[int, str] = CAMERA_INDEX,
+              on_recognized: Optional[Callable[[int, List], None]] = None,
+              display: bool = True, stop=None,
+              window_name: str = 'Taking Attendance') -> bool:
+        """
+        Recognize faces from a camera or video until stopped.
         
-        # Initialize camera
-        cam = cv2.VideoCapture(CAMERA_INDEX)
-        if not cam.isOpened():
-            return False, "Error: Could not access camera", []
+        Capture, detection, recognition and display run as separate
+        pipeline stages, so a slow recognition pass drops frames instead
+        of stalling the camera and the window.
+        
+        Args:
+            source: Camera index or video path
+            on_recognized: Called with (label, attendance row) the first time
+                each student is recognized
+            display: Show the annotated frames; pressing 'Q' stops tracking.
+                Without a display no drawing or window work is done at all.
+            stop: Optional threading or multiprocessing Event that stops
+                tracking when set (and is set when 'Q' is pressed)
+            window_name: Title of the display window
+            
+        Returns:
+            False if the source could not be opened, True otherwise
+        """
+        # Initialize camera; every queue and stage of the pipeline may hold a frame
+        frames = open_frame_source(source, hold=3 * self.queue_size + 4)
+        if not frames.is_opened():
+            frames.release()
+            return False
+        frames.start()
         
         font = cv2.FONT_HERSHEY_SIMPLEX
-        attendance_records = []
         recognized_ids = set()
+        tracker = FaceTracker()
+        governor = self.governor
+        frame_index = 0
+        self.recognition_stats = {'predictions': 0}
         
-        try:
-            while True:
-                ret, frame = cam.read()
-                if not ret:
-                    break
-                
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.face_cascade.detectMultiScale(gray, 1.2, 5)
+        def capture():
+            if stop is not None and stop.is_set():
+                return None
+            ret, frame = frames.read()
+            return frame if ret else None
+        
+        def detect(frame):
+            nonlocal frame_index
+            if governor is not None:
+                governor.frame_started()
+            interval = self.detection_interval if governor is None else governor.detection_interval
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            
+            # Run the full cascade every N frames or when a track is lost,
+            # otherwise follow the existing tracks
+            if frame_index % interval == 0 or not tracker.follow(gray):
+                faces = self.detector.detect(gray)
+                tracker.update(gray, faces)
+            frame_index += 1
+            if governor is not None:
+                governor.frame_finished()
+            
+            # Snapshot the boxes, the tracker moves on to the next frame.
+            # Without a window the color frame is not needed any further.
+            return (frame if display else None, gray,
+                    [(track, track.box) for track in tracker.tracks])
+        
+        def recognize(item):
+            frame, gray, tracks = item
+            
+            # Identities carry over, so only predict tracks still voting
+            self._identify_tracks(
+                gray, [(track, box) for track, box in tracks if track.needs_prediction]
+            )
+            return frame, [(box, track.label, track.name, track.student_id)
+                           for track, box in tracks]
+        
+        def sink(item) -> bool:
+            frame, faces = item
+            for (x, y, w, h), label, name, student_id in faces:
+                # Record attendance if not already recorded
+                if label is not None and label not in recognized_ids:
+                    ts = get_current_timestamp()
+                    date = format_date(ts)
+                    time = format_time(ts)
+                    
+                    recognized_ids.add(label)
+                    if on_recognized:
+                        on_recognized(label, [student_id, '', name, '', date, '', time])
                 
-                for (x, y, w, h) in faces:
+                if display:
+                    display_name = name if label is not None else "Unknown"
                     cv2.rectangle(frame, (x, y), (x + w, y + h), (225, 0, 0), 2)
-                    
-                    # Predict the face
-                    serial, confidence = self.recognizer.predict(gray[y:y + h, x:x + w])
-                    
-                    if confidence < CONFIDENCE_THRESHOLD:
-                        # Get student details
-                        student_data = self.student_df.loc[
-                            self.student_df['SERIAL NO.'] == serial
-                        ]
-                        
-                        if not student_data.empty:
-                            name = student_data['NAME'].values[0]
-                            student_id = str(student_data['ID'].values[0])
-                            
-                            # Record attendance if not already recorded
-                            if serial not in recognized_ids:
-                                ts = get_current_timestamp()
-                                date = format_date(ts)
-                                time = format_time(ts)
-                                
-                                attendance = [student_id, '', name, '', date, '', time]
-                                attendance_records.append(attendance)
-                                recognized_ids.add(serial)
-                                
-                                # Update callback if provided
-                                if update_callback:
-                                    update_callback(student_id, name, date, time)
-                            
-                            display_name = name
-                        else:
-                            display_name = "Unknown"
-                    else:
-                        display_name = "Unknown"
-                    
                     cv2.putText(frame, display_name, (x, y + h), 
                               font, 1, (255, 255, 255), 2)
-                
-                cv2.imshow('Taking Attendance', frame)
-                
-                # Break on 'q' key
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+            
+            if not display:
+                return True
+            cv2.imshow(window_name, frame)
+            
+            # Stop on 'q' key
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                if stop is not None:
+                    stop.set()
+                return False
+            return True
+        
+        pipeline = Pipeline(self.queue_size, self.drop_policy)
+        pipeline.add_stage('capture', capture)
+        pipeline.add_stage('detect', detect)
+        pipeline.add_stage('recognize', recognize)
         
+        try:
+            pipeline.run('display' if display else 'record', sink)
         finally:
-            cam.release()
-            cv2.destroyAllWindows()
+            frames.release()
+            self.capture_stats = frames.stats()
+            self.pipeline_stats = pipeline.stats()
+            self.recognition_stats['tracks'] = tracker.track_count
+            self.recognition_stats['identified'] = len(recognized_ids)
+            logger.info("%d frames read, %d dropped by the reader, %d predictions for "
+                        "%d tracked faces, %d students identified",
+                        self.capture_stats['frames_read'], self.capture_stats['frames_dropped'],
+                        self.recognition_stats['predictions'], tracker.track_count,
+                        len(recognized_ids))
+            if governor is not None and governor.adjustments:
+                logger.info("Detection settings after %d adjustments: %s",
+                            len(governor.adjustments), governor.settings())
+            if display:
+                cv2.destroyAllWindows()
         
-        # Save attendance to CSV
-        if attendance_records:
-            self._save_attendance(attendance_records)
-            return True, "Attendance recorded successfully", attendance_records
-        else:
-            return False, "No faces recognized", []
+        return True
     
-    def _save_attendance(self, records: List) -> None:
+    def _identify_tracks(self, gray, tracks: List[Tuple[FaceTrack, Box]]) -> None:
         """
-        Save attendance records to CSV file.
+        Predict the identity of tracked faces and assign it once the votes agree.
         
         Args:
-            records: List of attendance records
+            gray: Grayscale frame
+            tracks: Tracks to identify, with their box in this frame
         """
-        ts = get_current_timestamp()
-        date = format_date(ts)
-        attendance_file = ATTENDANCE_DIR / f"Attendance_{date}.csv"
+        if not tracks:
+            return
         
-        file_exists = os.path.isfile(str(attendance_file))
+        crops = [gray[y:y + h, x:x + w] for _, (x, y, w, h) in tracks]
+        if self.matcher is not None:
+            predictions = self.matcher.predict_batch(crops)
+        else:
+            predictions = [self.recognizer.predict(crop) for crop in crops]
         
-        with open(str(attendance_file), 'a+', newline='') as csvFile:
-            writer = csv.writer(csvFile)
+        self.recognition_stats['predictions'] += len(predictions)
+        for (track, _), (label, confidence) in zip(tracks, predictions):
+            # Labels are the student IDs the model was trained with
+            student = None
+            if confidence < CONFIDENCE_THRESHOLD:
+                student = self.students.get(label)
             
-            # Write header if new file
-            if not file_exists:
-                writer.writerow(ATTENDANCE_COLUMNS)
-            
-            # Write all records
-            for record in records:
-                writer.writerow(record)
+            settled = track.add_vote(label if student is not None else None, confidence)
+            if settled is not None:
+                track.name = student.name
+                track.student_id = student.student_id
+                track.confidence = float(np.mean(track.votes[settled]))
+                track.label = settled
     
     def get_today_attendance(self) -> List[Tuple[str, str, str, str]]:
         """
@@ -172,19 +295,28 @@ class AttendanceTracker:
             List of tuples (ID, Name, Date, Time)
         """
         ts = get_current_timestamp()
-        date = format_date(ts)
-        attendance_file = ATTENDANCE_DIR / f"Attendance_{date}.csv"
-        
-        if not os.path.isfile(str(attendance_file)):
-            return []
-        
-        records = []
-        with open(str(attendance_file), 'r') as csvFile:
-            reader = csv.reader(csvFile)
-            next(reader)  # Skip header
-            
-            for row in reader:
-                if len(row) >= 7:
-                    records.append((row[0], row[2], row[4], row[6]))
-        
-        return records
+        if self._storage is None:
+            self._storage = open_storage()
+        return self._storage.attendance_on(format_date(ts))
+    
+    def close(self) -> None:
+        """Close the storage backend opened for today's attendance."""
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+
+
+def save_attendance(records: List, date: Optional[str] = None) -> None:
+    """
+    Append attendance records to a day's CSV file.
+    
+    Args:
+        records: List of attendance records
+        date: Day of the records as DD-MM-YYYY, today if not given
+    """
+    if date is None:
+        date = format_date(get_current_timestamp())
+    
+    with AttendanceWriter() as writer:
+        for record in records:
+            writer.append(record, date)
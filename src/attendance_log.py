@@ -0,0 +1,560 @@
+"""
+Durable attendance log for the attendance system.
+
+This module appends attendance rows to the day's CSV file while tracking
+runs, instead of saving them when the session ends. A background thread
+groups the rows that arrive close together into one write and one fsync
+(group commit), so a row is on disk within a bounded delay. Rows whose
+write fails stay queued and are retried with the next commit. A day file
+whose last row was cut short by a crash is repaired before it is read or
+appended to.
+
+Every day file has an index of the students already marked, kept in
+memory and in a small sidecar file. Appends run under a lock shared by
+all processes, catch the index up by reading only the bytes added since
+it was last saved, and skip students who are already present that day.
+With the SQLite storage backend the writer commits batches to the
+database instead of the day files. Trackers pass recognitions through a
+sink, which keeps the students already marked out of the session's
+records and callbacks.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+from config.config import (
+    ATTENDANCE_DIR, ATTENDANCE_COLUMNS, ATTENDANCE_COMMIT_RECORDS,
+    ATTENDANCE_COMMIT_MS, ATTENDANCE_FSYNC, ATTENDANCE_LOCK_FILE
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Queue markers that end the current batch early
+_FLUSH = 'flush'
+_CLOSE = 'close'
+
+
+def attendance_file(date: str, directory: str = str(ATTENDANCE_DIR)) -> Path:
+    """
+    Get the attendance CSV of a day.
+    
+    Args:
+        date: Day as DD-MM-YYYY
+        directory: Attendance directory
+        
+    Returns:
+        Path of Attendance_<date>.csv
+    """
+    return Path(directory) / f"Attendance_{date}.csv"
+
+
+def attendance_index_file(date: str, directory: str = str(ATTENDANCE_DIR)) -> Path:
+    """
+    Get the sidecar index of a day's attendance CSV.
+    
+    Args:
+        date: Day as DD-MM-YYYY
+        directory: Attendance directory
+        
+    Returns:
+        Path of Attendance_<date>.index.json
+    """
+    return Path(directory) / f"Attendance_{date}.index.json"
+
+
+def _complete_length(path: str) -> int:
+    """Length of a file up to and including its last newline."""
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def recover_attendance_file(path: str) -> int:
+    """
+    Remove a row that was only partly written when a writer crashed.
+    
+    Args:
+        path: Attendance CSV
+        
+    Returns:
+        Number of bytes removed
+    """
+    if not os.path.isfile(path):
+        return 0
+    size = os.path.getsize(path)
+    complete = _complete_length(path)
+    if complete < size:
+        with open(path, 'r+b') as f:
+            f.truncate(complete)
+            f.flush()
+            os.fsync(f.fileno())
+    return size - complete
+
+
+def tail_attendance_file(path: str, offset: int = 0) -> Tuple[List[List[str]], int]:
+    """
+    Read the complete rows added to an attendance CSV after a byte offset.
+    
+    A partly written last row, from a crash or a write in progress, is
+    left for the next call. The header is skipped when reading from the
+    start of the file.
+    
+    Args:
+        path: Attendance CSV
+        offset: Byte offset returned by the previous call, 0 for the whole file
+        
+    Returns:
+        Tuple of (attendance rows, offset to continue from)
+    """
+    if not os.path.isfile(path):
+        return [], 0
+    complete = _complete_length(path)
+    if offset > complete:
+        # The file was truncated or replaced, read it again from the start
+        offset = 0
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(complete - offset)
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+    if offset == 0 and rows and rows[0] == ATTENDANCE_COLUMNS:
+        rows = rows[1:]
+    return [row for row in rows if row], complete
+
+
+def read_attendance_file(path: str) -> List[List[str]]:
+    """
+    Read the complete rows of an attendance CSV, ignoring the header.
+    
+    Args:
+        path: Attendance CSV
+        
+    Returns:
+        Attendance rows
+    """
+    return tail_attendance_file(path)[0]
+
+
+class DirectoryLock:
+    """Exclusive lock on a data directory, shared between processes."""
+    
+    def __init__(self, directory: str, name: str = ATTENDANCE_LOCK_FILE):
+        """
+        Initialize the lock. It is taken when the with block is entered.
+        
+        Args:
+            directory: Directory holding the lock file
+            name: Lock file name
+        """
+        self.path = os.path.join(directory, name)
+        self._file = None
+    
+    def __enter__(self) -> 'DirectoryLock':
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 seconds, keep waiting
+                    continue
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+
+
+class AttendanceIndex:
+    """Students already marked on one day, shared by every writer of that day."""
+    
+    def __init__(self, date: str, directory: str = str(ATTENDANCE_DIR)):
+        """
+        Load the index from its sidecar file and catch up with the CSV.
+        
+        Loading reads the marked IDs from the sidecar and only the CSV rows
+        added after the sidecar was saved.
+        
+        Args:
+            date: Day as DD-MM-YYYY
+            directory: Attendance directory
+        """
+        self.date = date
+        self.directory = directory
+        self.path = str(attendance_file(date, directory))
+        self.index_path = str(attendance_index_file(date, directory))
+        self.marked: Set[str] = set()
+        self.offset = 0
+        self._lock = threading.Lock()
+        
+        try:
+            with open(self.index_path, 'r') as f:
+                saved = json.load(f)
+            if saved['offset'] <= _complete_length(self.path):
+                self.marked = set(saved['ids'])
+                self.offset = saved['offset']
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or unreadable sidecar, rebuild from the CSV
+            pass
+        self.refresh()
+    
+    def __contains__(self, student_id) -> bool:
+        return str(student_id) in self.marked
+    
+    def __len__(self) -> int:
+        return len(self.marked)
+    
+    def refresh(self) -> List[List[str]]:
+        """
+        Add the rows other writers appended since the last call.
+        
+        Returns:
+            The new rows
+        """
+        with self._lock:
+            offset = self.offset
+            rows, self.offset = tail_attendance_file(self.path, offset)
+            if self.offset < offset:
+                self.marked = set()
+            self.marked.update(row[0] for row in rows)
+            return rows
+    
+    def is_marked(self, student_id) -> bool:
+        """
+        Check whether a student is present, including marks by other processes.
+        
+        Args:
+            student_id: Student ID
+            
+        Returns:
+            True if the student is already marked that day
+        """
+        self.refresh()
+        return str(student_id) in self.marked
+    
+    def append(self, records: List[List], durable: bool = True) -> List[List]:
+        """
+        Append the records of students not marked yet, under the directory lock.
+        
+        Args:
+            records: Attendance rows of this day
+            durable: fsync the CSV after writing
+            
+        Returns:
+            The rows that were written
+        """
+        with DirectoryLock(self.directory):
+            removed = recover_attendance_file(self.path)
+            if removed:
+                logger.warning("Removed %d bytes of a partly written row from %s",
+                               removed, self.path)
+            self.refresh()
+            
+            with self._lock:
+                written, new_ids = [], set()
+                for record in records:
+                    student_id = str(record[0])
+                    if student_id not in self.marked and student_id not in new_ids:
+                        new_ids.add(student_id)
+                        written.append(record)
+                if not written:
+                    return written
+                
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+                    writer.writerow(ATTENDANCE_COLUMNS)
+                writer.writerows(written)
+                with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                    f.write(buffer.getvalue())
+                    f.flush()
+                    if durable:
+                        os.fsync(f.fileno())
+                
+                # Students only count as marked once their rows are on disk, so
+                # a failed write is not dropped as a duplicate when retried
+                self.marked.update(new_ids)
+                # Nobody else appends while the lock is held
+                self.offset = os.path.getsize(self.path)
+                self._save()
+            return written
+    
+    def _save(self) -> None:
+        """Atomically write the sidecar file."""
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'offset': self.offset, 'ids': sorted(self.marked)}, f)
+        os.replace(tmp_path, self.index_path)
+
+
+class AttendanceWriter:
+    """Background writer appending attendance rows with group commit."""
+    
+    def __init__(self, directory: str = str(ATTENDANCE_DIR),
+                 batch_size: int = ATTENDANCE_COMMIT_RECORDS,
+                 commit_ms: float = ATTENDANCE_COMMIT_MS,
+                 durable: bool = ATTENDANCE_FSYNC,
+                 storage=None):
+        """
+        Start the writer thread.
+        
+        Args:
+            directory: Attendance directory, used when the CSV backend is opened
+            batch_size: Most rows written and synced together
+            commit_ms: Longest time a row waits before it is written
+            durable: fsync every commit, so committed rows survive a power loss
+            storage: Storage backend to write to, the configured backend by default
+        """
+        from src.storage import open_storage
+        
+        self.directory = directory
+        self.batch_size = max(1, batch_size)
+        self.commit_interval = max(0.0, commit_ms) / 1000.0
+        self.durable = durable
+        self._owns_storage = storage is None
+        self.storage = storage if storage is not None else open_storage(
+            durable=durable, attendance_dir=directory
+        )
+        self.stats = {'records': 0, 'duplicates': 0, 'commits': 0, 'max_latency_ms': 0.0}
+        self._queue = queue.Queue()
+        self._done = threading.Condition()
+        self._appended = 0
+        self._committed = 0
+        self._attempts = 0
+        # Rows whose write failed, retried with the next batch, flush or close
+        self._retry: List = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='attendance-writer',
+                                        daemon=True)
+        self._thread.start()
+    
+    def append(self, record: List, date: Optional[str] = None) -> None:
+        """
+        Queue an attendance row for writing.
+        
+        Args:
+            record: Attendance row [id, '', name, '', date, '', time]
+            date: Day file to append to, the row's date by default
+        """
+        if self._closed:
+            raise ValueError("Attendance writer is closed")
+        with self._done:
+            self._appended += 1
+        self._queue.put((time.perf_counter(), date or record[4], record))
+    
+    @property
+    def failed(self) -> int:
+        """Number of rows whose write failed and that are waiting for a retry."""
+        with self._done:
+            return len(self._retry)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every row appended so far is written.
+        
+        Rows whose write failed earlier are retried first.
+        
+        Args:
+            timeout: Seconds to wait, None to wait until done
+            
+        Returns:
+            True if the rows were written in time, False if some failed
+        """
+        with self._done:
+            target = self._appended
+            attempts = self._attempts
+        self._queue.put(_FLUSH)
+        with self._done:
+            # Wait for the flush marker to be handled, then check nothing failed
+            if not self._done.wait_for(
+                    lambda: self._committed + len(self._retry) >= target and
+                    self._attempts > attempts, timeout):
+                return False
+            return not self._retry
+    
+    def close(self) -> bool:
+        """
+        Write the remaining rows and stop the writer thread.
+        
+        Returns:
+            True if every row was written, False if some could not be
+        """
+        if self._closed:
+            return not self._retry
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        if self._retry:
+            logger.error("%d attendance rows could not be written", len(self._retry))
+        if self._owns_storage:
+            self.storage.close()
+        return not self._retry
+    
+    def is_marked(self, student_id, date: str) -> bool:
+        """
+        Check whether a student is already present on a day, in any session.
+        
+        The answer can be out of date as soon as it is returned, so it is
+        only meant for skipping callbacks. Rows passed to append() are
+        checked again when they are written, and duplicates are dropped.
+        
+        Args:
+            student_id: Student ID
+            date: Day as DD-MM-YYYY
+            
+        Returns:
+            True if the student is marked in the day's storage
+        """
+        return self.storage.is_marked(student_id, date)
+    
+    def _run(self) -> None:
+        """Collect rows into batches and commit them."""
+        running = True
+        while running:
+            item = self._queue.get()
+            if item == _CLOSE:
+                break
+            if item == _FLUSH:
+                self._commit([])
+                continue
+            
+            # Group commit: wait for more rows until the batch is full, the
+            # first row has waited commit_interval or a flush is requested
+            batch = [item]
+            deadline = item[0] + self.commit_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item == _FLUSH:
+                    break
+                if item == _CLOSE:
+                    running = False
+                    break
+                batch.append(item)
+            self._commit(batch)
+        self._commit([])
+    
+    def _commit(self, batch: List) -> None:
+        """
+        Write a batch, and the rows that failed before, with one write and
+        one sync per day. Rows whose write fails are kept for a retry.
+        """
+        with self._done:
+            batch = self._retry + batch
+            self._retry = []
+        by_date: Dict[str, List] = {}
+        for item in batch:
+            by_date.setdefault(item[1], []).append(item)
+        
+        committed, failed = [], []
+        for date, items in by_date.items():
+            records = [record for _, _, record in items]
+            try:
+                written = self.storage.add_attendance(date, records)
+                self.stats['records'] += len(written)
+                self.stats['duplicates'] += len(records) - len(written)
+                committed.extend(items)
+            except (OSError, sqlite3.Error) as e:
+                logger.error("Error writing %d attendance rows for %s, will retry: %s",
+                             len(records), date, e)
+                failed.extend(items)
+        
+        if committed:
+            now = time.perf_counter()
+            latency = max(now - queued for queued, _, _ in committed) * 1e3
+            self.stats['commits'] += 1
+            self.stats['max_latency_ms'] = max(self.stats['max_latency_ms'], latency)
+        with self._done:
+            self._committed += len(committed)
+            self._retry = failed
+            self._attempts += 1
+            self._done.notify_all()
+    
+    def __enter__(self) -> 'AttendanceWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class AttendanceSink:
+    """Collects recognitions from one or more cameras and marks each student once."""
+    
+    def __init__(self, update_callback: Optional[Callable] = None,
+                 writer: Optional[AttendanceWriter] = None):
+        """
+        Initialize the sink.
+        
+        Args:
+            update_callback: Optional callback called with (student_id, name,
+                date, time) for every newly marked student
+            writer: Optional attendance writer every newly marked student is
+                appended to
+        """
+        self.update_callback = update_callback
+        self.writer = writer
+        self.records = []
+        self.sources = {}
+    
+    def add(self, source: Union[int, str], label: int, attendance: List) -> bool:
+        """
+        Record a recognition unless the student is already marked.
+        
+        Args:
+            source: Camera or video that recognized the student
+            label: Recognizer label of the student
+            attendance: Attendance row
+            
+        Returns:
+            True if the student was newly marked
+        """
+        if label in self.sources:
+            return False
+        
+        self.sources[label] = source
+        if self.writer is not None and self.writer.is_marked(attendance[0], attendance[4]):
+            # Marked by an earlier session or another process today. The writer
+            # drops duplicates itself, this only skips the records and callback.
+            return False
+        self.records.append(attendance)
+        if self.writer is not None:
+            self.writer.append(attendance)
+        if self.update_callback:
+            self.update_callback(attendance[0], attendance[2], attendance[4], attendance[6])
+        return True
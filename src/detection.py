@@ -0,0 +1,145 @@
+"""
+Downscaled face detection for the attendance system.
+
+This module runs the Haar cascade on a downscaled copy of each frame and
+maps the boxes back to full-resolution coordinates, so recognition and
+saved training images still use sharp full-resolution crops. The face
+sizes searched for are bounded by the distance range a kiosk user stands
+at, which skips cascade scales that cannot contain a face.
+"""
+
+import cv2
+import math
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+from config.config import (
+    HAARCASCADE_PATH, SCALE_FACTOR, MIN_NEIGHBORS, DETECTION_SCALE,
+    KIOSK_DISTANCE_RANGE, CAMERA_HFOV_DEGREES, FACE_WIDTH_METERS
+)
+
+# Smallest window the frontal face cascade was trained on
+CASCADE_WINDOW = 24
+
+
+def kiosk_face_size_range(frame_width: int,
+                          distance_range: Tuple[float, float] = KIOSK_DISTANCE_RANGE,
+                          hfov_degrees: float = CAMERA_HFOV_DEGREES,
+                          face_width: float = FACE_WIDTH_METERS) -> Tuple[int, int]:
+    """
+    Estimate the face box sizes expected in a kiosk camera frame.
+    
+    A face of face_width metres at distance d spans about
+    focal * face_width / d pixels, with the focal length in pixels derived
+    from the horizontal field of view. The range is widened by 25% on both
+    sides to allow for head size and cascade box variation.
+    
+    Args:
+        frame_width: Frame width in pixels
+        distance_range: Nearest and farthest expected distance in metres
+        hfov_degrees: Horizontal field of view of the camera
+        face_width: Typical face width in metres
+        
+    Returns:
+        Tuple of (min_size, max_size) face box side in full-resolution pixels
+    """
+    near, far = distance_range
+    focal = frame_width / (2.0 * math.tan(math.radians(hfov_degrees) / 2.0))
+    min_size = int(focal * face_width / far * 0.8)
+    max_size = int(math.ceil(focal * face_width / near * 1.25))
+    return max(1, min_size), max(min_size + 1, max_size)
+
+
+class FaceDetector:
+    """Class for detecting faces on a downscaled copy of the frame."""
+    
+    def __init__(self, scale: float = DETECTION_SCALE,
+                 distance_range: Optional[Tuple[float, float]] = KIOSK_DISTANCE_RANGE,
+                 scale_factor: float = SCALE_FACTOR,
+                 min_neighbors: int = MIN_NEIGHBORS,
+                 cascade_path: str = str(HAARCASCADE_PATH)):
+        """
+        Initialize the detector.
+        
+        Args:
+            scale: Factor the frame is resized by before detection (1 = full size)
+            distance_range: Nearest and farthest expected face distance in
+                metres, None to search every face size
+            scale_factor: Cascade scale step
+            min_neighbors: Cascade neighbor threshold
+            cascade_path: Haar cascade file
+        """
+        if not os.path.isfile(cascade_path):
+            raise FileNotFoundError(
+                f"Haarcascade file not found at {cascade_path}"
+            )
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        self.scale = min(1.0, max(0.05, scale))
+        self.distance_range = distance_range
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._size_hints: Dict[int, Tuple[Tuple[int, int], Tuple[int, int]]] = {}
+    
+    def configure(self, scale: Optional[float] = None,
+                  scale_factor: Optional[float] = None) -> None:
+        """
+        Change the detection scale or cascade scale factor.
+        
+        Args:
+            scale: New detection scale, None to keep the current one
+            scale_factor: New cascade scale step, None to keep the current one
+        """
+        if scale is not None:
+            self.scale = min(1.0, max(0.05, scale))
+            # Size hints are in downscaled pixels
+            self._size_hints = {}
+        if scale_factor is not None:
+            self.scale_factor = scale_factor
+    
+    def _hints(self, frame_width: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Get the cascade minSize and maxSize in downscaled pixels, per frame width."""
+        hints = self._size_hints.get(frame_width)
+        if hints is None:
+            if self.distance_range is None:
+                hints = ((0, 0), (0, 0))
+            else:
+                min_size, max_size = kiosk_face_size_range(frame_width, self.distance_range)
+                low = max(CASCADE_WINDOW, int(min_size * self.scale))
+                high = max(low + 1, int(math.ceil(max_size * self.scale)))
+                hints = ((low, low), (high, high))
+            self._size_hints[frame_width] = hints
+        return hints
+    
+    def detect(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Detect faces and return their boxes in full-resolution coordinates.
+        
+        Args:
+            gray: Full-resolution grayscale frame
+            
+        Returns:
+            Array of (x, y, w, h) boxes, shape (n, 4)
+        """
+        min_size, max_size = self._hints(gray.shape[1])
+        small = gray
+        if self.scale < 1.0:
+            small = cv2.resize(gray, None, fx=self.scale, fy=self.scale,
+                               interpolation=cv2.INTER_AREA)
+        
+        faces = self.cascade.detectMultiScale(
+            small, self.scale_factor, self.min_neighbors,
+            minSize=min_size, maxSize=max_size
+        )
+        if len(faces) == 0:
+            return np.empty((0, 4), dtype=np.int32)
+        if self.scale == 1.0:
+            return np.asarray(faces, dtype=np.int32)
+        
+        # Map back to the full frame, keeping boxes inside it
+        boxes = np.round(np.asarray(faces, dtype=np.float64) / self.scale).astype(np.int32)
+        height, width = gray.shape[:2]
+        boxes[:, 0] = np.clip(boxes[:, 0], 0, width - 1)
+        boxes[:, 1] = np.clip(boxes[:, 1], 0, height - 1)
+        boxes[:, 2] = np.minimum(boxes[:, 2], width - boxes[:, 0])
+        boxes[:, 3] = np.minimum(boxes[:, 3], height - boxes[:, 1])
+        return boxes
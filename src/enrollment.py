@@ -0,0 +1,249 @@
+"""
+Bulk student enrollment for the attendance system.
+
+This module registers many students at once from a manifest listing each
+student's ID, name and a folder of photos or a video. Faces are detected
+and cropped in parallel worker processes, the crops and student details
+are written in batches, and the model is trained once at the end.
+"""
+
+import cv2
+import csv
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from config.config import (
+    HAARCASCADE_PATH, TRAINING_IMAGE_DIR, STUDENT_DETAILS_CSV, SCALE_FACTOR,
+    MIN_NEIGHBORS, NUM_TRAINING_IMAGES, ENROLL_WORKERS, CAPTURE_FILTER
+)
+from src.face_detection import save_training_faces
+from src.image_store import student_label
+from src.sample_filter import SampleFilter
+from src.storage import Storage, open_storage
+from src.training import FaceTrainer
+from src.utils import assure_path_exists, validate_id, validate_name
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Students registered per write to the student details
+REGISTER_BATCH = 64
+
+# Per-process face cascade of the pool workers
+_worker = {}
+
+
+class EnrollmentEntry(NamedTuple):
+    """One student of an enrollment manifest."""
+    student_id: str
+    name: str
+    source: str
+
+
+def read_manifest(path: str) -> Tuple[List[EnrollmentEntry], List[str]]:
+    """
+    Read an enrollment manifest CSV with id, name and source columns.
+    
+    Relative sources are resolved against the manifest's directory.
+    
+    Args:
+        path: Path to the manifest
+        
+    Returns:
+        Tuple of (valid entries, error messages for rejected rows)
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    entries, errors, seen = [], [], set()
+    with open(path, 'r', newline='') as csvFile:
+        for line, row in enumerate(csv.DictReader(csvFile), start=2):
+            student_id = (row.get('id') or '').strip()
+            name = (row.get('name') or '').strip()
+            source = os.path.join(base, (row.get('source') or '').strip())
+            if not validate_id(student_id):
+                errors.append(f"Line {line}: ID must be numeric")
+            elif not validate_name(name):
+                errors.append(f"Line {line}: name must be alphabetic")
+            elif not os.path.exists(source):
+                errors.append(f"Line {line}: source not found: {source}")
+            elif student_id in seen:
+                errors.append(f"Line {line}: duplicate ID {student_id}")
+            else:
+                seen.add(student_id)
+                entries.append(EnrollmentEntry(student_id, name, source))
+    return entries, errors
+
+
+def _init_worker() -> None:
+    """Load the face cascade once per worker process."""
+    cv2.setNumThreads(1)
+    _worker['cascade'] = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
+
+
+def _largest_face(cascade, gray: np.ndarray) -> Optional[np.ndarray]:
+    """Crop the largest detected face of an image, None if there is none."""
+    faces = cascade.detectMultiScale(gray, SCALE_FACTOR, MIN_NEIGHBORS)
+    if len(faces) == 0:
+        return None
+    x, y, w, h = max(faces, key=lambda box: box[2] * box[3])
+    return gray[y:y + h, x:x + w].copy()
+
+
+def extract_faces(source: str, max_samples: int = NUM_TRAINING_IMAGES) -> List[np.ndarray]:
+    """
+    Detect and crop the enrolled person's face from photos or a video.
+    
+    The largest face of each photo or frame is used. Videos are sampled at
+    evenly spaced frames. With CAPTURE_FILTER on, blurry and near-duplicate
+    crops are skipped as during camera capture.
+    
+    Args:
+        source: Folder of photos or a video file
+        max_samples: Maximum number of crops
+        
+    Returns:
+        Grayscale face crops
+    """
+    cascade = _worker.get('cascade')
+    if cascade is None:
+        _init_worker()
+        cascade = _worker['cascade']
+    
+    crops = []
+    sample_filter = SampleFilter() if CAPTURE_FILTER else None
+    
+    def keep(face: Optional[np.ndarray]) -> bool:
+        return face is not None and (sample_filter is None or sample_filter.accept(face)[0])
+    
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if len(crops) >= max_samples:
+                break
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            gray = cv2.imread(os.path.join(source, filename), cv2.IMREAD_GRAYSCALE)
+            face = None if gray is None else _largest_face(cascade, gray)
+            if keep(face):
+                crops.append(face)
+        return crops
+    
+    cam = cv2.VideoCapture(source)
+    frame_count = int(cam.get(cv2.CAP_PROP_FRAME_COUNT))
+    # Look at a few frames per wanted sample, as not every frame has a face
+    step = max(1, frame_count // (max_samples * 3)) if frame_count > 0 else 1
+    index = 0
+    try:
+        while len(crops) < max_samples:
+            if index % step:
+                if not cam.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cam.read()
+            if not ret:
+                break
+            index += 1
+            face = _largest_face(cascade, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            if keep(face):
+                crops.append(face)
+    finally:
+        cam.release()
+    return crops
+
+
+class BulkEnrollment:
+    """Class for enrolling many students from a manifest."""
+    
+    def __init__(self, workers: int = ENROLL_WORKERS,
+                 max_samples: int = NUM_TRAINING_IMAGES):
+        """
+        Initialize bulk enrollment.
+        
+        Args:
+            workers: Number of detection worker processes
+            max_samples: Maximum training crops per student
+        """
+        self.workers = max(1, workers)
+        self.max_samples = max_samples
+    
+    @staticmethod
+    def _register(storage: Storage,
+                  batch: List[Tuple[EnrollmentEntry, List[np.ndarray]]]) -> Dict[str, int]:
+        """
+        Register a batch of students in one write and save their crops.
+        
+        Serial numbers are allocated by the write, under the registry lock,
+        so an enrollment running at the same time cannot take the same ones.
+        
+        Args:
+            storage: Storage backend
+            batch: Students with their face crops
+            
+        Returns:
+            Crops saved per student ID
+        """
+        rows = storage.add_students([[None, '', entry.student_id, '', entry.name]
+                                     for entry, _ in batch])
+        for row, (entry, faces) in zip(rows, batch):
+            save_training_faces(faces, row[0], entry.student_id, entry.name)
+        return {entry.student_id: len(faces) for entry, faces in batch}
+    
+    def enroll(self, entries: List[EnrollmentEntry],
+               train: bool = True) -> Tuple[bool, str, Dict[str, int]]:
+        """
+        Enroll students and train the model once at the end.
+        
+        Students whose ID is already registered, and sources without a
+        detectable face, are skipped.
+        
+        Args:
+            entries: Students to enroll
+            train: Train the model after writing the crops
+            
+        Returns:
+            Tuple of (success: bool, message: str, crops saved per student ID)
+        """
+        assure_path_exists(str(TRAINING_IMAGE_DIR))
+        assure_path_exists(str(STUDENT_DETAILS_CSV.parent))
+        
+        with open_storage() as storage:
+            try:
+                registered = storage.load_students()
+                entries = [e for e in entries if student_label(e.student_id) not in registered]
+            except FileNotFoundError:
+                # Nobody is registered yet
+                pass
+        if not entries:
+            return False, "All students in the manifest are already registered", {}
+        
+        saved = {}
+        with open_storage() as storage, ProcessPoolExecutor(
+            max_workers=min(self.workers, len(entries)),
+            mp_context=mp.get_context('spawn'),
+            initializer=_init_worker
+        ) as pool:
+            results = pool.map(extract_faces, [e.source for e in entries],
+                               [self.max_samples] * len(entries))
+            batch = []
+            for entry, faces in zip(entries, results):
+                if not faces:
+                    print(f"Error processing {entry.source}: no face detected")
+                    continue
+                batch.append((entry, faces))
+                if len(batch) >= REGISTER_BATCH:
+                    saved.update(self._register(storage, batch))
+                    batch = []
+            if batch:
+                saved.update(self._register(storage, batch))
+        
+        if not saved:
+            return False, "No face detected in any source", saved
+        
+        message = f"Enrolled {len(saved)} students"
+        
+        if train:
+            success, train_message, registrations = FaceTrainer().train_model()
+            if not success:
+                return False, f"{message}, but {train_message}", saved
+            message += f" ({registrations} registrations in the model)"
+        return True, message, saved
@@ -6,14 +6,19 @@ This module handles capturing face images for training the recognition model.
 
 import cv2
 import os
-import csv
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
+import numpy as np
 from config.config import (
     HAARCASCADE_PATH, TRAINING_IMAGE_DIR, STUDENT_DETAILS_CSV,
-    STUDENT_DETAILS_COLUMNS, SCALE_FACTOR, MIN_NEIGHBORS,
-    NUM_TRAINING_IMAGES, CAMERA_INDEX
+    NUM_TRAINING_IMAGES, CAMERA_INDEX, TRAINING_STORE_FORMAT, CAPTURE_FILTER,
+    CAPTURE_MAX_FRAMES
 )
-from src.utils import assure_path_exists, get_next_serial_number
+from src.utils import assure_path_exists
+from src.detection import FaceDetector
+from src.frame_source import FrameSource
+from src.image_store import pack_file_name, student_label, write_pack
+from src.sample_filter import SampleFilter
+from src.storage import open_storage
 
 
 class FaceCapture:
@@ -31,7 +36,7 @@ class FaceCapture:
                 f"Haarcascade file not found at {HAARCASCADE_PATH}. "
                 "Please ensure the file exists."
             )
-        self.detector = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
+        self.detector = FaceDetector()
     
     def capture_images(self, student_id: str, student_name: str) -> Tuple[bool, str]:
         """
@@ -49,80 +54,116 @@ class FaceCapture:
         assure_path_exists(str(STUDENT_DETAILS_CSV.parent))
         
         # Get serial number
-        serial = get_next_serial_number(str(STUDENT_DETAILS_CSV))
+        with open_storage() as storage:
+            serial = storage.next_serial()
         
         # Initialize camera
-        cam = cv2.VideoCapture(CAMERA_INDEX)
-        if not cam.isOpened():
+        source = FrameSource(CAMERA_INDEX)
+        if not source.is_opened():
+            source.release()
             return False, "Error: Could not access camera"
+        source.start()
         
         sample_num = 0
+        frame_num = 0
+        packed_faces = []
+        sample_filter = SampleFilter() if CAPTURE_FILTER else None
         
         try:
             while True:
-                ret, img = cam.read()
+                ret, img = source.read()
                 if not ret:
                     return False, "Error: Could not read from camera"
+                frame_num += 1
                 
                 gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                faces = self.detector.detectMultiScale(
-                    gray, SCALE_FACTOR, MIN_NEIGHBORS
-                )
+                # Boxes come back in full resolution, so crops stay sharp
+                faces = self.detector.detect(gray)
                 
                 for (x, y, w, h) in faces:
                     # Draw rectangle around face
                     cv2.rectangle(img, (x, y), (x + w, y + h), (255, 0, 0), 2)
+                    cv2.imshow('Taking Images', img)
+                    
+                    # Skip blurry crops and crops too similar to a kept one
+                    if sample_filter is not None:
+                        keep, _ = sample_filter.accept(gray[y:y + h, x:x + w])
+                        if not keep:
+                            continue
                     
                     # Increment sample number
                     sample_num += 1
                     
                     # Save the captured face
-                    file_name = f" {student_name}.{serial}.{student_id}.{sample_num}.jpg"
-                    file_path = TRAINING_IMAGE_DIR / file_name
-                    cv2.imwrite(str(file_path), gray[y:y + h, x:x + w])
-                    
-                    # Display the frame
-                    cv2.imshow('Taking Images', img)
+                    if TRAINING_STORE_FORMAT == 'packed':
+                        packed_faces.append(gray[y:y + h, x:x + w].copy())
+                    else:
+                        file_name = f" {student_name}.{serial}.{student_id}.{sample_num}.jpg"
+                        file_path = TRAINING_IMAGE_DIR / file_name
+                        cv2.imwrite(str(file_path), gray[y:y + h, x:x + w])
                 
                 # Wait for key press or max samples reached
                 if cv2.waitKey(100) & 0xFF == ord('q'):
                     break
                 elif sample_num >= NUM_TRAINING_IMAGES:
                     break
+                elif sample_filter is not None and frame_num >= CAPTURE_MAX_FRAMES:
+                    # A still subject yields few distinct samples, keep what we have
+                    break
         
         finally:
-            cam.release()
+            source.release()
             cv2.destroyAllWindows()
+            
+            # Write all samples of the student to a single pack file
+            if packed_faces:
+                save_training_faces(packed_faces, serial, student_id, student_name)
         
         # Save student details
         if sample_num > 0:
             self._save_student_details(serial, student_id, student_name)
-            return True, f"Images captured successfully for ID: {student_id}"
+            message = f"Images captured successfully for ID: {student_id}"
+            if sample_filter is not None and sample_filter.rejected:
+                message += (f" ({sample_num} kept, {sample_filter.rejected_blurry} blurry "
+                            f"and {sample_filter.rejected_duplicate} duplicate skipped)")
+            return True, message
         else:
             return False, "No face detected. Please try again."
     
     def _save_student_details(self, serial: int, student_id: str, 
                             student_name: str) -> None:
         """
-        Save student details to CSV file.
+        Save student details to the configured storage backend.
         
         Args:
             serial: Serial number
             student_id: Student ID
             student_name: Student name
         """
-        file_exists = os.path.isfile(str(STUDENT_DETAILS_CSV))
-        
-        with open(str(STUDENT_DETAILS_CSV), 'a+', newline='') as csvFile:
-            writer = csv.writer(csvFile)
-            
-            # Write header if file is new
-            if not file_exists:
-                writer.writerow(STUDENT_DETAILS_COLUMNS)
-            
-            # Write student data
-            row = [serial, '', student_id, '', student_name]
-            writer.writerow(row)
+        with open_storage() as storage:
+            storage.add_students([[serial, '', student_id, '', student_name]])
+
+
+def save_training_faces(faces: List[np.ndarray], serial: int, student_id: str,
+                        student_name: str) -> None:
+    """
+    Store the training crops of a student in the configured format.
+    
+    Args:
+        faces: Grayscale face crops
+        serial: Serial number
+        student_id: Student ID
+        student_name: Student name
+    """
+    if TRAINING_STORE_FORMAT == 'packed':
+        pack_path = TRAINING_IMAGE_DIR / pack_file_name(serial, student_id)
+        write_pack(str(pack_path), faces, student_label(student_id),
+                   serial, student_id, student_name)
+        return
+    
+    for sample_num, face in enumerate(faces, start=1):
+        file_name = f" {student_name}.{serial}.{student_id}.{sample_num}.jpg"
+        cv2.imwrite(str(TRAINING_IMAGE_DIR / file_name), face)
 
 
 def check_haarcascade_file() -> bool:
@@ -0,0 +1,131 @@
+"""
+Threaded camera frame source for the attendance system.
+
+This module reads frames from the camera on a background thread into a small
+ring buffer so that detection and recognition always work on the freshest frame.
+"""
+
+import cv2
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from config.config import CAMERA_INDEX, FRAME_BUFFER_SIZE, FRAME_READ_TIMEOUT
+
+
+class FrameSource:
+    """Class for reading camera frames on a background thread."""
+    
+    def __init__(self, source: Union[int, str] = CAMERA_INDEX,
+                 buffer_size: int = FRAME_BUFFER_SIZE):
+        """
+        Initialize the frame source.
+        
+        Args:
+            source: Camera index or video path passed to cv2.VideoCapture
+            buffer_size: Number of frames kept in the ring buffer
+        """
+        self.cam = cv2.VideoCapture(source)
+        self.buffer = deque(maxlen=max(1, buffer_size))
+        self.frames_read = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self._last_seq = 0
+        self._ended = False
+        self._running = False
+        self._thread = None
+        self._condition = threading.Condition()
+    
+    def is_opened(self) -> bool:
+        """
+        Check if the underlying camera was opened.
+        
+        Returns:
+            True if the camera is open, False otherwise
+        """
+        return self.cam.isOpened()
+    
+    def start(self) -> 'FrameSource':
+        """
+        Start the background reader thread.
+        
+        Returns:
+            The frame source itself, for chaining
+        """
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._reader, daemon=True)
+            self._thread.start()
+        return self
+    
+    def _reader(self) -> None:
+        """Read frames from the camera until stopped or the stream ends."""
+        while self._running:
+            ret, frame = self.cam.read()
+            with self._condition:
+                if not ret:
+                    self._ended = True
+                    self._condition.notify_all()
+                    break
+                self.frames_read += 1
+                self.buffer.append((self.frames_read, frame))
+                self._condition.notify_all()
+    
+    def read(self, timeout: float = FRAME_READ_TIMEOUT) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Get the freshest frame that has not been returned yet.
+        
+        Frames that were overwritten before the consumer asked for them are
+        counted in frames_dropped.
+        
+        Args:
+            timeout: Seconds to wait for a new frame
+            
+        Returns:
+            Tuple of (success: bool, frame) in the same form as cv2.VideoCapture.read
+        """
+        with self._condition:
+            has_new = self._condition.wait_for(
+                lambda: (self.buffer and self.buffer[-1][0] > self._last_seq)
+                or self._ended or not self._running,
+                timeout
+            )
+            if not has_new or not self.buffer or self.buffer[-1][0] <= self._last_seq:
+                return False, None
+            
+            seq, frame = self.buffer[-1]
+            self.frames_dropped += seq - self._last_seq - 1
+            self.frames_delivered += 1
+            self._last_seq = seq
+            self.buffer.clear()
+            return True, frame
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get frame counters for the current session.
+        
+        Returns:
+            Dictionary with frames read, delivered and dropped
+        """
+        with self._condition:
+            return {
+                'frames_read': self.frames_read,
+                'frames_delivered': self.frames_delivered,
+                'frames_dropped': self.frames_dropped
+            }
+    
+    def release(self) -> None:
+        """Stop the reader thread and release the camera."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=FRAME_READ_TIMEOUT)
+            self._thread = None
+        self.cam.release()
+    
+    def __enter__(self) -> 'FrameSource':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
@@ -0,0 +1,316 @@
+"""
+Shared-memory frame transport for the attendance system.
+
+This module captures frames in a separate process that decodes them
+straight into a ring of preallocated shared memory slots. Only slot
+indexes travel through the message queue, so the recognition process
+reads each frame in place instead of unpickling a copy of it.
+"""
+
+import cv2
+import multiprocessing as mp
+import queue
+import signal
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from config.config import (
+    CAMERA_INDEX, FRAME_READ_TIMEOUT, FRAME_RING_SLOTS, FRAME_TRANSPORT
+)
+from src.frame_source import FrameSource
+
+
+class FrameRing:
+    """Fixed number of frame-sized slots in one shared memory block."""
+    
+    def __init__(self, shm: shared_memory.SharedMemory, shape: Tuple[int, ...],
+                 slots: int):
+        """
+        Wrap a shared memory block as a ring of frame slots.
+        
+        Args:
+            shm: Shared memory block of at least slots * frame size bytes
+            shape: Shape of one uint8 frame
+            slots: Number of slots
+        """
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, buffer=shm.buf)
+    
+    @classmethod
+    def create(cls, shape: Tuple[int, ...], slots: int) -> 'FrameRing':
+        """
+        Allocate a new ring.
+        
+        The ring can be unlinked by whichever process outlives the other,
+        which for the frame source is the consumer.
+        
+        Args:
+            shape: Shape of one uint8 frame
+            slots: Number of slots
+            
+        Returns:
+            New ring
+        """
+        size = slots * int(np.prod(shape))
+        return cls(shared_memory.SharedMemory(create=True, size=size), shape, slots)
+    
+    @classmethod
+    def attach(cls, spec: Dict) -> 'FrameRing':
+        """
+        Attach to a ring created by another process.
+        
+        Args:
+            spec: Ring description from the creating process
+            
+        Returns:
+            Attached ring
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        return cls(shm, spec['shape'], spec['slots'])
+    
+    @property
+    def spec(self) -> Dict:
+        """Picklable description used to attach to the ring."""
+        return {'name': self.shm.name, 'shape': self.shape, 'slots': self.slots}
+    
+    def slot(self, index: int) -> np.ndarray:
+        """
+        Get a slot as a frame array without copying it.
+        
+        Args:
+            index: Slot index
+            
+        Returns:
+            Writable view of the slot
+        """
+        return self.frames[index]
+    
+    def close(self) -> None:
+        """Detach from the shared memory block."""
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Frames handed out are still referenced, it is released on exit
+            pass
+    
+    def unlink(self) -> None:
+        """Detach from and free the shared memory block."""
+        self.close()
+        self.shm.unlink()
+
+
+def _capture_process(source: Union[int, str], slots: int, messages, free_slots,
+                     stop) -> None:
+    """
+    Read frames into the shared ring until stopped or the stream ends.
+    
+    Args:
+        source: Camera index or video path
+        slots: Number of ring slots
+        messages: Queue receiving ('ready', spec), ('frame', slot, frames_read),
+            ('end', frames_read) and ('error', message) messages
+        free_slots: Queue of slot indexes the consumer has released
+        stop: Event that stops the capture
+    """
+    # The consumer handles Ctrl+C and stops the capture through the event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cam = cv2.VideoCapture(source)
+    ret, frame = cam.read() if cam.isOpened() else (False, None)
+    if not ret:
+        cam.release()
+        messages.put(('error', "Could not access camera"))
+        return
+    
+    ring = FrameRing.create(frame.shape, slots)
+    messages.put(('ready', ring.spec))
+    scratch = np.empty_like(frame)
+    ring.slot(0)[:] = frame
+    slot, frames_read = 0, 1
+    
+    try:
+        while not stop.is_set():
+            if slot is not None:
+                messages.put(('frame', slot, frames_read))
+            try:
+                slot = free_slots.get_nowait()
+            except queue.Empty:
+                # Consumer holds every slot, keep the camera drained anyway
+                slot = None
+            
+            # Decode straight into the shared slot
+            ret, _ = cam.read(ring.slot(slot) if slot is not None else scratch)
+            if not ret:
+                break
+            frames_read += 1
+    finally:
+        messages.put(('end', frames_read))
+        cam.release()
+        ring.close()
+
+
+class SharedMemoryFrameSource:
+    """Frame source backed by a capture process and a shared frame ring."""
+    
+    def __init__(self, source: Union[int, str] = CAMERA_INDEX,
+                 slots: int = FRAME_RING_SLOTS, hold: Optional[int] = None):
+        """
+        Start the capture process.
+        
+        A frame returned by read() stays valid for the next `hold` reads,
+        after which its slot is given back to the capture process.
+        
+        Args:
+            source: Camera index or video path passed to cv2.VideoCapture
+            slots: Number of frame slots in the ring
+            hold: Frames the consumer may keep at once, at most slots - 2
+        """
+        self.slots = max(3, slots)
+        self.hold = max(1, min(hold or self.slots - 2, self.slots - 2))
+        self.ring = None
+        self.frames_read = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self._held = deque()
+        self._ended = False
+        self._opened = None
+        
+        ctx = mp.get_context('spawn')
+        self._messages = ctx.Queue()
+        self._free = ctx.Queue()
+        self._stop = ctx.Event()
+        for index in range(1, self.slots):
+            self._free.put(index)
+        self._process = ctx.Process(
+            target=_capture_process,
+            args=(source, self.slots, self._messages, self._free, self._stop),
+            daemon=True
+        )
+        self._process.start()
+    
+    def is_opened(self, timeout: float = 10.0) -> bool:
+        """
+        Wait for the capture process to open the camera.
+        
+        Args:
+            timeout: Seconds to wait for the first frame
+            
+        Returns:
+            True if the camera is open, False otherwise
+        """
+        if self._opened is None:
+            try:
+                message = self._messages.get(timeout=timeout)
+            except queue.Empty:
+                message = ('error', "Timed out opening camera")
+            self._opened = message[0] == 'ready'
+            if self._opened:
+                self.ring = FrameRing.attach(message[1])
+        return self._opened
+    
+    def start(self) -> 'SharedMemoryFrameSource':
+        """
+        Start delivering frames. The capture process already runs.
+        
+        Returns:
+            The frame source itself, for chaining
+        """
+        return self
+    
+    def read(self, timeout: float = FRAME_READ_TIMEOUT) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Get the freshest frame that has not been returned yet.
+        
+        Older frames waiting in the queue are released unread and counted in
+        frames_dropped, as are frames the capture process had to skip.
+        
+        Args:
+            timeout: Seconds to wait for a new frame
+            
+        Returns:
+            Tuple of (success: bool, frame) where frame is a view into shared memory
+        """
+        if self._ended or not self.is_opened() or self.ring is None:
+            return False, None
+        
+        latest = None
+        block = True
+        while True:
+            try:
+                message = self._messages.get(block, timeout if block else None)
+            except queue.Empty:
+                break
+            block = False
+            if message[0] == 'frame':
+                if latest is not None:
+                    self._free.put(latest)
+                latest = message[1]
+                self.frames_read = message[2]
+            elif message[0] == 'end':
+                self.frames_read = message[1]
+                self._ended = True
+                break
+        
+        if latest is None:
+            return False, None
+        
+        self.frames_delivered += 1
+        self.frames_dropped = self.frames_read - self.frames_delivered
+        self._held.append(latest)
+        while len(self._held) > self.hold:
+            self._free.put(self._held.popleft())
+        return True, self.ring.slot(latest)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get frame counters for the current session.
+        
+        Returns:
+            Dictionary with frames read, delivered and dropped
+        """
+        return {
+            'frames_read': self.frames_read,
+            'frames_delivered': self.frames_delivered,
+            'frames_dropped': self.frames_dropped
+        }
+    
+    def release(self) -> None:
+        """Stop the capture process and free the ring."""
+        self._stop.set()
+        self._process.join(timeout=FRAME_READ_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+        
+        # The ring outlives the capture process, so it is freed here
+        if self.is_opened(timeout=0) and self.ring is not None:
+            self.ring.unlink()
+            self.ring = None
+    
+    def __enter__(self) -> 'SharedMemoryFrameSource':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+
+def open_frame_source(source: Union[int, str] = CAMERA_INDEX,
+                      transport: str = FRAME_TRANSPORT, hold: Optional[int] = None):
+    """
+    Open a camera with the configured frame transport.
+    
+    Args:
+        source: Camera index or video path
+        transport: 'thread' for an in-process reader thread, 'shared_memory'
+            for a capture process with a shared frame ring
+        hold: Frames the consumer may keep at once (shared_memory only)
+        
+    Returns:
+        FrameSource or SharedMemoryFrameSource
+    """
+    if transport == 'shared_memory':
+        slots = max(FRAME_RING_SLOTS, (hold or 0) + 2)
+        return SharedMemoryFrameSource(source, slots=slots, hold=hold)
+    return FrameSource(source)
@@ -0,0 +1,173 @@
+"""
+Memory-mapped training gallery for the attendance system.
+
+This module stores every training face as a fixed-size uint8 crop in one
+memory-mapped array, next to a label array and an offset index of the
+contiguous runs of each label. Training can slice or iterate over it
+without decoding images or holding them all in RAM.
+"""
+
+import cv2
+import os
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from config.config import GALLERY_DIR, GALLERY_FACE_SIZE
+from src.image_store import (
+    PACK_EXTENSION, parse_image_label, read_pack, read_pack_header
+)
+
+GALLERY_FACES_FILE = 'faces.npy'
+GALLERY_LABELS_FILE = 'labels.npy'
+GALLERY_INDEX_FILE = 'index.npy'
+
+
+class FaceGallery:
+    """Class for reading the memory-mapped training gallery."""
+    
+    def __init__(self, directory: str = str(GALLERY_DIR)):
+        """
+        Open an existing gallery.
+        
+        Args:
+            directory: Directory holding the gallery files
+        """
+        path = os.path.join(directory, GALLERY_FACES_FILE)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Training gallery not found at {directory}")
+        
+        self.directory = directory
+        self.faces = np.load(path, mmap_mode='r')
+        self.labels = np.load(os.path.join(directory, GALLERY_LABELS_FILE))
+        self.index = np.load(os.path.join(directory, GALLERY_INDEX_FILE))
+    
+    def __len__(self) -> int:
+        return len(self.labels)
+    
+    @property
+    def face_size(self) -> Tuple[int, int]:
+        """Size of every crop as (width, height)."""
+        return self.faces.shape[2], self.faces.shape[1]
+    
+    def samples(self, label: int) -> List[np.ndarray]:
+        """
+        Get the crops of one label as views into the memory map.
+        
+        Args:
+            label: Recognizer label
+            
+        Returns:
+            One array view per contiguous run of the label
+        """
+        return [
+            self.faces[start:start + count]
+            for run_label, start, count in self.index if run_label == label
+        ]
+    
+    def batches(self, batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Iterate over the gallery in batches without copying the crops.
+        
+        Args:
+            batch_size: Number of crops per batch
+            
+        Yields:
+            Tuple of (crops view of shape (n, height, width), labels)
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.faces[start:start + batch_size], self.labels[start:start + batch_size]
+    
+    @classmethod
+    def build(cls, image_dir: str, directory: str = str(GALLERY_DIR),
+              face_size: Tuple[int, int] = GALLERY_FACE_SIZE
+              ) -> Tuple['FaceGallery', Dict[str, int]]:
+        """
+        Build the gallery from a training image directory.
+        
+        Files are decoded one at a time and resized straight into the
+        memory-mapped array, so memory use does not grow with the gallery.
+        
+        Args:
+            image_dir: Training image directory with packs and/or JPEGs
+            directory: Directory to write the gallery files to
+            face_size: Size of the normalized crops as (width, height)
+            
+        Returns:
+            Tuple of (gallery, samples included per training file name)
+        """
+        os.makedirs(directory, exist_ok=True)
+        
+        # First pass: count the samples so the memory map can be allocated
+        entries = []
+        for filename in sorted(os.listdir(image_dir)):
+            path = os.path.join(image_dir, filename)
+            if filename.endswith(PACK_EXTENSION):
+                try:
+                    header = read_pack_header(path)
+                except (OSError, ValueError) as e:
+                    print(f"Error processing {path}: {str(e)}")
+                    continue
+                if header.label >= 0 and header.count:
+                    entries.append((filename, header.label, header.count))
+            elif filename.endswith(('.jpg', '.jpeg', '.png')):
+                label = parse_image_label(filename)
+                if label is not None and label >= 0:
+                    entries.append((filename, label, 1))
+        
+        width, height = face_size
+        total = sum(count for _, _, count in entries)
+        tmp_faces = os.path.join(directory, GALLERY_FACES_FILE + '.tmp')
+        faces = np.lib.format.open_memmap(
+            tmp_faces, mode='w+', dtype=np.uint8, shape=(total, height, width)
+        )
+        labels = np.empty(total, dtype=np.int32)
+        runs = []
+        sources = {}
+        
+        # Second pass: decode, normalize and write each crop in place
+        position = 0
+        for filename, label, count in entries:
+            path = os.path.join(image_dir, filename)
+            if filename.endswith(PACK_EXTENSION):
+                # Only the counted crops have a slot, a pack can grow meanwhile
+                crops = read_pack(path).faces[:count]
+            else:
+                crop = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+                crops = [] if crop is None else [crop]
+                if crop is None:
+                    print(f"Error processing {path}: could not decode image")
+            
+            start = position
+            for crop in crops:
+                cv2.resize(crop, (width, height), dst=faces[position],
+                           interpolation=cv2.INTER_AREA)
+                position += 1
+            if position == start:
+                continue
+            
+            labels[start:position] = label
+            sources[filename] = position - start
+            if runs and runs[-1][0] == label and runs[-1][1] + runs[-1][2] == start:
+                runs[-1][2] += position - start
+            else:
+                runs.append([label, start, position - start])
+        
+        faces.flush()
+        del faces
+        if position < total:
+            # Drop the slots of images that could not be decoded
+            full = np.load(tmp_faces, mmap_mode='r')
+            trimmed = np.lib.format.open_memmap(
+                tmp_faces + '.trim', mode='w+', dtype=np.uint8,
+                shape=(position, height, width)
+            )
+            trimmed[:] = full[:position]
+            trimmed.flush()
+            del full, trimmed
+            os.replace(tmp_faces + '.trim', tmp_faces)
+        
+        np.save(os.path.join(directory, GALLERY_LABELS_FILE), labels[:position])
+        np.save(os.path.join(directory, GALLERY_INDEX_FILE),
+                np.array(runs, dtype=np.int64).reshape(-1, 3))
+        os.replace(tmp_faces, os.path.join(directory, GALLERY_FACES_FILE))
+        
+        return cls(directory), sources
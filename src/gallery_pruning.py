@@ -0,0 +1,180 @@
+"""
+Gallery pruning for the attendance system.
+
+This module bounds the LBPH gallery to a few representative histograms
+per student. Farthest-point selection under the recognizer's chi-square
+distance seeds one cluster per kept sample, and a few k-medoids passes
+move each seed to the centre of its cluster, so the kept set covers the
+spread of a student's training images without favouring outliers such
+as motion-blurred frames.
+"""
+
+import time
+from typing import Dict, Optional
+import numpy as np
+from src.recognition import LBPHMatcher
+
+
+def _with_rows(matcher: LBPHMatcher, rows: np.ndarray) -> LBPHMatcher:
+    """Build a matcher holding only the given gallery rows."""
+    return LBPHMatcher(
+        matcher.histograms[rows], matcher.labels[rows],
+        radius=matcher.radius, neighbors=matcher.neighbors,
+        grid_x=matcher.grid_x, grid_y=matcher.grid_y,
+        threshold=matcher.threshold, block_size=matcher.block_size
+    )
+
+
+def farthest_point_selection(histograms: np.ndarray, count: int) -> np.ndarray:
+    """
+    Choose a diverse subset of histograms.
+    
+    The first pick is the medoid, the histogram with the smallest total
+    distance to the others. Each further pick is the histogram farthest
+    from everything picked so far.
+    
+    Args:
+        histograms: Histograms of one label, one row per sample
+        count: Number of samples to keep
+        
+    Returns:
+        Row indexes of the kept samples, in selection order
+    """
+    histograms = np.asarray(histograms, dtype=np.float32)
+    if count >= len(histograms):
+        return np.arange(len(histograms))
+    return _farthest_points(_pairwise_distances(histograms), count)
+
+
+def _pairwise_distances(histograms: np.ndarray) -> np.ndarray:
+    """Chi-square distances between every pair of histograms."""
+    return LBPHMatcher(histograms, np.zeros(len(histograms))).distances(histograms)
+
+
+def _farthest_points(dists: np.ndarray, count: int) -> np.ndarray:
+    """Farthest-point selection on a precomputed distance matrix."""
+    selected = [int(np.argmin(dists.sum(axis=1)))]
+    nearest = dists[selected[0]].copy()
+    while len(selected) < count:
+        pick = int(np.argmax(nearest))
+        selected.append(pick)
+        np.minimum(nearest, dists[pick], out=nearest)
+    return np.array(selected)
+
+
+def representative_samples(histograms: np.ndarray, count: int,
+                           iterations: int = 5) -> np.ndarray:
+    """
+    Choose representative histograms by k-medoids clustering.
+    
+    Clusters are seeded by farthest-point selection. Each pass assigns
+    every histogram to its nearest medoid and replaces each medoid with
+    the member that has the smallest total distance to its cluster.
+    
+    Args:
+        histograms: Histograms of one label, one row per sample
+        count: Number of samples to keep
+        iterations: Maximum number of k-medoids passes
+        
+    Returns:
+        Row indexes of the kept samples
+    """
+    histograms = np.asarray(histograms, dtype=np.float32)
+    if count >= len(histograms):
+        return np.arange(len(histograms))
+    
+    dists = _pairwise_distances(histograms)
+    medoids = _farthest_points(dists, count)
+    for _ in range(iterations):
+        assigned = np.argmin(dists[:, medoids], axis=1)
+        updated = medoids.copy()
+        for cluster in range(count):
+            members = np.flatnonzero(assigned == cluster)
+            if len(members):
+                within = dists[np.ix_(members, members)].sum(axis=1)
+                updated[cluster] = members[np.argmin(within)]
+        if np.array_equal(np.sort(updated), np.sort(medoids)):
+            break
+        medoids = updated
+    return medoids
+
+
+def prune_gallery(matcher: LBPHMatcher, max_per_label: int) -> LBPHMatcher:
+    """
+    Keep at most max_per_label representative samples of every label.
+    
+    Args:
+        matcher: Matcher holding the full gallery
+        max_per_label: Samples kept per label, 0 to keep every sample
+        
+    Returns:
+        Matcher holding the pruned gallery, the same matcher if nothing is pruned
+    """
+    if max_per_label <= 0:
+        return matcher
+    
+    labels, counts = np.unique(matcher.labels, return_counts=True)
+    if counts.size == 0 or counts.max() <= max_per_label:
+        return matcher
+    
+    histograms = matcher.histograms
+    keep = []
+    for label in labels:
+        rows = np.flatnonzero(matcher.labels == label)
+        keep.append(rows[representative_samples(histograms[rows], max_per_label)])
+    return _with_rows(matcher, np.sort(np.concatenate(keep)))
+
+
+def _score(matcher: LBPHMatcher, queries: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Measure accuracy and per-query predict latency on held-out histograms."""
+    start = time.perf_counter()
+    predictions = matcher.predict_histograms(queries)
+    elapsed = time.perf_counter() - start
+    correct = sum(label == predicted for label, (predicted, _) in zip(labels, predictions))
+    return {
+        'samples': len(matcher),
+        'size_mb': matcher.gallery.nbytes / 1e6,
+        'latency_ms': elapsed / max(len(queries), 1) * 1e3,
+        'accuracy': correct / max(len(queries), 1)
+    }
+
+
+def evaluate_pruning(matcher: LBPHMatcher, max_per_label: int,
+                     holdout: float = 0.2,
+                     seed: Optional[int] = 0) -> Dict[str, Dict[str, float]]:
+    """
+    Compare the full and the pruned gallery on a held-out split.
+    
+    A share of every label's samples is held out as queries. The rest
+    forms the full gallery, which is then pruned, and both galleries are
+    scored on the held-out queries.
+    
+    Args:
+        matcher: Matcher holding the full gallery
+        max_per_label: Samples kept per label
+        holdout: Share of each label's samples held out, labels with a
+            single sample are never held out
+        seed: Seed of the random split
+        
+    Returns:
+        Dictionary with 'full' and 'pruned' results, each holding the
+        gallery samples, size in MB, predict latency in ms and accuracy
+    """
+    rng = np.random.default_rng(seed)
+    held = []
+    for label in np.unique(matcher.labels):
+        rows = np.flatnonzero(matcher.labels == label)
+        count = min(int(round(len(rows) * holdout)), len(rows) - 1)
+        if count > 0:
+            held.append(rng.choice(rows, count, replace=False))
+    held = np.sort(np.concatenate(held)) if held else np.array([], dtype=np.int64)
+    train = np.setdiff1d(np.arange(len(matcher)), held)
+    
+    full = _with_rows(matcher, train)
+    pruned = prune_gallery(full, max_per_label)
+    queries = matcher.histograms[held]
+    labels = matcher.labels[held]
+    return {
+        'full': _score(full, queries, labels),
+        'pruned': _score(pruned, queries, labels)
+    }
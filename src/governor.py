@@ -0,0 +1,163 @@
+"""
+Adaptive performance governor for attendance tracking.
+
+This module measures how long the tracking loop spends on each frame and
+trades detection quality for speed to hold a target frame rate. When
+frames take too long it first detects less often, then detects on a
+smaller frame, then searches fewer cascade scales. With spare time it
+searches more scales, then detects on a larger frame, then detects more
+often. Either direction first retraces the steps of the other, so the
+settings settle instead of drifting. Every adjustment is logged so
+defaults can be tuned per hardware class.
+"""
+
+import logging
+import time
+from typing import Dict, List, Tuple
+from config.config import (
+    TARGET_FPS, GOVERNOR_WINDOW, GOVERNOR_HEADROOM, GOVERNOR_INTERVAL_RANGE,
+    GOVERNOR_SCALE_RANGE, GOVERNOR_SCALE_FACTOR_RANGE
+)
+from src.detection import FaceDetector
+
+logger = logging.getLogger(__name__)
+
+# Step sizes of the three settings
+INTERVAL_STEP = 1
+SCALE_STEP = 0.1
+SCALE_FACTOR_STEP = 0.05
+
+
+class PerformanceGovernor:
+    """Class for adjusting detection settings to hold a target frame rate."""
+    
+    def __init__(self, detector: FaceDetector, detection_interval: int,
+                 target_fps: float = TARGET_FPS,
+                 window: int = GOVERNOR_WINDOW,
+                 headroom: float = GOVERNOR_HEADROOM,
+                 interval_range: Tuple[int, int] = GOVERNOR_INTERVAL_RANGE,
+                 scale_range: Tuple[float, float] = GOVERNOR_SCALE_RANGE,
+                 scale_factor_range: Tuple[float, float] = GOVERNOR_SCALE_FACTOR_RANGE):
+        """
+        Initialize the governor.
+        
+        Args:
+            detector: Detector whose scale and cascade scale factor are adjusted
+            detection_interval: Initial number of frames between full detections
+            target_fps: Frame rate to hold
+            window: Frames measured before each decision
+            headroom: Quality is raised when frames take less than this share
+                of the frame budget
+            interval_range: Bounds of the detection interval
+            scale_range: Bounds of the detection scale
+            scale_factor_range: Bounds of the cascade scale factor
+        """
+        self.detector = detector
+        self.detection_interval = detection_interval
+        self.budget = 1.0 / target_fps
+        self.window = max(1, window)
+        self.headroom = headroom
+        self.interval_range = interval_range
+        self.scale_range = scale_range
+        self.scale_factor_range = scale_factor_range
+        self.adjustments: List[Dict] = []
+        # Applied steps as (setting, previous value, direction), so the
+        # opposite direction retraces them instead of moving another setting
+        self._steps: List[Tuple[str, float, int]] = []
+        self._total = 0.0
+        self._frames = 0
+        self._started = None
+    
+    def frame_started(self) -> None:
+        """Mark the start of work on a frame."""
+        self._started = time.perf_counter()
+    
+    def frame_finished(self) -> None:
+        """Mark the end of work on a frame and adjust once a window is measured."""
+        if self._started is None:
+            return
+        self._total += time.perf_counter() - self._started
+        self._started = None
+        self._frames += 1
+        if self._frames < self.window:
+            return
+        
+        latency = self._total / self._frames
+        self._total, self._frames = 0.0, 0
+        if latency > self.budget:
+            self._slow_down(latency)
+        elif latency < self.budget * self.headroom:
+            self._speed_up(latency)
+    
+    def _slow_down(self, latency: float) -> None:
+        """Make detection cheaper by one step, undoing the last speed-up first."""
+        if self._steps and self._steps[-1][2] > 0:
+            setting, old, _ = self._steps.pop()
+            self._adjust(setting, old, latency)
+            return
+        
+        detector = self.detector
+        if self.detection_interval < self.interval_range[1]:
+            step = ('detection_interval', self.detection_interval + INTERVAL_STEP)
+        elif detector.scale > self.scale_range[0]:
+            step = ('detection_scale',
+                    max(self.scale_range[0], round(detector.scale - SCALE_STEP, 2)))
+        elif detector.scale_factor < self.scale_factor_range[1]:
+            step = ('scale_factor', min(self.scale_factor_range[1],
+                                        round(detector.scale_factor + SCALE_FACTOR_STEP, 2)))
+        else:
+            return
+        self._steps.append((step[0], self.settings()[step[0]], -1))
+        self._adjust(step[0], step[1], latency)
+    
+    def _speed_up(self, latency: float) -> None:
+        """Make detection more thorough by one step, undoing the last slow-down first."""
+        if self._steps and self._steps[-1][2] < 0:
+            setting, old, _ = self._steps.pop()
+            self._adjust(setting, old, latency)
+            return
+        
+        detector = self.detector
+        if detector.scale_factor > self.scale_factor_range[0]:
+            step = ('scale_factor', max(self.scale_factor_range[0],
+                                        round(detector.scale_factor - SCALE_FACTOR_STEP, 2)))
+        elif detector.scale < self.scale_range[1]:
+            step = ('detection_scale',
+                    min(self.scale_range[1], round(detector.scale + SCALE_STEP, 2)))
+        elif self.detection_interval > self.interval_range[0]:
+            step = ('detection_interval', self.detection_interval - INTERVAL_STEP)
+        else:
+            return
+        self._steps.append((step[0], self.settings()[step[0]], 1))
+        self._adjust(step[0], step[1], latency)
+    
+    def _adjust(self, setting: str, value, latency: float) -> None:
+        """Apply and log one adjustment."""
+        old = self.settings()[setting]
+        if setting == 'detection_interval':
+            self.detection_interval = value
+        elif setting == 'detection_scale':
+            self.detector.configure(scale=value)
+        else:
+            self.detector.configure(scale_factor=value)
+        
+        self.adjustments.append({
+            'time': time.time(), 'setting': setting, 'old': old, 'new': value,
+            'latency_ms': latency * 1e3
+        })
+        logger.info("%s %s -> %s (frame latency %.1f ms, budget %.1f ms)",
+                    setting, old, value, latency * 1e3, self.budget * 1e3)
+    
+    def settings(self) -> Dict[str, float]:
+        """
+        Get the current detection settings.
+        
+        Returns:
+            Dictionary with detection_interval, detection_scale and scale_factor
+        """
+        return {
+            'detection_interval': self.detection_interval,
+            'detection_scale': self.detector.scale,
+            'scale_factor': self.detector.scale_factor
+        }
+
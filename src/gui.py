@@ -14,12 +14,13 @@ from config.config import (
     WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_BG_COLOR,
     FRAME_BG_COLOR, BUTTON_BG_COLOR, BUTTON_FG_COLOR, HEADER_BG_COLOR,
     FONT_LARGE, FONT_MEDIUM, FONT_SMALL, FONT_BUTTON, CONTACT_EMAIL,
-    MONTH_NAMES
+    MONTH_NAMES, CAMERA_SOURCES
 )
 from src.utils import get_current_timestamp, format_date, format_time, parse_date
 from src.face_detection import FaceCapture, check_haarcascade_file
 from src.training import FaceTrainer
 from src.attendance import AttendanceTracker
+from src.multi_camera import MultiCameraTracker
 from src.password_manager import PasswordManager
 
 
@@ -307,6 +308,10 @@ class AttendanceSystemGUI:
         menubar = tk.Menu(self.window, relief='ridge')
         filemenu = tk.Menu(menubar, tearoff=0)
         filemenu.add_command(label='Change Password', command=self._change_password)
+        filemenu.add_command(
+            label='Rebuild Model',
+            command=lambda: self._save_profile(rebuild=True)
+        )
         filemenu.add_command(label='Contact Us', command=self._show_contact)
         filemenu.add_command(label='Exit', command=self.window.destroy)
         menubar.add_cascade(label='Help', font=FONT_LARGE, menu=filemenu)
@@ -356,8 +361,13 @@ class AttendanceSystemGUI:
         if success:
             self._update_registration_count()
     
-    def _save_profile(self):
-        """Handle saving/training the profile."""
+    def _save_profile(self, rebuild: bool = False):
+        """
+        Handle saving/training the profile.
+        
+        Args:
+            rebuild: Retrain the model from every image instead of updating it
+        """
         if not self.password_manager.password_exists():
             password = tsd.askstring(
                 'Password Required',
@@ -379,7 +389,7 @@ class AttendanceSystemGUI:
                 mess._show(title='Wrong Password', message='Incorrect password!')
                 return
         
-        success, message, num_reg = self.face_trainer.train_model()
+        success, message, num_reg = self.face_trainer.train_model(rebuild=rebuild)
         self.message1.configure(text=message)
         
         if success:
@@ -401,7 +411,10 @@ class AttendanceSystemGUI:
             self.tv.delete(item)
         
         try:
-            tracker = AttendanceTracker()
+            if len(CAMERA_SOURCES) > 1:
+                tracker = MultiCameraTracker(CAMERA_SOURCES)
+            else:
+                tracker = AttendanceTracker()
             
             def update_ui(student_id, name, date, time):
                 """Callback to update treeview."""
@@ -505,10 +518,10 @@ class AttendanceSystemGUI:
     
     def _update_registration_count(self):
         """Update the registration count display."""
-        from src.utils import count_csv_entries
-        from config.config import STUDENT_DETAILS_CSV
+        from src.storage import open_storage
         
-        count = count_csv_entries(str(STUDENT_DETAILS_CSV))
+        with open_storage() as storage:
+            count = storage.student_count()
         self.message.configure(text=f'Total Registrations: {count}')
     
     def run(self):
@@ -0,0 +1,353 @@
+"""
+Packed training image store for the attendance system.
+
+This module keeps all face crops of a student in a single .pack file
+instead of one JPEG per sample. A pack is laid out as:
+    
+    header   magic, version, label, serial, student ID and name
+    data     raw uint8 grayscale crops, back to back
+    index    (offset, height, width) of every sample
+    footer   index offset, sample count, magic
+
+Appending writes the new samples, a new index and a new footer after the
+old footer. The previous footer stays valid until the new one is on disk,
+so a write that is cut short leaves the earlier samples readable.
+"""
+
+import cv2
+import os
+import struct
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+PACK_EXTENSION = '.pack'
+PACK_MAGIC = b'FPAK'
+PACK_VERSION = 1
+
+_HEADER = struct.Struct('<4sHii')
+_STRING_LENGTH = struct.Struct('<H')
+_INDEX_ENTRY = struct.Struct('<QII')
+_FOOTER = struct.Struct('<QI4s')
+
+
+class FacePack(NamedTuple):
+    """Contents of a packed per-student image file."""
+    label: int
+    serial: int
+    student_id: str
+    name: str
+    faces: List[np.ndarray]
+    count: int
+
+
+def pack_file_name(serial: int, student_id: str) -> str:
+    """
+    Get the pack file name for a student.
+    
+    Args:
+        serial: Serial number
+        student_id: Student ID
+        
+    Returns:
+        File name of the student's pack
+    """
+    return f"{student_id}.{serial}{PACK_EXTENSION}"
+
+
+def student_label(student_id: str) -> int:
+    """
+    Get the recognizer label of a student ID.
+    
+    Args:
+        student_id: Student ID
+        
+    Returns:
+        Numeric label, or -1 if the ID is not numeric
+    """
+    return int(student_id) if str(student_id).isdigit() else -1
+
+
+def parse_image_label(filename: str) -> Optional[int]:
+    """
+    Extract the student ID from a training image file name.
+    
+    Args:
+        filename: File name in the format name.serial.id.sample.jpg
+        
+    Returns:
+        Student ID, or None if the name has no valid ID
+    """
+    parts = filename.split('.')
+    if len(parts) < 3:
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
+def _encode_string(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return _STRING_LENGTH.pack(len(data)) + data
+
+
+def _decode_string(buffer: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = _STRING_LENGTH.unpack_from(buffer, offset)
+    offset += _STRING_LENGTH.size
+    return buffer[offset:offset + length].decode('utf-8'), offset + length
+
+
+def _find_footer(f) -> Tuple[int, int, int]:
+    """
+    Find the last valid footer of an open pack file.
+    
+    The footer at the end of the file is used when it is intact. A write
+    that was cut short leaves a torn tail, in which case the file is
+    searched backwards for the footer of the previous write.
+    
+    Args:
+        f: Pack file opened in binary mode
+        
+    Returns:
+        Tuple of (index offset, sample count, end of the footer)
+    """
+    size = f.seek(0, os.SEEK_END)
+    
+    def valid(end: int, index_offset: int, count: int, magic: bytes) -> bool:
+        return (magic == PACK_MAGIC and
+                index_offset + count * _INDEX_ENTRY.size + _FOOTER.size == end)
+    
+    if size >= _FOOTER.size:
+        f.seek(size - _FOOTER.size)
+        footer = _FOOTER.unpack(f.read(_FOOTER.size))
+        if valid(size, *footer):
+            return footer[0], footer[1], size
+    
+    f.seek(0)
+    buffer = f.read()
+    position = buffer.rfind(PACK_MAGIC)
+    while position >= _FOOTER.size - len(PACK_MAGIC):
+        end = position + len(PACK_MAGIC)
+        footer = _FOOTER.unpack_from(buffer, end - _FOOTER.size)
+        if valid(end, *footer):
+            return footer[0], footer[1], end
+        position = buffer.rfind(PACK_MAGIC, 0, position)
+    raise ValueError("Not a face pack file or the file is truncated")
+
+
+def _read_index(f) -> Tuple[int, List[Tuple[int, int, int]]]:
+    """
+    Read the footer and sample index of an open pack file.
+    
+    Args:
+        f: Pack file opened in binary mode
+        
+    Returns:
+        Tuple of (end of the footer, list of (offset, height, width))
+    """
+    index_offset, count, footer_end = _find_footer(f)
+    f.seek(index_offset)
+    data = f.read(count * _INDEX_ENTRY.size)
+    index = [
+        _INDEX_ENTRY.unpack_from(data, i * _INDEX_ENTRY.size)
+        for i in range(count)
+    ]
+    return footer_end, index
+
+
+def write_pack(path: str, faces: Sequence[np.ndarray], label: int, serial: int,
+               student_id: str, name: str) -> int:
+    """
+    Write face crops to a pack, appending to it if it already exists.
+    
+    Args:
+        path: Path of the pack file
+        faces: Grayscale face crops
+        label: Recognizer label of the student
+        serial: Serial number
+        student_id: Student ID
+        name: Student name
+        
+    Returns:
+        Total number of samples in the pack
+    """
+    if os.path.isfile(path):
+        f = open(path, 'r+b')
+        footer_end, index = _read_index(f)
+        # Only a torn tail after the last valid footer is dropped
+        f.seek(footer_end)
+        f.truncate()
+    else:
+        f = open(path, 'wb')
+        f.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, label, serial))
+        f.write(_encode_string(str(student_id)))
+        f.write(_encode_string(name))
+        index = []
+    
+    with f:
+        for face in faces:
+            face = np.ascontiguousarray(face, dtype=np.uint8)
+            index.append((f.tell(), face.shape[0], face.shape[1]))
+            f.write(face.tobytes())
+        
+        index_offset = f.tell()
+        f.write(b''.join(_INDEX_ENTRY.pack(*entry) for entry in index))
+        # The samples and index reach the disk before the footer that points at them
+        f.flush()
+        os.fsync(f.fileno())
+        f.write(_FOOTER.pack(index_offset, len(index), PACK_MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    
+    return len(index)
+
+
+def read_pack(path: str, start: int = 0) -> FacePack:
+    """
+    Read a pack file.
+    
+    The file is read with a single call and the returned faces are
+    views into that buffer.
+    
+    Args:
+        path: Path of the pack file
+        start: Index of the first sample to return
+        
+    Returns:
+        FacePack with the student details and samples from start onwards
+    """
+    with open(path, 'rb') as f:
+        _, index = _read_index(f)
+        f.seek(0)
+        buffer = f.read()
+    
+    magic, version, label, serial = _HEADER.unpack_from(buffer, 0)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"Unsupported face pack file: {path}")
+    student_id, offset = _decode_string(buffer, _HEADER.size)
+    name, _ = _decode_string(buffer, offset)
+    
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    faces = [
+        data[offset:offset + height * width].reshape(height, width)
+        for offset, height, width in index[start:]
+    ]
+    return FacePack(label, serial, student_id, name, faces, len(index))
+
+
+def read_pack_header(path: str) -> FacePack:
+    """
+    Read the student details and sample count of a pack without its data.
+    
+    Args:
+        path: Path of the pack file
+        
+    Returns:
+        FacePack with an empty faces list
+    """
+    with open(path, 'rb') as f:
+        footer_end, index = _read_index(f)
+        f.seek(0)
+        header = f.read(index[0][0] if index else footer_end)
+    
+    magic, version, label, serial = _HEADER.unpack_from(header, 0)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError(f"Unsupported face pack file: {path}")
+    student_id, offset = _decode_string(header, _HEADER.size)
+    name, _ = _decode_string(header, offset)
+    return FacePack(label, serial, student_id, name, [], len(index))
+
+
+def pack_sample_count(path: str) -> int:
+    """
+    Get the number of samples in a pack without reading its data.
+    
+    Args:
+        path: Path of the pack file
+        
+    Returns:
+        Number of samples
+    """
+    with open(path, 'rb') as f:
+        try:
+            return _find_footer(f)[1]
+        except ValueError:
+            raise ValueError(f"Not a face pack file: {path}")
+
+
+def migrate_image_directory(image_dir: str, manifest: Optional[Dict[str, int]] = None,
+                            backup_dir: Optional[str] = None
+                            ) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Convert loose training JPEGs into one pack per student.
+    
+    Samples already incorporated in the trained model are written first,
+    so the training manifest can keep counting them as the leading samples
+    of the pack. Packed images are moved out of the training directory so
+    they are not loaded twice.
+    
+    Args:
+        image_dir: Training image directory
+        manifest: Training manifest mapping file names to incorporated samples
+        backup_dir: Directory to move the packed images to, None deletes them
+        
+    Returns:
+        Tuple of (updated manifest, mapping of pack file name to samples packed)
+    """
+    manifest = dict(manifest or {})
+    if backup_dir is not None:
+        os.makedirs(backup_dir, exist_ok=True)
+    
+    groups = OrderedDict()
+    for filename in sorted(os.listdir(image_dir)):
+        if not filename.endswith(('.jpg', '.jpeg', '.png')):
+            continue
+        # Format: name.serial.id.sample.jpg
+        parts = filename.split('.')
+        if len(parts) < 5 or not parts[1].isdigit():
+            continue
+        key = (parts[0].strip(), int(parts[1]), parts[2])
+        groups.setdefault(key, []).append(filename)
+    
+    def sample_order(filename: str) -> Tuple[bool, int]:
+        sample = filename.split('.')[3]
+        return filename not in manifest, int(sample) if sample.isdigit() else 0
+    
+    packed = {}
+    for (name, serial, student_id), filenames in groups.items():
+        faces, packed_files = [], []
+        for filename in sorted(filenames, key=sample_order):
+            face = cv2.imread(os.path.join(image_dir, filename), cv2.IMREAD_GRAYSCALE)
+            if face is None:
+                print(f"Error processing {filename}: could not decode image")
+                continue
+            faces.append(face)
+            packed_files.append(filename)
+        if not faces:
+            continue
+        
+        pack_name = pack_file_name(serial, student_id)
+        pack_path = os.path.join(image_dir, pack_name)
+        existing = pack_sample_count(pack_path) if os.path.isfile(pack_path) else 0
+        write_pack(pack_path, faces, student_label(student_id), serial, student_id, name)
+        
+        # Incorporated samples only extend the manifest entry if they directly
+        # follow samples that are already in the model
+        incorporated = manifest.get(pack_name, 0)
+        if incorporated == existing:
+            incorporated += sum(1 for f in packed_files if f in manifest)
+        for filename in packed_files:
+            manifest.pop(filename, None)
+        if incorporated:
+            manifest[pack_name] = incorporated
+        packed[pack_name] = len(packed_files)
+        
+        for filename in packed_files:
+            if backup_dir is None:
+                os.remove(os.path.join(image_dir, filename))
+            else:
+                os.replace(os.path.join(image_dir, filename),
+                           os.path.join(backup_dir, filename))
+    
+    return manifest, packed
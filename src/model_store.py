@@ -0,0 +1,81 @@
+"""
+Binary model storage for the attendance system.
+
+This module saves trained LBPH models as an uncompressed .npz archive
+holding the histogram matrix, labels and LBPH parameters, so loading
+is a few contiguous reads instead of parsing a YAML file.
+"""
+
+import cv2
+import os
+import numpy as np
+from src.recognition import LBPHMatcher
+
+MODEL_FORMAT_VERSION = 1
+
+
+def save_model(path: str, matcher: LBPHMatcher) -> None:
+    """
+    Atomically save an LBPH gallery in the binary model format.
+    
+    Args:
+        path: Destination .npz file
+        matcher: Matcher holding the histograms, labels and LBPH parameters
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            version=np.int32(MODEL_FORMAT_VERSION),
+            gallery=matcher.gallery,
+            labels=matcher.labels,
+            params=np.array([matcher.radius, matcher.neighbors,
+                             matcher.grid_x, matcher.grid_y], dtype=np.int32),
+            threshold=np.float64(matcher.threshold)
+        )
+    os.replace(tmp_path, path)
+
+
+def load_model(path: str) -> LBPHMatcher:
+    """
+    Load an LBPH gallery saved with save_model.
+    
+    Args:
+        path: Path of the .npz model file
+        
+    Returns:
+        Matcher ready for prediction
+    """
+    with np.load(path) as data:
+        if int(data['version']) != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version in {path}")
+        radius, neighbors, grid_x, grid_y = (int(v) for v in data['params'])
+        # The gallery is stored bin-major, so its transpose is passed through
+        # to the matcher without a copy
+        return LBPHMatcher(
+            data['gallery'].T,
+            data['labels'],
+            radius=radius,
+            neighbors=neighbors,
+            grid_x=grid_x,
+            grid_y=grid_y,
+            threshold=float(data['threshold'])
+        )
+
+
+def convert_yaml_model(yaml_path: str, binary_path: str) -> LBPHMatcher:
+    """
+    Convert a model saved by recognizer.save() to the binary format.
+    
+    Args:
+        yaml_path: Path of the existing Trainner.yml
+        binary_path: Destination .npz file
+        
+    Returns:
+        Matcher holding the converted model
+    """
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(yaml_path)
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    save_model(binary_path, matcher)
+    return matcher
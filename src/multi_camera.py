@@ -0,0 +1,263 @@
+"""
+Multi-camera attendance tracking for the attendance system.
+
+This module runs one worker process per camera or video source. The
+trained model is loaded once and placed in shared memory, and every worker
+matches against that single read-only copy. Recognitions are sent back to
+one sink in the parent process, which marks each student only once even
+if they are seen by several cameras.
+"""
+
+import cv2
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from config.config import (
+    CAMERA_SOURCES, DETECTION_INTERVAL, LOG_LEVEL, LOG_FORMAT
+)
+from src.attendance import AttendanceTracker
+from src.attendance_log import AttendanceSink, AttendanceWriter
+from src.recognition import LBPHMatcher
+
+
+class SharedModel:
+    """LBPH gallery placed in a shared memory block."""
+    
+    def __init__(self, shm: shared_memory.SharedMemory, spec: Dict):
+        """
+        Wrap a shared memory block holding a model.
+        
+        Args:
+            shm: Shared memory block with the gallery followed by the labels
+            spec: Model description returned by the spec attribute
+        """
+        self.shm = shm
+        self.spec = spec
+    
+    @classmethod
+    def create(cls, matcher: LBPHMatcher) -> 'SharedModel':
+        """
+        Copy a loaded model into a new shared memory block.
+        
+        Args:
+            matcher: Loaded model
+            
+        Returns:
+            Shared model owned by the caller, who must unlink it
+        """
+        gallery = matcher.gallery
+        labels = matcher.labels
+        shm = shared_memory.SharedMemory(create=True,
+                                         size=max(1, gallery.nbytes + labels.nbytes))
+        np.ndarray(gallery.shape, np.float32, buffer=shm.buf)[:] = gallery
+        np.ndarray(labels.shape, np.int32, buffer=shm.buf, offset=gallery.nbytes)[:] = labels
+        spec = {
+            'name': shm.name,
+            'shape': gallery.shape,
+            'radius': matcher.radius,
+            'neighbors': matcher.neighbors,
+            'grid_x': matcher.grid_x,
+            'grid_y': matcher.grid_y,
+            'threshold': matcher.threshold
+        }
+        return cls(shm, spec)
+    
+    @classmethod
+    def attach(cls, spec: Dict) -> 'SharedModel':
+        """
+        Attach to a shared model created by another process.
+        
+        Workers are started with the spawn context and share the creating
+        process's resource tracker, so the block is unlinked only once.
+        
+        Args:
+            spec: Model description from the creating process
+            
+        Returns:
+            Shared model that only has to be closed
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        return cls(shm, spec)
+    
+    def matcher(self) -> LBPHMatcher:
+        """
+        Build a matcher that reads the shared gallery without copying it.
+        
+        Returns:
+            Matcher backed by the shared memory block
+        """
+        spec = self.spec
+        gallery = np.ndarray(spec['shape'], np.float32, buffer=self.shm.buf)
+        gallery.flags.writeable = False
+        labels = np.ndarray((spec['shape'][1],), np.int32, buffer=self.shm.buf,
+                            offset=gallery.nbytes)
+        return LBPHMatcher(
+            gallery.T,
+            labels,
+            radius=spec['radius'],
+            neighbors=spec['neighbors'],
+            grid_x=spec['grid_x'],
+            grid_y=spec['grid_y'],
+            threshold=spec['threshold']
+        )
+    
+    def close(self) -> None:
+        """Detach from the shared memory block."""
+        try:
+            self.shm.close()
+        except BufferError:
+            # A matcher still references the block, it is released on exit
+            pass
+    
+    def unlink(self) -> None:
+        """Free the shared memory block, called by the creating process."""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _camera_worker(source: Union[int, str], model_spec: Dict, events, stop,
+                   detection_interval: int, display: bool, num_threads: int) -> None:
+    """
+    Track one camera in a worker process and report recognitions.
+    
+    Args:
+        source: Camera index or video path
+        model_spec: Description of the shared model
+        events: Queue receiving ('recognized', source, label, row) and
+            ('finished', source, message) messages
+        stop: Event that stops every worker
+        detection_interval: Full cascade interval in frames
+        display: Show a window for this camera
+        num_threads: OpenCV threads for this worker
+    """
+    # The parent handles Ctrl+C and stops the workers through the event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cv2.setNumThreads(num_threads)
+    # Spawned workers start without the parent's logging setup
+    logging.basicConfig(level=LOG_LEVEL, format='[%(processName)s] ' + LOG_FORMAT)
+    model = SharedModel.attach(model_spec)
+    message = "finished"
+    try:
+        tracker = AttendanceTracker(detection_interval, matcher=model.matcher())
+        
+        def recognized(label: int, attendance: List) -> None:
+            events.put(('recognized', source, label, attendance))
+        
+        if not tracker.track(source, recognized, display=display, stop=stop,
+                             window_name=f"Taking Attendance ({source})"):
+            message = "could not access camera"
+        del tracker
+    except Exception as e:
+        message = f"failed: {str(e)}"
+    finally:
+        model.close()
+        events.put(('finished', source, message))
+
+
+class MultiCameraTracker:
+    """Class for tracking attendance from several cameras at once."""
+    
+    def __init__(self, sources: Sequence[Union[int, str]] = CAMERA_SOURCES,
+                 detection_interval: int = DETECTION_INTERVAL):
+        """
+        Initialize the multi-camera tracker.
+        
+        Args:
+            sources: Camera indexes or video paths, one worker process each
+            detection_interval: Full cascade interval in frames
+        """
+        self.sources = list(sources)
+        self.detection_interval = detection_interval
+        
+        # Loading a tracker here checks the cascade, model and student details
+        # before any worker is started
+        tracker = AttendanceTracker(detection_interval)
+        self.matcher = tracker.matcher or LBPHMatcher.from_recognizer(tracker.recognizer)
+        self.worker_status = {}
+    
+    def start_tracking(self, update_callback=None, duration: Optional[float] = None,
+                       display: bool = True, stop_signal: Optional[threading.Event] = None,
+                       on_recognized: Optional[Callable] = None) -> Tuple[bool, str, List]:
+        """
+        Track attendance from every source until stopped.
+        
+        Tracking stops when 'Q' is pressed in any camera window, when the
+        duration has passed, when stop_signal is set or when every source
+        has ended.
+        
+        Args:
+            update_callback: Optional callback function to update UI with attendance data
+            duration: Optional maximum tracking time in seconds
+            display: Show one window per camera
+            stop_signal: Optional event that stops tracking when set
+            on_recognized: Optional callback called with (source, label,
+                attendance row) for every newly marked student
+                
+        Returns:
+            Tuple of (success: bool, message: str, attendance_records: List)
+        """
+        ctx = mp.get_context('spawn')
+        events = ctx.Queue()
+        stop = ctx.Event()
+        writer = AttendanceWriter()
+        sink = AttendanceSink(update_callback, writer)
+        num_threads = max(1, (os.cpu_count() or 1) // len(self.sources))
+        
+        model = SharedModel.create(self.matcher)
+        workers = []
+        try:
+            for source in self.sources:
+                worker = ctx.Process(
+                    target=_camera_worker,
+                    name=f"camera {source}",
+                    args=(source, model.spec, events, stop, self.detection_interval,
+                          display, num_threads),
+                    # Not daemonic, so workers can start their own capture process
+                    daemon=False
+                )
+                worker.start()
+                workers.append(worker)
+            
+            deadline = time.monotonic() + duration if duration else None
+            running = len(workers)
+            while running:
+                if ((deadline is not None and time.monotonic() >= deadline)
+                        or (stop_signal is not None and stop_signal.is_set())):
+                    stop.set()
+                try:
+                    message = events.get(timeout=0.2)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        break
+                    continue
+                
+                if message[0] == 'recognized':
+                    _, source, label, attendance = message
+                    if sink.add(source, label, attendance) and on_recognized:
+                        on_recognized(source, label, attendance)
+                elif message[0] == 'finished':
+                    _, source, status = message
+                    self.worker_status[source] = status
+                    running -= 1
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join(timeout=5.0)
+                if worker.is_alive():
+                    worker.terminate()
+            model.unlink()
+            writer.close()
+        
+        failed = [s for s in self.sources if self.worker_status.get(s, '') != 'finished']
+        if sink.records:
+            return True, "Attendance recorded successfully", sink.records
+        if failed and len(failed) == len(self.sources):
+            return False, "Error: Could not access any camera", []
+        return False, "No faces recognized", []
@@ -0,0 +1,323 @@
+"""
+Staged frame processing pipeline for the attendance system.
+
+This module runs each step of the attendance loop (capture, detection,
+recognition, ...) on its own thread, connected by small bounded queues.
+When a stage falls behind, its input queue drops frames according to the
+configured policy instead of stalling the stages before it. Every stage
+keeps counters so the bottleneck can be seen under load.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config.config import PIPELINE_QUEUE_SIZE, PIPELINE_DROP_POLICY
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+
+class StageQueue:
+    """Bounded queue between two stages that drops items when full."""
+    
+    def __init__(self, maxsize: int = PIPELINE_QUEUE_SIZE,
+                 drop_policy: str = PIPELINE_DROP_POLICY):
+        """
+        Initialize the queue.
+        
+        Args:
+            maxsize: Maximum number of queued items
+            drop_policy: DROP_OLDEST to discard the oldest queued item when
+                full, DROP_NEWEST to discard the incoming item
+        """
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.maxsize = max(1, maxsize)
+        self.drop_policy = drop_policy
+        self.items = deque()
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def put(self, item: Any) -> bool:
+        """
+        Add an item, dropping one if the queue is full.
+        
+        Args:
+            item: Item to queue
+            
+        Returns:
+            True if the item was queued, False if it was dropped
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if len(self.items) >= self.maxsize:
+                self.dropped += 1
+                if self.drop_policy == DROP_NEWEST:
+                    return False
+                self.items.popleft()
+            self.items.append(item)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self.items))
+            self._condition.notify()
+            return True
+    
+    def get(self, timeout: Optional[float] = None) -> Tuple[bool, Any]:
+        """
+        Take the oldest queued item.
+        
+        Args:
+            timeout: Seconds to wait for an item, None waits until closed
+            
+        Returns:
+            Tuple of (success: bool, item). success is False on timeout or
+            when the queue is closed and empty.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.items or self._closed, timeout)
+            if not self.items:
+                return False, None
+            return True, self.items.popleft()
+    
+    @property
+    def closed(self) -> bool:
+        """Whether the producer has finished."""
+        return self._closed
+    
+    def close(self) -> None:
+        """Mark the queue as finished and wake any waiting consumer."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the queue counters.
+        
+        Returns:
+            Dictionary with current depth, maximum depth, enqueued and dropped items
+        """
+        with self._condition:
+            return {
+                'depth': len(self.items),
+                'max_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped
+            }
+
+
+class Stage:
+    """A pipeline step that runs a function on every item of its input queue."""
+    
+    def __init__(self, name: str, func: Callable, inbox: Optional[StageQueue] = None,
+                 outbox: Optional[StageQueue] = None):
+        """
+        Initialize the stage.
+        
+        Args:
+            name: Stage name used in the counters
+            func: Called with each input item (or without arguments for a
+                source stage). Its result is passed on unless it is None.
+                A source stage ends the stream by returning None.
+            inbox: Input queue, None for a source stage
+            outbox: Output queue, None for the last stage
+        """
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.busy_time = 0.0
+        self.started = None
+        self.finished = None
+        self.error = None
+    
+    def process(self, item: Any = None) -> Any:
+        """
+        Run the stage function on one item and update the counters.
+        
+        Args:
+            item: Input item, ignored for a source stage
+            
+        Returns:
+            Result of the stage function
+        """
+        start = time.perf_counter()
+        result = self.func() if self.inbox is None else self.func(item)
+        self.busy_time += time.perf_counter() - start
+        self.processed += 1
+        return result
+    
+    def run(self, stop: threading.Event) -> None:
+        """
+        Process items until the input ends or the pipeline is stopped.
+        
+        Args:
+            stop: Event set when the pipeline shuts down
+        """
+        self.started = time.perf_counter()
+        try:
+            while not stop.is_set():
+                if self.inbox is not None:
+                    ok, item = self.inbox.get(timeout=0.1)
+                    if not ok:
+                        if self.inbox.closed:
+                            break
+                        continue
+                    result = self.process(item)
+                else:
+                    result = self.process()
+                    if result is None:
+                        break
+                
+                if result is not None and self.outbox is not None:
+                    self.outbox.put(result)
+        except Exception as e:
+            self.error = e
+            stop.set()
+        finally:
+            self.finished = time.perf_counter()
+            if self.outbox is not None:
+                self.outbox.close()
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the stage counters.
+        
+        Returns:
+            Dictionary with items processed, throughput in items per second,
+            the share of time spent working and the input queue counters
+        """
+        now = self.finished or time.perf_counter()
+        elapsed = now - self.started if self.started else 0.0
+        stats = {
+            'processed': self.processed,
+            'fps': self.processed / elapsed if elapsed > 0 else 0.0,
+            'busy': self.busy_time / elapsed if elapsed > 0 else 0.0
+        }
+        if self.inbox is not None:
+            stats.update(self.inbox.stats())
+        return stats
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues."""
+    
+    def __init__(self, queue_size: int = PIPELINE_QUEUE_SIZE,
+                 drop_policy: str = PIPELINE_DROP_POLICY):
+        """
+        Initialize an empty pipeline.
+        
+        Args:
+            queue_size: Capacity of each queue between stages
+            drop_policy: DROP_OLDEST or DROP_NEWEST, applied when a stage
+                falls behind the one before it
+        """
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.stages: List[Stage] = []
+        self.sink = None
+        self._stop = threading.Event()
+        self._threads = []
+    
+    def add_stage(self, name: str, func: Callable) -> 'Pipeline':
+        """
+        Append a stage. The first stage added is the source.
+        
+        Args:
+            name: Stage name
+            func: Stage function, see Stage
+            
+        Returns:
+            The pipeline itself, for chaining
+        """
+        inbox = None
+        if self.stages:
+            inbox = StageQueue(self.queue_size, self.drop_policy)
+            self.stages[-1].outbox = inbox
+        self.stages.append(Stage(name, func, inbox))
+        return self
+    
+    def run(self, name: str, sink: Callable[[Any], bool]) -> None:
+        """
+        Start the stages and run the sink on the calling thread.
+        
+        The sink runs on the caller's thread so it can use OpenCV windows.
+        The pipeline stops when the sink returns False, the source ends or
+        a stage raises; the stage's exception is then re-raised here.
+        
+        Args:
+            name: Name of the sink stage
+            sink: Called with each output item, returns False to stop
+        """
+        outbox = StageQueue(self.queue_size, self.drop_policy)
+        self.stages[-1].outbox = outbox
+        self.sink = Stage(name, sink, outbox)
+        self._stop.clear()
+        
+        for stage in self.stages:
+            thread = threading.Thread(target=stage.run, args=(self._stop,),
+                                      name=f"pipeline-{stage.name}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        
+        self.sink.started = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                ok, item = outbox.get(timeout=0.1)
+                if not ok:
+                    if outbox.closed:
+                        break
+                    continue
+                if self.sink.process(item) is False:
+                    break
+        finally:
+            self.sink.finished = time.perf_counter()
+            self.stop()
+        
+        for stage in self.stages:
+            if stage.error is not None:
+                raise stage.error
+    
+    def stop(self) -> None:
+        """Signal every stage to finish and wait for the threads."""
+        self._stop.set()
+        for stage in self.stages:
+            if stage.outbox is not None:
+                stage.outbox.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the counters of every stage, in pipeline order.
+        
+        Returns:
+            Dictionary mapping stage name to its counters
+        """
+        stages = self.stages + ([self.sink] if self.sink is not None else [])
+        return {stage.name: stage.stats() for stage in stages}
+
+
+def format_stats(stats: Dict[str, Dict[str, float]]) -> str:
+    """
+    Format pipeline counters as one line per stage.
+    
+    Args:
+        stats: Counters returned by Pipeline.stats
+        
+    Returns:
+        Human readable summary
+    """
+    lines = []
+    for name, s in stats.items():
+        line = f"{name:>10}: {s['processed']:6d} items {s['fps']:6.1f}/s busy {s['busy']:4.0%}"
+        if 'depth' in s:
+            line += f" queue {s['depth']}/{s['max_depth']} max, {s['dropped']} dropped"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,274 @@
+"""
+Vectorized LBPH matching module for the attendance system.
+
+This module exports the histograms of a trained LBPH recognizer into one
+contiguous float32 matrix and scores faces against the whole gallery with
+NumPy, reproducing the (label, confidence) results of recognizer.predict.
+"""
+
+import math
+from typing import List, Sequence, Tuple
+import numpy as np
+from config.config import MATCHER_BLOCK_SIZE
+
+
+def lbp_image(face: np.ndarray, radius: int = 1, neighbors: int = 8) -> np.ndarray:
+    """
+    Compute the extended (circular) LBP codes of a grayscale face.
+    
+    Mirrors OpenCV's elbp, including its bilinear interpolation and
+    float32 arithmetic, so codes match the LBPH recognizer exactly.
+    
+    Args:
+        face: Grayscale face image
+        radius: LBP radius
+        neighbors: Number of sampling points
+        
+    Returns:
+        Array of LBP codes of shape (rows - 2 * radius, cols - 2 * radius)
+    """
+    src = np.asarray(face)
+    rows, cols = src.shape[:2]
+    out_rows, out_cols = rows - 2 * radius, cols - 2 * radius
+    codes = np.zeros((max(out_rows, 0), max(out_cols, 0)), dtype=np.int64)
+    if out_rows <= 0 or out_cols <= 0:
+        return codes
+    
+    src = src.astype(np.float32)
+    center = src[radius:rows - radius, radius:cols - radius]
+    
+    def shifted(dy: int, dx: int) -> np.ndarray:
+        return src[radius + dy:rows - radius + dy, radius + dx:cols - radius + dx]
+    
+    one = np.float32(1)
+    eps = np.finfo(np.float32).eps
+    for n in range(neighbors):
+        x = np.float32(radius * math.cos(2.0 * math.pi * n / float(neighbors)))
+        y = np.float32(-radius * math.sin(2.0 * math.pi * n / float(neighbors)))
+        fx, fy = int(math.floor(x)), int(math.floor(y))
+        cx, cy = int(math.ceil(x)), int(math.ceil(y))
+        ty = np.float32(y - fy)
+        tx = np.float32(x - fx)
+        w1 = (one - tx) * (one - ty)
+        w2 = tx * (one - ty)
+        w3 = (one - tx) * ty
+        w4 = tx * ty
+        
+        t = (w1 * shifted(fy, fx) + w2 * shifted(fy, cx)
+             + w3 * shifted(cy, fx) + w4 * shifted(cy, cx))
+        bit = (t > center) | (np.abs(t - center) < eps)
+        codes += bit.astype(np.int64) << n
+    return codes
+
+
+def spatial_histogram(codes: np.ndarray, num_patterns: int,
+                      grid_x: int, grid_y: int) -> np.ndarray:
+    """
+    Build the normalized grid of LBP histograms used by LBPH.
+    
+    Args:
+        codes: LBP code image
+        num_patterns: Number of histogram bins per cell
+        grid_x: Number of cells horizontally
+        grid_y: Number of cells vertically
+        
+    Returns:
+        Flat float32 histogram of length grid_x * grid_y * num_patterns
+    """
+    size = grid_x * grid_y * num_patterns
+    cell_w = codes.shape[1] // grid_x
+    cell_h = codes.shape[0] // grid_y
+    if cell_w == 0 or cell_h == 0:
+        # OpenCV normalizes empty cells by zero, which yields NaN bins
+        return np.full(size, np.nan, dtype=np.float32)
+    
+    cells = codes[:grid_y * cell_h, :grid_x * cell_w]
+    cell_index = (
+        (np.arange(grid_y * cell_h) // cell_h)[:, None] * grid_x
+        + (np.arange(grid_x * cell_w) // cell_w)[None, :]
+    )
+    counts = np.bincount(
+        (cell_index * num_patterns + cells).ravel(), minlength=size
+    )[:size]
+    return (counts / float(cell_w * cell_h)).astype(np.float32)
+
+
+class LBPHMatcher:
+    """Class for matching faces against an LBPH gallery with NumPy."""
+    
+    def __init__(self, histograms: np.ndarray, labels: Sequence[int],
+                 radius: int = 1, neighbors: int = 8, grid_x: int = 8,
+                 grid_y: int = 8, threshold: float = float(np.finfo(np.float64).max),
+                 block_size: int = MATCHER_BLOCK_SIZE):
+        """
+        Initialize the matcher.
+        
+        Args:
+            histograms: Gallery histograms, one row per training image
+            labels: Label of each gallery row
+            radius: LBP radius the gallery was built with
+            neighbors: LBP neighbors the gallery was built with
+            grid_x: Horizontal grid size the gallery was built with
+            grid_y: Vertical grid size the gallery was built with
+            threshold: Distance above which a face is reported as unknown (-1)
+            block_size: Gallery rows scored per block to bound temporary memory
+        """
+        histograms = np.asarray(histograms, dtype=np.float32)
+        self.labels = np.asarray(labels, dtype=np.int32).ravel()
+        self.radius = radius
+        self.neighbors = neighbors
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.threshold = threshold
+        self.block_size = max(1, block_size)
+        self._nan_rows = np.isnan(histograms).any(axis=1)
+        self._row_sums = np.nansum(histograms, axis=1, dtype=np.float64)
+        
+        # Stored bin-major so the bins of a query can be gathered as whole rows
+        self.gallery = np.ascontiguousarray(histograms.T)
+    
+    @classmethod
+    def from_recognizer(cls, recognizer) -> 'LBPHMatcher':
+        """
+        Export the gallery of a trained cv2 LBPH recognizer.
+        
+        Args:
+            recognizer: Trained cv2.face.LBPHFaceRecognizer
+            
+        Returns:
+            Matcher holding the recognizer's histograms in one float32 matrix
+        """
+        neighbors = recognizer.getNeighbors()
+        size = recognizer.getGridX() * recognizer.getGridY() * (2 ** neighbors)
+        exported = recognizer.getHistograms()
+        histograms = np.empty((len(exported), size), dtype=np.float32)
+        for row, histogram in enumerate(exported):
+            histograms[row] = np.asarray(histogram, dtype=np.float32).ravel()
+        
+        return cls(
+            histograms,
+            np.asarray(recognizer.getLabels()).ravel(),
+            radius=recognizer.getRadius(),
+            neighbors=neighbors,
+            grid_x=recognizer.getGridX(),
+            grid_y=recognizer.getGridY(),
+            threshold=recognizer.getThreshold()
+        )
+    
+    def __len__(self) -> int:
+        return len(self.labels)
+    
+    @property
+    def histograms(self) -> np.ndarray:
+        """Gallery histograms as a (num_images, histogram_size) view."""
+        return self.gallery.T
+    
+    def histogram(self, face: np.ndarray) -> np.ndarray:
+        """
+        Compute the LBPH histogram of a grayscale face.
+        
+        Args:
+            face: Grayscale face image
+            
+        Returns:
+            Flat float32 histogram
+        """
+        codes = lbp_image(face, self.radius, self.neighbors)
+        return spatial_histogram(codes, 2 ** self.neighbors,
+                                 self.grid_x, self.grid_y)
+    
+    def distances(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Compute chi-square distances between queries and the whole gallery.
+        
+        Uses the same alternative chi-square as cv2.HISTCMP_CHISQR_ALT,
+        2 * sum((a - b)^2 / (a + b)), rewritten as
+        2 * (sum(a) + sum(b)) - 8 * sum(a * b / (a + b)) so that only the
+        bins where the query is non-zero have to be visited.
+        
+        Args:
+            queries: Query histograms of shape (num_queries, histogram_size)
+            
+        Returns:
+            Distance matrix of shape (num_queries, gallery_size)
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        result = np.empty((len(queries), len(self.labels)), dtype=np.float64)
+        
+        for row, query in enumerate(queries):
+            if np.isnan(query).any():
+                # OpenCV skips NaN bins, so an empty query matches everything
+                result[row] = 0.0
+                continue
+            
+            bins = np.flatnonzero(query > 0)
+            values = query[bins][:, None]
+            ones = np.ones(len(bins), dtype=np.float32)
+            query_sum = float(values.sum(dtype=np.float64))
+            
+            for start in range(0, len(self.labels), self.block_size):
+                stop = start + self.block_size
+                block = self.gallery[bins, start:stop]
+                total = block + values
+                np.multiply(block, values, out=block)
+                np.divide(block, total, out=block)
+                result[row, start:stop] = (
+                    2.0 * (self._row_sums[start:stop] + query_sum)
+                    - 8.0 * (ones @ block)
+                )
+        
+        result[:, self._nan_rows] = 0.0
+        return result
+    
+    def predict(self, face: np.ndarray) -> Tuple[int, float]:
+        """
+        Predict the label of a single face.
+        
+        Args:
+            face: Grayscale face image
+            
+        Returns:
+            Tuple of (label, confidence) as returned by recognizer.predict
+        """
+        return self.predict_batch([face])[0]
+    
+    def predict_batch(self, faces: Sequence[np.ndarray]) -> List[Tuple[int, float]]:
+        """
+        Predict the labels of several faces in one pass over the gallery.
+        
+        Args:
+            faces: Grayscale face images
+            
+        Returns:
+            List of (label, confidence) tuples, -1 for faces over the threshold
+        """
+        if len(faces) == 0:
+            return []
+        return self.predict_histograms(np.stack([self.histogram(face) for face in faces]))
+    
+    def predict_histograms(self, queries: np.ndarray) -> List[Tuple[int, float]]:
+        """
+        Predict the labels of precomputed LBPH histograms.
+        
+        Args:
+            queries: Query histograms of shape (num_queries, histogram_size)
+            
+        Returns:
+            List of (label, confidence) tuples, -1 for queries over the threshold
+        """
+        if len(queries) == 0:
+            return []
+        if len(self.labels) == 0:
+            return [(-1, float(np.finfo(np.float64).max))] * len(queries)
+        
+        dists = self.distances(queries)
+        best = np.argmin(dists, axis=1)
+        
+        results = []
+        for row, index in enumerate(best):
+            dist = float(dists[row, index])
+            if dist < self.threshold:
+                results.append((int(self.labels[index]), dist))
+            else:
+                results.append((-1, float(np.finfo(np.float64).max)))
+        return results
@@ -0,0 +1,281 @@
+"""
+Student registry for the attendance system.
+
+This module keeps a small sidecar file next to StudentDetails.csv holding
+the number of registrations, the next serial number and the byte offset
+of every student's row. Counting students and allocating a serial number
+read the fixed-size sidecar header instead of the whole CSV, and one
+student's details are read with a single seek. Every append updates the
+sidecar atomically, under a lock shared by all processes registering
+students. A sidecar that does not match the CSV's size and modification
+time, for example after the CSV was edited by hand, is rebuilt from the
+CSV.
+"""
+
+import csv
+import io
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+from config.config import (
+    STUDENT_DETAILS_CSV, STUDENT_DETAILS_COLUMNS, STUDENT_DETAILS_LOCK_FILE
+)
+from src.attendance_log import DirectoryLock
+from src.image_store import student_label
+from src.students import StudentRecord
+
+# Sidecar header: magic, CSV size, CSV mtime in ns, registrations, next serial.
+# It is followed by (label, row offset) pairs in CSV order, so appending
+# only adds pairs and the last pair of a label points at its latest row.
+REGISTRY_MAGIC = b'STUREG01'
+_HEADER = struct.Struct('<8sqqqq')
+
+
+def registry_file(path: str) -> Path:
+    """
+    Get the sidecar of a student details CSV.
+    
+    Args:
+        path: Student details CSV
+        
+    Returns:
+        Path of the sidecar, the CSV path with an .idx suffix
+    """
+    return Path(path).with_suffix('.idx')
+
+
+def _columns(header: List[str], path: str) -> Tuple[int, int, int]:
+    """Positions of the serial, ID and name columns in a header row."""
+    try:
+        return header.index('SERIAL NO.'), header.index('ID'), header.index('NAME')
+    except ValueError:
+        raise ValueError(f"Unexpected student details header in {path}")
+
+
+class StudentRegistry:
+    """Student details CSV with constant-time counts and serial numbers."""
+    
+    def __init__(self, path: str = str(STUDENT_DETAILS_CSV)):
+        """
+        Initialize the registry. The sidecar is read on first use.
+        
+        Args:
+            path: Student details CSV
+        """
+        self.path = path
+        self.sidecar = str(registry_file(path))
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._count = 0
+        self._next_serial = 1
+        self._pairs: Optional[np.ndarray] = None
+    
+    def _csv_stamp(self) -> Tuple[int, int]:
+        """Size and modification time of the CSV, (0, 0) if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0, 0
+        return stat.st_size, stat.st_mtime_ns
+    
+    def _lock(self) -> DirectoryLock:
+        """Lock shared by every process appending to the CSV or its sidecar."""
+        return DirectoryLock(os.path.dirname(os.path.abspath(self.path)),
+                             STUDENT_DETAILS_LOCK_FILE)
+    
+    def _read_header(self) -> bool:
+        """
+        Load the sidecar header if it matches the CSV.
+        
+        Returns:
+            True if the cached header is up to date, False if a rebuild is needed
+        """
+        stamp = self._csv_stamp()
+        if stamp == self._stamp:
+            return True
+        if stamp == (0, 0):
+            self._stamp, self._count, self._next_serial = stamp, 0, 1
+            self._pairs = np.empty((0, 2), dtype='<i8')
+            return True
+        
+        try:
+            with open(self.sidecar, 'rb') as f:
+                magic, size, mtime_ns, count, next_serial = _HEADER.unpack(
+                    f.read(_HEADER.size)
+                )
+            if magic == REGISTRY_MAGIC and (size, mtime_ns) == stamp:
+                self._stamp, self._count, self._next_serial = stamp, count, next_serial
+                # Row offsets are only read when they are needed
+                self._pairs = None
+                return True
+        except (OSError, struct.error):
+            pass
+        return False
+    
+    def _refresh(self) -> None:
+        """Make sure the cached header matches the CSV, reading or rebuilding it."""
+        if not self._read_header():
+            self.rebuild()
+    
+    def _load_pairs(self) -> np.ndarray:
+        """Read the (label, row offset) pairs of a validated sidecar."""
+        if self._pairs is None:
+            with open(self.sidecar, 'rb') as f:
+                f.seek(_HEADER.size)
+                self._pairs = np.frombuffer(f.read(), dtype='<i8').reshape(-1, 2)
+        return self._pairs
+    
+    def _offset(self, student_id) -> Optional[int]:
+        """Byte offset of the latest row of a student, None if not registered."""
+        self._refresh()
+        pairs = self._load_pairs()
+        matches = np.flatnonzero(pairs[:, 0] == student_label(str(student_id)))
+        return int(pairs[matches[-1], 1]) if len(matches) else None
+    
+    def rebuild(self) -> None:
+        """Scan the CSV and write a new sidecar, under the registry lock."""
+        with self._lock():
+            # Another process may have rebuilt it while we waited for the lock
+            if not self._read_header():
+                self._rebuild()
+    
+    def _rebuild(self) -> None:
+        """Scan the CSV and write a new sidecar. The caller holds the lock."""
+        count, next_serial, pairs = 0, 1, []
+        with open(self.path, 'rb') as f:
+            header_line = f.readline()
+            if header_line:
+                header = next(csv.reader([header_line.decode('utf-8')]), [])
+                serial_col, id_col, name_col = _columns(header, self.path)
+                width = max(serial_col, id_col, name_col)
+            
+            offset = len(header_line)
+            for line in f:
+                row = next(csv.reader([line.decode('utf-8')]), [])
+                if len(row) > width:
+                    count += 1
+                    serial = row[serial_col].strip()
+                    if serial.isdigit():
+                        next_serial = max(next_serial, int(serial) + 1)
+                    label = student_label(row[id_col].strip())
+                    if label >= 0:
+                        pairs.append((label, offset))
+                offset += len(line)
+        
+        self._count, self._next_serial = count, next_serial
+        self._pairs = np.array(pairs, dtype='<i8').reshape(-1, 2)
+        self._stamp = self._csv_stamp()
+        self._save(self._pairs.tobytes())
+    
+    def _save(self, pairs: bytes) -> None:
+        """Atomically write the sidecar for the current CSV stamp."""
+        tmp_path = self.sidecar + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(REGISTRY_MAGIC, self._stamp[0], self._stamp[1],
+                                 self._count, self._next_serial))
+            f.write(pairs)
+        os.replace(tmp_path, self.sidecar)
+    
+    def count(self) -> int:
+        """
+        Count the registrations.
+        
+        Returns:
+            Number of student rows in the CSV
+        """
+        self._refresh()
+        return self._count
+    
+    def next_serial(self) -> int:
+        """
+        Get the serial number of the next registration.
+        
+        Returns:
+            One more than the highest serial number registered
+        """
+        self._refresh()
+        return self._next_serial
+    
+    def __contains__(self, student_id) -> bool:
+        return self._offset(student_id) is not None
+    
+    def get(self, student_id) -> Optional[StudentRecord]:
+        """
+        Read one student's details with a single seek.
+        
+        Args:
+            student_id: Student ID
+            
+        Returns:
+            Student record, or None if the ID is not registered
+        """
+        offset = self._offset(student_id)
+        if offset is None:
+            return None
+        with open(self.path, 'rb') as f:
+            header = next(csv.reader([f.readline().decode('utf-8')]), [])
+            serial_col, id_col, name_col = _columns(header, self.path)
+            f.seek(offset)
+            row = next(csv.reader([f.readline().decode('utf-8')]))
+        serial = row[serial_col].strip()
+        return StudentRecord(int(serial) if serial.isdigit() else 0,
+                             row[id_col].strip(), row[name_col].strip())
+    
+    def append(self, rows: List[List]) -> List[List]:
+        """
+        Append student rows in one write and update the sidecar.
+        
+        Rows whose serial is None are given the next serial numbers under
+        the lock, so concurrent registrations never share a serial.
+        
+        Args:
+            rows: Rows in the STUDENT_DETAILS_COLUMNS layout
+            
+        Returns:
+            The rows as written, with their serial numbers
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # The write, the stat and the sidecar must not interleave with another
+        # process's append, or its rows would be covered by our stamp
+        with self._lock():
+            if not self._read_header():
+                self._rebuild()
+            return self._append(rows)
+    
+    def _append(self, rows: List[List]) -> List[List]:
+        """Append rows and save the sidecar. The caller holds the lock."""
+        pairs = self._load_pairs()
+        added, written = [], []
+        
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if offset == 0:
+                writer.writerow(STUDENT_DETAILS_COLUMNS)
+            offset += len(buffer.getvalue().encode('utf-8'))
+            
+            for row in rows:
+                if row[0] is None:
+                    row = [self._next_serial] + list(row[1:])
+                written.append(row)
+                line = io.StringIO()
+                csv.writer(line).writerow(row)
+                line = line.getvalue()
+                buffer.write(line)
+                label = student_label(str(row[2]).strip())
+                if label >= 0:
+                    added.append((label, offset))
+                offset += len(line.encode('utf-8'))
+                self._count += 1
+                serial = str(row[0]).strip()
+                if serial.isdigit():
+                    self._next_serial = max(self._next_serial, int(serial) + 1)
+            f.write(buffer.getvalue().encode('utf-8'))
+        
+        added = np.array(added, dtype='<i8').reshape(-1, 2)
+        self._pairs = np.concatenate([pairs, added])
+        self._stamp = self._csv_stamp()
+        self._save(self._pairs.tobytes())
+        return written
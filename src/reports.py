@@ -0,0 +1,324 @@
+"""
+Attendance reports for the attendance system.
+
+This module compacts the daily attendance into a columnar cache: a
+day x student bitmap with one row per class day and one column per
+student, saved as an .npz file next to the attendance files. Student
+percentages, daily head counts and defaulter lists for any range of days
+are then sums over a slice of the bitmap. Refreshing the cache only reads
+the attendance added since the last refresh, so new days and new marks
+on the current day are picked up without rereading the whole term.
+"""
+
+import calendar
+import datetime
+import logging
+import os
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config.config import (
+    ATTENDANCE_CACHE_FILE, DEFAULTER_THRESHOLD, DATE_FORMAT, MONTH_NAMES
+)
+from src.attendance_log import tail_attendance_file
+from src.storage import CSVStorage, Storage, open_storage
+from src.utils import parse_date
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+# First day read from a storage backend that is not the CSV files
+
+
+def _day_number(date: str) -> int:
+    """Convert a DD-MM-YYYY date to its proleptic ordinal."""
+    day, month, year = parse_date(date)
+    return datetime.date(int(year), int(month), int(day)).toordinal()
+
+
+def _day_string(number: int) -> str:
+    """Convert a proleptic ordinal to a DD-MM-YYYY date."""
+    return datetime.date.fromordinal(int(number)).strftime(DATE_FORMAT)
+
+
+def month_range(month: str, year: str) -> Tuple[str, str]:
+    """
+    Get the first and last day of a month.
+    
+    Args:
+        month: Month number as string (01-12)
+        year: Four digit year
+        
+    Returns:
+        Tuple of (first day, last day) as DD-MM-YYYY
+        
+    Raises:
+        ValueError: If the month or year is not valid
+    """
+    month = month.zfill(2)
+    if month not in MONTH_NAMES or not (len(year) == 4 and year.isdigit()):
+        raise ValueError(f"Invalid month: {month}-{year}")
+    last = calendar.monthrange(int(year), int(month))[1]
+    return f"01-{month}-{year}", f"{last:02d}-{month}-{year}"
+
+
+class AttendanceCache:
+    """Day x student attendance bitmap answering range reports."""
+    
+    def __init__(self, storage: Optional[Storage] = None,
+                 path: str = str(ATTENDANCE_CACHE_FILE)):
+        """
+        Load the cache file, if any. Call refresh() to pick up new attendance.
+        
+        Args:
+            storage: Storage backend the attendance is read from, the
+                configured backend by default
+            path: Cache file
+        """
+        self._owns_storage = storage is None
+        self.storage = storage if storage is not None else open_storage()
+        self.path = path
+        # Class days as sorted ordinals, and the bytes of each day's CSV read
+        self.days = np.empty(0, dtype=np.int64)
+        self.offsets = np.empty(0, dtype=np.int64)
+        # Highest attendance row ID read from a backend that is not the CSV files
+        self.high_water = 0
+        self.student_ids: List[str] = []
+        self.names: List[str] = []
+        self.present = np.zeros((0, 0), dtype=bool)
+        self._columns: Dict[str, int] = {}
+        self._load()
+    
+    def _load(self) -> None:
+        """Load the cache file, starting empty if it is missing or unreadable."""
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data['version']) != CACHE_FORMAT_VERSION:
+                    return
+                student_ids = [str(s) for s in data['student_ids']]
+                names = [str(s) for s in data['names']]
+                days = data['days'].astype(np.int64)
+                offsets = data['offsets'].astype(np.int64)
+                high_water = int(data['high_water']) if 'high_water' in data.files else 0
+                present = np.unpackbits(data['bitmap'], axis=1,
+                                        count=len(student_ids)).astype(bool)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning("Error loading attendance cache %s, rebuilding it: %s",
+                           self.path, e)
+            return
+        
+        self.days, self.offsets, self.present = days, offsets, present
+        self.high_water = high_water
+        self.student_ids, self.names = student_ids, names
+        self._columns = {student_id: i for i, student_id in enumerate(student_ids)}
+    
+    def save(self) -> None:
+        """Atomically write the cache file, with the bitmap packed to bits."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.int32(CACHE_FORMAT_VERSION),
+                days=self.days,
+                offsets=self.offsets,
+                high_water=np.int64(self.high_water),
+                student_ids=np.array(self.student_ids, dtype=str),
+                names=np.array(self.names, dtype=str),
+                bitmap=np.packbits(self.present, axis=1)
+            )
+        os.replace(tmp_path, self.path)
+    
+    def refresh(self) -> int:
+        """
+        Add the attendance recorded since the last refresh and save the cache.
+        
+        Returns:
+            Number of days that were added or updated
+        """
+        if isinstance(self.storage, CSVStorage):
+            updates = self._read_files(self.storage.attendance_dir)
+        else:
+            updates = self._read_storage()
+        
+        names = {}
+        try:
+            students = self.storage.load_students()
+            for label in students:
+                record = students.get(label)
+                names[record.student_id] = record.name
+        except FileNotFoundError:
+            # Nobody registered yet, only students in the attendance are listed
+            pass
+        for marked, _, _ in updates.values():
+            for student_id in marked.keys() - names.keys():
+                names[student_id] = marked[student_id]
+        
+        added = [s for s in names if s not in self._columns]
+        renamed = any(self.names[self._columns[s]] != names[s]
+                      for s in names if s in self._columns)
+        if not updates and not added and not renamed:
+            return 0
+        
+        self._add_students(added, names)
+        self._add_days(sorted(day for day in updates if day not in self._day_rows()))
+        rows_of = self._day_rows()
+        for day, (marked, offset, reset) in updates.items():
+            row = rows_of[day]
+            if reset:
+                self.present[row] = False
+            self.present[row, list(map(self._columns.__getitem__, marked))] = True
+            self.offsets[row] = offset
+        self.save()
+        return len(updates)
+    
+    def close(self) -> None:
+        """Close the storage backend if the cache opened it."""
+        if self._owns_storage:
+            self.storage.close()
+    
+    def __enter__(self) -> 'AttendanceCache':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _day_rows(self) -> Dict[int, int]:
+        """Map every cached day to its bitmap row."""
+        return {int(day): row for row, day in enumerate(self.days)}
+    
+    def _read_files(self, directory: str) -> Dict[int, Tuple[Dict[str, str], int, bool]]:
+        """
+        Tail every day CSV that grew since it was last read.
+        
+        Returns:
+            Per day ordinal, the marked students as {ID: name}, the CSV
+            offset read up to and whether the day is read from the start
+        """
+        rows_of = self._day_rows()
+        updates = {}
+        for path in Path(directory).glob('Attendance_*.csv'):
+            try:
+                day = _day_number(path.stem[len('Attendance_'):])
+            except ValueError:
+                continue
+            offset = int(self.offsets[rows_of[day]]) if day in rows_of else 0
+            if os.path.getsize(path) == offset:
+                continue
+            rows, new_offset = tail_attendance_file(str(path), offset)
+            # A file that shrank was rewritten, its day is read again from the start
+            reset = new_offset < offset
+            if rows or reset:
+                updates[day] = ({row[0]: row[2] for row in rows if len(row) >= 7},
+                                new_offset, reset)
+        return updates
+    
+    def _read_storage(self) -> Dict[int, Tuple[Dict[str, str], int, bool]]:
+        """
+        Read the attendance inserted since the last refresh, for any day.
+        
+        Returns:
+            Per day ordinal, the marked students as {ID: name}, 0 and
+            whether the day is read from the start
+        """
+        rows, high_water = self.storage.attendance_since(self.high_water)
+        reset = high_water < self.high_water
+        if reset:
+            # The database was replaced, read it again from the start
+            rows, high_water = self.storage.attendance_since(0)
+        
+        updates = {}
+        for student_id, name, date, _ in rows:
+            day = _day_number(date)
+            updates.setdefault(day, ({}, 0, reset))[0][student_id] = name
+        self.high_water = high_water
+        return updates
+    
+    def _add_students(self, student_ids: List[str], names: Dict[str, str]) -> None:
+        """Add one bitmap column per new student and update changed names."""
+        for student_id in self._columns:
+            self.names[self._columns[student_id]] = names.get(
+                student_id, self.names[self._columns[student_id]]
+            )
+        if not student_ids:
+            return
+        for student_id in student_ids:
+            self._columns[student_id] = len(self.student_ids)
+            self.student_ids.append(student_id)
+            self.names.append(names[student_id])
+        self.present = np.pad(self.present, ((0, 0), (0, len(student_ids))))
+    
+    def _add_days(self, days: List[int]) -> None:
+        """Add one bitmap row per new class day, keeping days sorted."""
+        if not days:
+            return
+        positions = np.searchsorted(self.days, days)
+        self.days = np.insert(self.days, positions, days)
+        self.offsets = np.insert(self.offsets, positions, 0)
+        self.present = np.insert(self.present, positions, False, axis=0)
+    
+    def _range(self, start: str, end: str) -> slice:
+        """Bitmap rows of the class days between start and end, inclusive."""
+        return slice(int(np.searchsorted(self.days, _day_number(start), 'left')),
+                     int(np.searchsorted(self.days, _day_number(end), 'right')))
+    
+    def head_counts(self, start: str, end: str) -> List[Tuple[str, int]]:
+        """
+        Count the students present on every class day of a range.
+        
+        Args:
+            start: First day as DD-MM-YYYY
+            end: Last day as DD-MM-YYYY, included
+            
+        Returns:
+            List of tuples (Date, students present)
+        """
+        rows = self._range(start, end)
+        counts = self.present[rows].sum(axis=1)
+        return [(_day_string(day), int(count)) for day, count in zip(self.days[rows], counts)]
+    
+    def student_summary(self, start: str, end: str) -> Tuple[int, List[Tuple[str, str, int, float]]]:
+        """
+        Get every student's attendance over a range of days.
+        
+        Percentages are relative to the class days in the range, the days
+        on which at least one student was marked.
+        
+        Args:
+            start: First day as DD-MM-YYYY
+            end: Last day as DD-MM-YYYY, included
+            
+        Returns:
+            Tuple of (class days, list of tuples (ID, Name, days present, percentage))
+        """
+        present = self.present[self._range(start, end)]
+        class_days = int(present.any(axis=1).sum())
+        attended = present.sum(axis=0)
+        percentages = attended * 100.0 / class_days if class_days else np.zeros(len(attended))
+        return class_days, [
+            (student_id, name, int(days), float(percentage))
+            for student_id, name, days, percentage
+            in zip(self.student_ids, self.names, attended, percentages)
+        ]
+    
+    def defaulters(self, start: str, end: str,
+                   threshold: float = DEFAULTER_THRESHOLD) -> List[Tuple[str, str, int, float]]:
+        """
+        List the students whose attendance over a range is below a threshold.
+        
+        Args:
+            start: First day as DD-MM-YYYY
+            end: Last day as DD-MM-YYYY, included
+            threshold: Lowest acceptable attendance percentage
+            
+        Returns:
+            List of tuples (ID, Name, days present, percentage), lowest first
+        """
+        class_days, summary = self.student_summary(start, end)
+        if not class_days:
+            return []
+        return sorted((s for s in summary if s[3] < threshold), key=lambda s: s[3])
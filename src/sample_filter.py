@@ -0,0 +1,96 @@
+"""
+Training sample filter for face capture.
+
+This module rejects captured face crops that are blurry or nearly
+identical to a crop that was already kept, so fewer but more varied
+samples are stored for each student.
+"""
+
+import cv2
+from typing import List, Tuple
+import numpy as np
+from config.config import (
+    CAPTURE_DUPLICATE_DISTANCE, CAPTURE_MIN_SHARPNESS, CAPTURE_FILTER_SIZE
+)
+
+
+def difference_hash(face: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Compute the perceptual difference hash (dHash) of a face crop.
+    
+    Args:
+        face: Grayscale face crop
+        hash_size: Hash grid size, the hash has hash_size^2 bits
+        
+    Returns:
+        Hash as an integer
+    """
+    small = cv2.resize(face, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def sharpness(face: np.ndarray) -> float:
+    """
+    Measure the sharpness of a face crop as the variance of its Laplacian.
+    
+    The crop is resized to CAPTURE_FILTER_SIZE first so the value does not
+    depend on how far the face was from the camera.
+    
+    Args:
+        face: Grayscale face crop
+        
+    Returns:
+        Laplacian variance, low for blurry crops
+    """
+    face = cv2.resize(face, CAPTURE_FILTER_SIZE, interpolation=cv2.INTER_AREA)
+    return float(cv2.Laplacian(face, cv2.CV_64F).var())
+
+
+class SampleFilter:
+    """Class for selecting sharp, distinct face samples during capture."""
+    
+    def __init__(self, max_distance: int = CAPTURE_DUPLICATE_DISTANCE,
+                 min_sharpness: float = CAPTURE_MIN_SHARPNESS):
+        """
+        Initialize the filter.
+        
+        Args:
+            max_distance: Crops whose dHash differs from a kept crop in at
+                most this many bits are rejected as duplicates
+            min_sharpness: Crops with a lower Laplacian variance are rejected
+                as blurry
+        """
+        self.max_distance = max_distance
+        self.min_sharpness = min_sharpness
+        self.hashes: List[int] = []
+        self.rejected_blurry = 0
+        self.rejected_duplicate = 0
+    
+    def accept(self, face: np.ndarray) -> Tuple[bool, str]:
+        """
+        Decide whether to keep a face crop, remembering it if kept.
+        
+        Args:
+            face: Grayscale face crop
+            
+        Returns:
+            Tuple of (keep: bool, reason: str)
+        """
+        if sharpness(face) < self.min_sharpness:
+            self.rejected_blurry += 1
+            return False, "blurry"
+        
+        face_hash = difference_hash(face)
+        for kept in self.hashes:
+            if bin(face_hash ^ kept).count('1') <= self.max_distance:
+                self.rejected_duplicate += 1
+                return False, "duplicate"
+        
+        self.hashes.append(face_hash)
+        return True, "kept"
+    
+    @property
+    def rejected(self) -> int:
+        """Total number of rejected crops."""
+        return self.rejected_blurry + self.rejected_duplicate
@@ -0,0 +1,467 @@
+"""
+Storage backends for students and attendance.
+
+This module puts the student table and the attendance log behind one
+interface. The CSV backend keeps StudentDetails.csv and one attendance
+file per day. The SQLite backend keeps both tables in a single database
+in WAL mode, with attendance indexed on (date, student_id), so a query
+over many days is one index range scan instead of opening a file per day.
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from config.config import (
+    STORAGE_BACKEND, DATABASE_FILE, STUDENT_DETAILS_CSV,
+    ATTENDANCE_DIR, ATTENDANCE_FSYNC, SQLITE_BUSY_TIMEOUT_MS, STORAGE_IMPORT_BATCH,
+    DATE_FORMAT
+)
+from src.attendance_log import (
+    AttendanceIndex, attendance_file, read_attendance_file, tail_attendance_file
+)
+from src.image_store import student_label
+from src.registry import StudentRegistry
+from src.students import StudentIndex, StudentRecord
+
+# Attendance as returned by queries: (ID, Name, Date, Time)
+AttendanceRow = Tuple[str, str, str, str]
+
+
+def _parse_date(date: str) -> datetime.date:
+    """Parse a DD-MM-YYYY date."""
+    return datetime.datetime.strptime(date, DATE_FORMAT).date()
+
+
+def _student_rows_to_records(rows: List[List]) -> List[Tuple[Optional[int], str, str]]:
+    """Convert rows in the STUDENT_DETAILS_COLUMNS layout to (serial, id, name)."""
+    return [(None if row[0] is None else int(row[0]), str(row[2]).strip(), str(row[4]).strip())
+            for row in rows]
+
+
+class Storage(ABC):
+    """Interface shared by the student and attendance storage backends."""
+    
+    @abstractmethod
+    def add_students(self, rows: List[List]) -> List[List]:
+        """
+        Register students in one write.
+        
+        Args:
+            rows: Rows in the STUDENT_DETAILS_COLUMNS layout. A serial of
+                None is replaced by the next free serial number while the
+                write is locked.
+                
+        Returns:
+            The rows as written, with their serial numbers
+        """
+    
+    @abstractmethod
+    def load_students(self) -> StudentIndex:
+        """
+        Load every registered student.
+        
+        Returns:
+            Index of the registered students keyed by recognizer label
+        """
+    
+    @abstractmethod
+    def student_count(self) -> int:
+        """
+        Count the registered students.
+        
+        Returns:
+            Number of registrations
+        """
+    
+    @abstractmethod
+    def next_serial(self) -> int:
+        """
+        Get the serial number of the next registration.
+        
+        Returns:
+            Next serial number
+        """
+    
+    @abstractmethod
+    def add_attendance(self, date: str, records: List[List]) -> List[List]:
+        """
+        Append the attendance of students not yet marked on a day.
+        
+        Args:
+            date: Day as DD-MM-YYYY
+            records: Attendance rows [id, '', name, '', date, '', time]
+            
+        Returns:
+            The rows that were written
+        """
+    
+    @abstractmethod
+    def is_marked(self, student_id, date: str) -> bool:
+        """
+        Check whether a student is already marked on a day.
+        
+        Args:
+            student_id: Student ID
+            date: Day as DD-MM-YYYY
+            
+        Returns:
+            True if the student is present that day
+        """
+    
+    def attendance_on(self, date: str) -> List[AttendanceRow]:
+        """
+        Get the attendance of one day.
+        
+        Args:
+            date: Day as DD-MM-YYYY
+            
+        Returns:
+            List of tuples (ID, Name, Date, Time)
+        """
+        return self.attendance_between(date, date)
+    
+    @abstractmethod
+    def attendance_between(self, start: str, end: str,
+                           student_id: Optional[str] = None) -> List[AttendanceRow]:
+        """
+        Get the attendance of a range of days.
+        
+        Args:
+            start: First day as DD-MM-YYYY
+            end: Last day as DD-MM-YYYY, included
+            student_id: Only return the attendance of this student
+            
+        Returns:
+            List of tuples (ID, Name, Date, Time), ordered by day
+        """
+    
+    def close(self) -> None:
+        """Release the files or connection held by the backend."""
+    
+    def __enter__(self) -> 'Storage':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class CSVStorage(Storage):
+    """Students in StudentDetails.csv and attendance in one CSV file per day."""
+    
+    def __init__(self, students_csv: str = str(STUDENT_DETAILS_CSV),
+                 attendance_dir: str = str(ATTENDANCE_DIR),
+                 durable: bool = ATTENDANCE_FSYNC):
+        """
+        Initialize the backend.
+        
+        Args:
+            students_csv: Student details CSV
+            attendance_dir: Directory of the per-day attendance files
+            durable: fsync attendance files after every append
+        """
+        self.students_csv = students_csv
+        self.registry = StudentRegistry(students_csv)
+        self.attendance_dir = attendance_dir
+        self.durable = durable
+        self._indexes: Dict[str, AttendanceIndex] = {}
+        self._indexes_lock = threading.Lock()
+        # Rows of the last day read and the CSV offset to continue from
+        self._today: Tuple[str, List[AttendanceRow], int] = ('', [], 0)
+    
+    def add_students(self, rows: List[List]) -> List[List]:
+        return self.registry.append(rows)
+    
+    def load_students(self) -> StudentIndex:
+        return StudentIndex.from_csv(self.students_csv)
+    
+    def student_count(self) -> int:
+        return self.registry.count()
+    
+    def next_serial(self) -> int:
+        return self.registry.next_serial()
+    
+    def _index(self, date: str) -> AttendanceIndex:
+        """Get the index of a day, loading it on first use."""
+        with self._indexes_lock:
+            index = self._indexes.get(date)
+            if index is None:
+                index = AttendanceIndex(date, self.attendance_dir)
+                self._indexes[date] = index
+            return index
+    
+    def add_attendance(self, date: str, records: List[List]) -> List[List]:
+        return self._index(date).append(records, self.durable)
+    
+    def is_marked(self, student_id, date: str) -> bool:
+        return self._index(date).is_marked(student_id)
+    
+    def attendance_on(self, date: str) -> List[AttendanceRow]:
+        cached_date, records, offset = self._today
+        if cached_date != date:
+            records, offset = [], 0
+        
+        # Only read the rows appended since the last call
+        rows, new_offset = tail_attendance_file(
+            str(attendance_file(date, self.attendance_dir)), offset
+        )
+        if new_offset < offset:
+            records = []
+        for row in rows:
+            if len(row) >= 7:
+                records.append((row[0], row[2], row[4], row[6]))
+        
+        self._today = (date, records, new_offset)
+        return list(records)
+    
+    def attendance_between(self, start: str, end: str,
+                           student_id: Optional[str] = None) -> List[AttendanceRow]:
+        day, last = _parse_date(start), _parse_date(end)
+        records = []
+        while day <= last:
+            path = attendance_file(day.strftime(DATE_FORMAT), self.attendance_dir)
+            for row in read_attendance_file(str(path)):
+                if len(row) >= 7 and (student_id is None or row[0] == str(student_id)):
+                    records.append((row[0], row[2], row[4], row[6]))
+            day += datetime.timedelta(days=1)
+        return records
+
+
+class SQLiteStorage(Storage):
+    """Students and attendance in one SQLite database in WAL mode."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS students (
+            student_id TEXT PRIMARY KEY,
+            serial INTEGER NOT NULL,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS attendance (
+            student_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS attendance_date_student
+            ON attendance (date, student_id);
+        CREATE INDEX IF NOT EXISTS attendance_student_date
+            ON attendance (student_id, date);
+    """
+    
+    def __init__(self, path: str = str(DATABASE_FILE),
+                 durable: bool = ATTENDANCE_FSYNC,
+                 busy_timeout_ms: int = SQLITE_BUSY_TIMEOUT_MS):
+        """
+        Open the database, creating the tables on first use.
+        
+        Args:
+            path: Database file
+            durable: Sync the WAL on every commit (synchronous=FULL), so
+                committed marks survive a power loss, not only a crash
+            busy_timeout_ms: How long to wait for another process's write
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        # The attendance writer commits from its own thread
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000.0,
+                                     check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+            self._conn.executescript(self.SCHEMA)
+    
+    def add_students(self, rows: List[List]) -> List[List]:
+        # A registered ID is replaced, the latest row wins as in the CSV index.
+        # Missing serials are allocated by the insert, which holds the write lock.
+        records = _student_rows_to_records(rows)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO students (serial, student_id, name) VALUES "
+                "(COALESCE(?, (SELECT COALESCE(MAX(serial), 0) + 1 FROM students)), ?, ?)",
+                records
+            )
+            serials = {
+                student_id: self._conn.execute(
+                    "SELECT serial FROM students WHERE student_id = ?", (student_id,)
+                ).fetchone()[0]
+                for serial, student_id, _ in records if serial is None
+            }
+        return [[serials[student_id] if serial is None else serial, '', student_id, '', name]
+                for serial, student_id, name in records]
+    
+    def load_students(self) -> StudentIndex:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT serial, student_id, name FROM students"
+            ).fetchall()
+        if not rows:
+            raise FileNotFoundError(
+                "Student details not found. Please register students first!"
+            )
+        
+        records = {}
+        for serial, student_id, name in rows:
+            label = student_label(student_id)
+            if label >= 0:
+                records[label] = StudentRecord(serial, student_id, name)
+        return StudentIndex(records)
+    
+    def student_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    
+    def next_serial(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(serial), 0) + 1 FROM students"
+            ).fetchone()[0]
+    
+    def add_attendance(self, date: str, records: List[List]) -> List[List]:
+        # Dates are stored as YYYY-MM-DD so they sort and range-scan by day
+        day = _parse_date(date).isoformat()
+        written = []
+        with self._lock, self._conn:
+            for record in records:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO attendance (student_id, name, date, time) "
+                    "VALUES (?, ?, ?, ?)",
+                    (str(record[0]), str(record[2]), day, str(record[6]))
+                )
+                if cursor.rowcount:
+                    written.append(record)
+        return written
+    
+    def is_marked(self, student_id, date: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM attendance WHERE date = ? AND student_id = ?",
+                (_parse_date(date).isoformat(), str(student_id))
+            ).fetchone() is not None
+    
+    def attendance_between(self, start: str, end: str,
+                           student_id: Optional[str] = None) -> List[AttendanceRow]:
+        query = ("SELECT student_id, name, date, time FROM attendance "
+                 "WHERE date BETWEEN ? AND ?")
+        params = [_parse_date(start).isoformat(), _parse_date(end).isoformat()]
+        if student_id is not None:
+            query += " AND student_id = ?"
+            params.append(str(student_id))
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY date, rowid", params).fetchall()
+        
+        # Convert every distinct day back to DD-MM-YYYY once
+        days = {}
+        for row in rows:
+            if row[2] not in days:
+                days[row[2]] = datetime.date.fromisoformat(row[2]).strftime(DATE_FORMAT)
+        return [(student_id, name, days[day], time) for student_id, name, day, time in rows]
+    
+    def attendance_since(self, rowid: int) -> Tuple[List[AttendanceRow], int]:
+        """
+        Get the attendance inserted after a row, for any day.
+        
+        Args:
+            rowid: Highest row ID already read, 0 for every row
+            
+        Returns:
+            Tuple of (list of tuples (ID, Name, Date, Time), highest row ID
+            in the table)
+        """
+        with self._lock:
+            # Rows committed after the high-water mark is read are left for the next call
+            high_water = self._conn.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM attendance"
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT student_id, name, date, time FROM attendance "
+                "WHERE rowid > ? AND rowid <= ? ORDER BY rowid", (rowid, high_water)
+            ).fetchall()
+        
+        days = {}
+        for row in rows:
+            if row[2] not in days:
+                days[row[2]] = datetime.date.fromisoformat(row[2]).strftime(DATE_FORMAT)
+        return [(student_id, name, days[day], time)
+                for student_id, name, day, time in rows], high_water
+    
+    def import_csv(self, students_csv: str = str(STUDENT_DETAILS_CSV),
+                   attendance_dir: str = str(ATTENDANCE_DIR),
+                   batch_size: int = STORAGE_IMPORT_BATCH) -> Tuple[int, int]:
+        """
+        Copy the students and attendance of the CSV backend into the database.
+        
+        Importing again is harmless, students already present are
+        overwritten and attendance already present is skipped.
+        
+        Args:
+            students_csv: Student details CSV
+            attendance_dir: Directory of the per-day attendance files
+            batch_size: Attendance rows inserted per transaction
+            
+        Returns:
+            Tuple of (students imported, attendance rows imported)
+        """
+        students = 0
+        if os.path.isfile(students_csv):
+            index = StudentIndex.from_csv(students_csv)
+            self.add_students([[r.serial, '', r.student_id, '', r.name]
+                               for r in (index.get(label) for label in index)])
+            students = len(index)
+        
+        batch, imported = [], 0
+        for path in sorted(Path(attendance_dir).glob('Attendance_*.csv')):
+            try:
+                day = datetime.datetime.strptime(
+                    path.stem[len('Attendance_'):], DATE_FORMAT
+                ).date().isoformat()
+            except ValueError:
+                print(f"Error importing {path.name}: not a day attendance file")
+                continue
+            for row in read_attendance_file(str(path)):
+                if len(row) >= 7:
+                    batch.append((row[0], row[2], day, row[6]))
+            if len(batch) >= batch_size:
+                imported += self._insert_attendance(batch)
+                batch = []
+        if batch:
+            imported += self._insert_attendance(batch)
+        return students, imported
+    
+    def _insert_attendance(self, rows: List[Tuple[str, str, str, str]]) -> int:
+        """Insert (student_id, name, YYYY-MM-DD, time) rows in one transaction."""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO attendance (student_id, name, date, time) "
+                "VALUES (?, ?, ?, ?)", rows
+            )
+            return self._conn.total_changes - before
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_storage(backend: str = STORAGE_BACKEND,
+                 durable: bool = ATTENDANCE_FSYNC,
+                 attendance_dir: str = str(ATTENDANCE_DIR)) -> Storage:
+    """
+    Open the configured storage backend.
+    
+    Args:
+        backend: 'csv' or 'sqlite'
+        durable: Sync attendance to disk on every commit
+        attendance_dir: Directory of the per-day attendance files (CSV backend)
+        
+    Returns:
+        Storage backend
+    """
+    if backend == 'sqlite':
+        return SQLiteStorage(durable=durable)
+    if backend == 'csv':
+        return CSVStorage(attendance_dir=attendance_dir, durable=durable)
+    raise ValueError(f"Unknown storage backend: {backend}")
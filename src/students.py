@@ -0,0 +1,105 @@
+"""
+Student lookup index for the attendance system.
+
+This module loads StudentDetails.csv once into an immutable index keyed
+by the recognizer label, so identifying a face is a single dictionary
+lookup instead of a scan over the student table.
+"""
+
+import csv
+import os
+from types import MappingProxyType
+from typing import Iterator, NamedTuple, Optional
+from config.config import STUDENT_DETAILS_CSV
+from src.image_store import student_label
+
+
+class StudentRecord(NamedTuple):
+    """Details of a registered student."""
+    serial: int
+    student_id: str
+    name: str
+
+
+class StudentIndex:
+    """Immutable mapping of recognizer labels to student records."""
+    
+    __slots__ = ('_records',)
+    
+    def __init__(self, records: Optional[dict] = None):
+        """
+        Create the index.
+        
+        Args:
+            records: Mapping of recognizer label to StudentRecord
+        """
+        self._records = MappingProxyType(dict(records or {}))
+    
+    @classmethod
+    def from_csv(cls, path: str = str(STUDENT_DETAILS_CSV)) -> 'StudentIndex':
+        """
+        Load the index from the student details CSV.
+        
+        Rows without a numeric ID cannot be recognized and are skipped. If
+        an ID was registered more than once, the latest row wins, matching
+        the pack file that training appends to.
+        
+        Args:
+            path: Path to the student details CSV
+            
+        Returns:
+            Index of the registered students
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                "Student details not found. Please register students first!"
+            )
+        
+        records = {}
+        with open(path, 'r', newline='') as csvFile:
+            reader = csv.reader(csvFile)
+            header = next(reader, [])
+            try:
+                serial_col = header.index('SERIAL NO.')
+                id_col = header.index('ID')
+                name_col = header.index('NAME')
+            except ValueError:
+                raise ValueError(f"Unexpected student details header in {path}")
+            
+            width = max(serial_col, id_col, name_col)
+            for row in reader:
+                if len(row) <= width:
+                    continue
+                student_id = row[id_col].strip()
+                label = student_label(student_id)
+                if label < 0:
+                    continue
+                serial = row[serial_col].strip()
+                records[label] = StudentRecord(
+                    int(serial) if serial.isdigit() else 0,
+                    student_id,
+                    row[name_col].strip()
+                )
+        
+        return cls(records)
+    
+    def get(self, label: int) -> Optional[StudentRecord]:
+        """
+        Look up a student by recognizer label.
+        
+        Args:
+            label: Label returned by the recognizer
+            
+        Returns:
+            Student record, or None if the label is not registered
+        """
+        return self._records.get(label)
+    
+    def __contains__(self, label: int) -> bool:
+        return label in self._records
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._records)
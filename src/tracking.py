@@ -0,0 +1,238 @@
+"""
+Lightweight face tracking module for attendance tracking.
+
+This module follows detected faces between full Haar cascade passes using
+IoU matching and small template searches, so identities can carry over
+from frame to frame without re-running detection and recognition.
+"""
+
+import cv2
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config.config import (
+    TRACK_IOU_THRESHOLD, TRACK_MATCH_THRESHOLD, TRACK_SEARCH_MARGIN,
+    TRACK_TEMPLATE_SIZE, RECOGNITION_VOTES, RECOGNITION_MAX_PREDICTIONS
+)
+
+Box = Tuple[int, int, int, int]
+
+
+class FaceTrack:
+    """Class holding the state of a single tracked face."""
+    
+    def __init__(self, track_id: int, box: Box):
+        """
+        Initialize a face track.
+        
+        Args:
+            track_id: Unique ID of the track
+            box: Face bounding box as (x, y, w, h)
+        """
+        self.track_id = track_id
+        self.box = box
+        self.template = None
+        self.scale = 1.0
+        self.label = None
+        self.student_id = None
+        self.name = None
+        self.confidence = None
+        self.votes: Dict[int, List[float]] = {}
+        self.predictions = 0
+    
+    @property
+    def identified(self) -> bool:
+        """Whether an identity has been assigned to this track."""
+        return self.label is not None
+    
+    @property
+    def needs_prediction(self) -> bool:
+        """Whether the face should still be passed to the recognizer."""
+        return self.label is None and self.predictions < RECOGNITION_MAX_PREDICTIONS
+    
+    def add_vote(self, label: Optional[int], confidence: float,
+                 votes_needed: int = RECOGNITION_VOTES) -> Optional[int]:
+        """
+        Record one prediction and decide whether the identity is settled.
+        
+        An identity is settled once it has votes_needed confident votes and
+        more confident votes than every other label together, so a single
+        wrong frame cannot mark a student.
+        
+        Args:
+            label: Confidently predicted label, None for an unknown face
+            confidence: Distance reported by the recognizer
+            votes_needed: Confident votes required to settle an identity
+            
+        Returns:
+            The settled label, or None while the identity is open
+        """
+        self.predictions += 1
+        if label is None:
+            return None
+        
+        votes = self.votes.setdefault(label, [])
+        votes.append(confidence)
+        others = sum(len(v) for other, v in self.votes.items() if other != label)
+        if len(votes) >= votes_needed and len(votes) > others:
+            return label
+        return None
+    
+    def set_template(self, gray: np.ndarray) -> None:
+        """
+        Store a downscaled template of the face for template matching.
+        
+        Args:
+            gray: Grayscale frame the box refers to
+        """
+        x, y, w, h = self.box
+        self.scale = min(1.0, TRACK_TEMPLATE_SIZE / float(max(w, 1)))
+        face = gray[y:y + h, x:x + w]
+        self.template = cv2.resize(face, None, fx=self.scale, fy=self.scale,
+                                   interpolation=cv2.INTER_AREA)
+
+
+def box_iou(box_a: Box, box_b: Box) -> float:
+    """
+    Compute the intersection over union of two boxes.
+    
+    Args:
+        box_a: First box as (x, y, w, h)
+        box_b: Second box as (x, y, w, h)
+        
+    Returns:
+        IoU value between 0 and 1
+    """
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / float(union) if union > 0 else 0.0
+
+
+class FaceTracker:
+    """Class for following faces between full detection passes."""
+    
+    def __init__(self, iou_threshold: float = TRACK_IOU_THRESHOLD,
+                 match_threshold: float = TRACK_MATCH_THRESHOLD,
+                 search_margin: float = TRACK_SEARCH_MARGIN):
+        """
+        Initialize the face tracker.
+        
+        Args:
+            iou_threshold: Minimum IoU for a detection to continue a track
+            match_threshold: Minimum template match score to keep a track
+            search_margin: Search window padding as a fraction of the box size
+        """
+        self.iou_threshold = iou_threshold
+        self.match_threshold = match_threshold
+        self.search_margin = search_margin
+        self.tracks: List[FaceTrack] = []
+        self._next_id = 1
+    
+    @property
+    def track_count(self) -> int:
+        """Number of tracks started so far."""
+        return self._next_id - 1
+    
+    def update(self, gray: np.ndarray, boxes: Sequence) -> List[FaceTrack]:
+        """
+        Match fresh detections to the existing tracks.
+        
+        Detections that overlap a track continue it and keep its identity,
+        unmatched detections start new tracks and unmatched tracks are dropped.
+        
+        Args:
+            gray: Grayscale frame the detections come from
+            boxes: Detected face boxes as (x, y, w, h)
+            
+        Returns:
+            List of current tracks
+        """
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        pairs = sorted(
+            (
+                (box_iou(track.box, box), t, b)
+                for t, track in enumerate(self.tracks)
+                for b, box in enumerate(boxes)
+            ),
+            reverse=True
+        )
+        
+        matched_tracks = {}
+        used_boxes = set()
+        for iou, t, b in pairs:
+            if iou < self.iou_threshold:
+                break
+            if t in matched_tracks or b in used_boxes:
+                continue
+            matched_tracks[t] = b
+            used_boxes.add(b)
+        
+        tracks = []
+        for t, b in matched_tracks.items():
+            track = self.tracks[t]
+            track.box = boxes[b]
+            tracks.append(track)
+        for b, box in enumerate(boxes):
+            if b not in used_boxes:
+                tracks.append(FaceTrack(self._next_id, box))
+                self._next_id += 1
+        
+        for track in tracks:
+            track.set_template(gray)
+        self.tracks = tracks
+        return self.tracks
+    
+    def follow(self, gray: np.ndarray) -> bool:
+        """
+        Move every track to its best template match near the previous box.
+        
+        Args:
+            gray: Current grayscale frame
+            
+        Returns:
+            True if all tracks were followed, False if any track was lost
+        """
+        kept = [track for track in self.tracks if self._follow_track(gray, track)]
+        lost = len(kept) != len(self.tracks)
+        self.tracks = kept
+        return not lost
+    
+    def _follow_track(self, gray: np.ndarray, track: FaceTrack) -> bool:
+        """
+        Search for a track's template in a window around its last box.
+        
+        Args:
+            gray: Current grayscale frame
+            track: Track to follow
+            
+        Returns:
+            True if the track was found, False otherwise
+        """
+        x, y, w, h = track.box
+        frame_h, frame_w = gray.shape[:2]
+        mx, my = int(w * self.search_margin), int(h * self.search_margin)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(frame_w, x + w + mx), min(frame_h, y + h + my)
+        
+        window = cv2.resize(gray[y0:y1, x0:x1], None, fx=track.scale,
+                            fy=track.scale, interpolation=cv2.INTER_AREA)
+        th, tw = track.template.shape[:2]
+        if window.shape[0] < th or window.shape[1] < tw:
+            return False
+        
+        result = cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        if score < self.match_threshold:
+            return False
+        
+        nx = x0 + int(round(location[0] / track.scale))
+        ny = y0 + int(round(location[1] / track.scale))
+        track.box = (min(nx, frame_w - w), min(ny, frame_h - h), w, h)
+        return True
+    
+    def reset(self) -> None:
+        """Drop all tracks."""
+        self.tracks = []
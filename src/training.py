@@ -6,21 +6,54 @@ This module handles training the LBPH face recognizer with captured images.
 
 import cv2
 import os
+import json
+import logging
+import time
 import numpy as np
-from PIL import Image
-from typing import Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, List, Dict, Optional
 from config.config import (
-    HAARCASCADE_PATH, TRAINING_IMAGE_DIR, TRAINER_FILE,
-    TRAINING_LABEL_DIR
+    HAARCASCADE_PATH, TRAINING_IMAGE_DIR, TRAINER_FILE, TRAINER_BINARY_FILE,
+    MODEL_FORMAT, TRAINING_LABEL_DIR, TRAINING_MANIFEST_FILE, TRAINING_LOAD_WORKERS,
+    TRAINING_LOAD_CHUNK_SIZE, TRAIN_FROM_GALLERY, GALLERY_TRAIN_BATCH,
+    GALLERY_MAX_PER_LABEL
 )
 from src.utils import assure_path_exists
+from src.image_store import PACK_EXTENSION, parse_image_label, read_pack
+from src.gallery import FaceGallery
+from src.gallery_pruning import prune_gallery
+from src.recognition import LBPHMatcher
+from src.model_store import load_model, save_model
+
+logger = logging.getLogger(__name__)
 
 
 class FaceTrainer:
     """Class for training the face recognition model."""
     
-    def __init__(self):
-        """Initialize the face trainer."""
+    def __init__(self, load_workers: int = TRAINING_LOAD_WORKERS,
+                 load_chunk_size: int = TRAINING_LOAD_CHUNK_SIZE,
+                 use_gallery: bool = TRAIN_FROM_GALLERY,
+                 gallery_batch_size: int = GALLERY_TRAIN_BATCH,
+                 max_per_label: int = GALLERY_MAX_PER_LABEL):
+        """
+        Initialize the face trainer.
+        
+        Args:
+            load_workers: Number of threads decoding training images
+            load_chunk_size: Number of images decoded per task
+            use_gallery: Build the memory-mapped gallery and train from it
+                instead of holding every decoded image in memory
+            gallery_batch_size: Number of gallery crops passed per train call
+            max_per_label: Keep at most this many representative samples per
+                label in the saved binary model, 0 to keep every sample
+        """
+        self.load_workers = max(1, load_workers)
+        self.load_chunk_size = max(1, load_chunk_size)
+        self.use_gallery = use_gallery
+        self.gallery_batch_size = max(1, gallery_batch_size)
+        self.max_per_label = max(0, max_per_label)
+        self.load_stats = {}
         self.recognizer = cv2.face.LBPHFaceRecognizer_create()
         self.detector = None
         self._load_cascade()
@@ -33,18 +66,36 @@ class FaceTrainer:
             )
         self.detector = cv2.CascadeClassifier(str(HAARCASCADE_PATH))
     
-    def train_model(self) -> Tuple[bool, str, int]:
+    def train_model(self, rebuild: bool = False) -> Tuple[bool, str, int]:
         """
         Train the face recognition model with captured images.
         
+        When a trained model and its manifest exist, only images that are not
+        yet in the model are added with recognizer.update(). Otherwise, or
+        when rebuild is set, the model is retrained from every image.
+        
+        Args:
+            rebuild: Retrain from scratch instead of updating the existing model
+            
         Returns:
             Tuple of (success: bool, message: str, num_registrations: int)
         """
         # Ensure directory exists
         assure_path_exists(str(TRAINING_LABEL_DIR))
         
+        manifest = None if rebuild else load_training_manifest()
+        if manifest is not None and check_trained_model_exists():
+            return self._update_model(manifest)
+        
+        if self.use_gallery:
+            try:
+                gallery, sources = FaceGallery.build(str(TRAINING_IMAGE_DIR))
+            except Exception as e:
+                return False, f"Training failed: {str(e)}", 0
+            return self.train_from_gallery(gallery, sources)
+        
         # Get images and labels
-        faces, ids = self._get_images_and_labels(str(TRAINING_IMAGE_DIR))
+        faces, ids, sources = self._get_images_and_labels(str(TRAINING_IMAGE_DIR))
         
         if len(faces) == 0:
             return False, "No training images found. Please register first!", 0
@@ -54,71 +105,266 @@ class FaceTrainer:
             self.recognizer.train(faces, np.array(ids))
             
             # Save the trained model
-            self.recognizer.save(str(TRAINER_FILE))
+            labels = self._save_model()
+            save_training_manifest(sources)
+            
+            return True, "Profile saved successfully!", len(np.unique(labels))
+        
+        except Exception as e:
+            return False, f"Training failed: {str(e)}", 0
+    
+    def train_from_gallery(self, gallery: FaceGallery,
+                           sources: Optional[Dict[str, int]] = None) -> Tuple[bool, str, int]:
+        """
+        Train the model batch by batch from the memory-mapped gallery.
+        
+        Each batch is passed to the recognizer as views into the memory map,
+        so only the crops of the current batch are paged in.
+        
+        Args:
+            gallery: Gallery to train from
+            sources: Samples per training file included in the gallery, used
+                as the training manifest
+                
+        Returns:
+            Tuple of (success: bool, message: str, num_registrations: int)
+        """
+        if len(gallery) == 0:
+            return False, "No training images found. Please register first!", 0
+        
+        try:
+            for start, (crops, labels) in enumerate(gallery.batches(self.gallery_batch_size)):
+                if start == 0:
+                    self.recognizer.train(list(crops), labels)
+                else:
+                    self.recognizer.update(list(crops), labels)
             
-            num_registrations = ids[0] if ids else 0
-            return True, "Profile saved successfully!", num_registrations
+            labels = self._save_model()
+            if sources is not None:
+                save_training_manifest(sources)
+            
+            return True, "Profile saved successfully!", len(np.unique(labels))
         
         except Exception as e:
             return False, f"Training failed: {str(e)}", 0
     
-    def _get_images_and_labels(self, path: str) -> Tuple[List, List]:
+    def _update_model(self, manifest: Dict[str, int]) -> Tuple[bool, str, int]:
+        """
+        Add images that are not in the manifest to the existing model.
+        
+        Args:
+            manifest: Samples already incorporated in the model, per file
+            
+        Returns:
+            Tuple of (success: bool, message: str, num_registrations: int)
+        """
+        try:
+            if MODEL_FORMAT == 'binary':
+                model = load_model(str(TRAINER_BINARY_FILE))
+                labels = model.labels
+            else:
+                self.recognizer.read(str(TRAINER_FILE))
+                labels = self.recognizer.getLabels()
+            
+            faces, ids, sources = self._get_images_and_labels(
+                str(TRAINING_IMAGE_DIR), incorporated=manifest
+            )
+            if len(faces) == 0:
+                return True, "Profile already up to date!", len(np.unique(labels))
+            
+            if MODEL_FORMAT == 'binary':
+                # Histograms of the new images only, appended to the stored ones
+                recognizer = cv2.face.LBPHFaceRecognizer_create(
+                    model.radius, model.neighbors, model.grid_x, model.grid_y
+                )
+                recognizer.train(faces, np.array(ids))
+                added = LBPHMatcher.from_recognizer(recognizer)
+                model = LBPHMatcher(
+                    np.hstack([model.gallery, added.gallery]).T,
+                    np.concatenate([model.labels, added.labels]),
+                    radius=model.radius, neighbors=model.neighbors,
+                    grid_x=model.grid_x, grid_y=model.grid_y,
+                    threshold=model.threshold
+                )
+                model = prune_gallery(model, self.max_per_label)
+                save_model(str(TRAINER_BINARY_FILE), model)
+                labels = model.labels
+            else:
+                self.recognizer.update(faces, np.array(ids))
+                labels = self._save_model()
+            
+            manifest.update(sources)
+            save_training_manifest(manifest)
+            
+            return True, "Profile saved successfully!", len(np.unique(labels))
+        
+        except Exception as e:
+            return False, f"Training failed: {str(e)}", 0
+    
+    def _save_model(self) -> np.ndarray:
+        """
+        Save the trained recognizer in the configured model format.
+        
+        The binary format is pruned to max_per_label samples per label. The
+        YAML format is written by OpenCV and always keeps every sample.
+        
+        Returns:
+            Labels of the saved model
+        """
+        if MODEL_FORMAT == 'binary':
+            matcher = prune_gallery(LBPHMatcher.from_recognizer(self.recognizer),
+                                    self.max_per_label)
+            save_model(str(TRAINER_BINARY_FILE), matcher)
+            return matcher.labels
+        
+        self.recognizer.save(str(TRAINER_FILE))
+        return np.asarray(self.recognizer.getLabels()).ravel()
+    
+    def _get_images_and_labels(self, path: str,
+                               incorporated: Optional[Dict[str, int]] = None
+                               ) -> Tuple[List, List, Dict[str, int]]:
         """
         Extract faces and IDs from training images.
         
+        Reads both loose images and per-student packs. Files are decoded
+        straight to uint8 grayscale by a thread pool, in chunks, and returned
+        in file name order.
+        
         Args:
             path: Path to training images directory
-            
+            incorporated: Samples already in the model per file name; those
+                are left out so only new samples are returned
+                
         Returns:
-            Tuple of (faces list, IDs list)
+            Tuple of (faces list, IDs list, samples incorporated per file name)
         """
         if not os.path.exists(path):
-            return [], []
+            return [], [], {}
+        
+        incorporated = incorporated or {}
+        
+        # Get all training files, with the index of their first new sample
+        tasks = []
+        for filename in sorted(os.listdir(path)):
+            start = incorporated.get(filename, 0)
+            if filename.endswith(PACK_EXTENSION):
+                tasks.append((filename, start))
+            elif (filename.endswith(('.jpg', '.jpeg', '.png')) and start == 0
+                    and parse_image_label(filename) is not None):
+                tasks.append((filename, 0))
         
-        # Get all image paths
-        image_paths = [
-            os.path.join(path, f) 
-            for f in os.listdir(path) 
-            if f.endswith(('.jpg', '.jpeg', '.png'))
+        chunks = [
+            [(os.path.join(path, filename), start) for filename, start in
+             tasks[i:i + self.load_chunk_size]]
+            for i in range(0, len(tasks), self.load_chunk_size)
         ]
         
         faces = []
         ids = []
+        sources = {}
+        
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.load_workers) as executor:
+            # map() yields chunks in submission order, which keeps labels aligned
+            results = (
+                result
+                for chunk_results in executor.map(_load_training_chunk, chunks)
+                for result in chunk_results
+            )
+            for (filename, _), (label, images, count) in zip(tasks, results):
+                if label is None:
+                    print(f"Error processing {os.path.join(path, filename)}: "
+                          "could not decode image")
+                    continue
+                if label < 0 or not images:
+                    continue
+                faces.extend(images)
+                ids.extend([label] * len(images))
+                sources[filename] = count
+        
+        elapsed = time.perf_counter() - start_time
+        self.load_stats = {
+            'files': len(tasks),
+            'faces': len(faces),
+            'seconds': elapsed,
+            'files_per_second': len(tasks) / elapsed if elapsed > 0 else 0.0,
+            'workers': self.load_workers
+        }
+        if tasks:
+            logger.info("Loaded %d training files (%d faces) in %.2fs "
+                        "(%.0f files/s, %d workers)", len(tasks), len(faces), elapsed,
+                        self.load_stats['files_per_second'], self.load_workers)
         
-        for image_path in image_paths:
+        return faces, ids, sources
+
+
+def load_training_manifest() -> Optional[Dict[str, int]]:
+    """
+    Load the manifest of training files incorporated in the model.
+    
+    Returns:
+        Mapping of file name to samples incorporated, or None if unavailable
+    """
+    if not os.path.isfile(str(TRAINING_MANIFEST_FILE)):
+        return None
+    
+    try:
+        with open(str(TRAINING_MANIFEST_FILE), 'r') as f:
+            return dict(json.load(f)['files'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def save_training_manifest(files: Dict[str, int]) -> None:
+    """
+    Atomically write the manifest of training files incorporated in the model.
+    
+    Args:
+        files: Mapping of file name to samples incorporated
+    """
+    tmp_path = str(TRAINING_MANIFEST_FILE) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'files': files}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, str(TRAINING_MANIFEST_FILE))
+
+
+def _load_training_chunk(tasks: List[Tuple[str, int]]
+                         ) -> List[Tuple[Optional[int], List[np.ndarray], int]]:
+    """
+    Decode a chunk of training files to uint8 grayscale faces.
+    
+    Args:
+        tasks: (path, index of the first sample to return) per file
+        
+    Returns:
+        (label, faces, samples in file) per file, label None if unreadable
+    """
+    results = []
+    for image_path, start in tasks:
+        if image_path.endswith(PACK_EXTENSION):
             try:
-                # Load image and convert to grayscale
-                pil_image = Image.open(image_path).convert('L')
-                
-                # Convert to numpy array
-                image_np = np.array(pil_image, 'uint8')
-                
-                # Extract ID from filename
-                # Format: name.serial.id.sample.jpg
-                filename = os.path.split(image_path)[-1]
-                parts = filename.split('.')
-                
-                if len(parts) >= 3:
-                    try:
-                        student_id = int(parts[2])
-                        faces.append(image_np)
-                        ids.append(student_id)
-                    except ValueError:
-                        # Skip files with invalid ID format
-                        continue
-            
-            except Exception as e:
-                print(f"Error processing {image_path}: {str(e)}")
+                pack = read_pack(image_path, start)
+            except (OSError, ValueError):
+                results.append((None, [], 0))
                 continue
-        
-        return faces, ids
+            results.append((pack.label, pack.faces, pack.count))
+        else:
+            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                results.append((None, [], 0))
+                continue
+            label = parse_image_label(os.path.basename(image_path))
+            results.append((label, [image], 1))
+    return results
 
 
 def check_trained_model_exists() -> bool:
     """
-    Check if a trained model file exists.
+    Check if a trained model file exists in the configured format.
     
     Returns:
         True if trained model exists, False otherwise
     """
+    if MODEL_FORMAT == 'binary':
+        return os.path.isfile(str(TRAINER_BINARY_FILE))
     return os.path.isfile(str(TRAINER_FILE))
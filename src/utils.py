@@ -119,21 +119,16 @@ def validate_id(id_string: str) -> bool:
 
 def count_csv_entries(file_path: str) -> int:
     """
-    Count the number of data entries in a CSV file (excluding header).
+    Count the number of students registered in the student details CSV.
     
     Args:
-        file_path: Path to the CSV file
+        file_path: Path to the student details CSV
         
     Returns:
-        Number of entries
+        Number of entries, read from the registry sidecar when it is current
     """
-    if not os.path.isfile(file_path):
-        return 0
-    
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-        # Subtract header rows and account for empty row format
-        return (len(lines) // 2) - 1 if len(lines) > 1 else 0
+    from src.registry import StudentRegistry
+    return StudentRegistry(file_path).count()
 
 
 def get_next_serial_number(file_path: str) -> int:
@@ -144,15 +139,7 @@ def get_next_serial_number(file_path: str) -> int:
         file_path: Path to the student details CSV
         
     Returns:
-        Next available serial number
+        One more than the highest serial number registered
     """
-    if not os.path.isfile(file_path):
-        return 1
-    
-    import csv
-    serial = 0
-    with open(file_path, 'r') as csvFile:
-        reader = csv.reader(csvFile)
-        for line in reader:
-            serial += 1
-    return (serial // 2) if serial > 0 else 1
+    from src.registry import StudentRegistry
+    return StudentRegistry(file_path).next_serial()
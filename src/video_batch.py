@@ -0,0 +1,232 @@
+"""
+Offline attendance processing of recorded videos.
+
+This module splits recordings into time chunks and processes the chunks
+in a pool of worker processes, running detection and recognition on every
+Nth frame. Each chunk reports the first frame every student was seen in,
+once they were recognized in enough frames of the chunk, and the results are merged into one attendance list with the time each
+student was first seen in the recording.
+"""
+
+import cv2
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from config.config import (
+    CONFIDENCE_THRESHOLD, RECOGNITION_VOTES,
+    VIDEO_CHUNK_SECONDS, VIDEO_FRAME_STEP, VIDEO_WORKERS
+)
+from src.attendance import AttendanceTracker
+from src.attendance_log import AttendanceWriter
+from src.detection import FaceDetector
+from src.multi_camera import SharedModel
+from src.recognition import LBPHMatcher
+from src.utils import format_date, format_time
+
+# Per-process state of the pool workers
+_worker = {}
+
+
+def _init_worker(model_spec: Dict) -> None:
+    """
+    Load the shared model and face detector once per worker process.
+    
+    Args:
+        model_spec: Description of the shared model
+    """
+    # Workers already run in parallel, so keep OpenCV single threaded
+    cv2.setNumThreads(1)
+    _worker['model'] = SharedModel.attach(model_spec)
+    _worker['matcher'] = _worker['model'].matcher()
+    _worker['detector'] = FaceDetector(scale_factor=1.2, min_neighbors=5)
+
+
+def _process_chunk(path: str, start: int, stop: Optional[int],
+                   frame_step: int) -> Tuple[Dict[int, Tuple[int, float]], int]:
+    """
+    Find the first frame each student is recognized in within a chunk.
+    
+    A student only counts as seen after RECOGNITION_VOTES confident
+    predictions in the chunk, and is reported at the first of them, so a
+    single misrecognized frame cannot mark a student.
+    
+    Args:
+        path: Video file
+        start: First frame of the chunk
+        stop: Frame after the chunk, None to read until the end
+        frame_step: Only frames whose index is a multiple of this are processed
+        
+    Returns:
+        Tuple of (mapping of label to (frame index, confidence), frames processed)
+    """
+    matcher = _worker['matcher']
+    detector = _worker['detector']
+    cam = cv2.VideoCapture(path)
+    if start:
+        cam.set(cv2.CAP_PROP_POS_FRAMES, start)
+    
+    first_seen = {}
+    hits: Dict[int, List[Tuple[int, float]]] = {}
+    processed = 0
+    index = start
+    try:
+        while stop is None or index < stop:
+            if index % frame_step:
+                # Skipped frames are only demuxed, not converted
+                if not cam.grab():
+                    break
+                index += 1
+                continue
+            
+            ret, frame = cam.read()
+            if not ret:
+                break
+            processed += 1
+            
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            crops = [gray[y:y + h, x:x + w] for (x, y, w, h) in detector.detect(gray)]
+            for label, confidence in matcher.predict_batch(crops):
+                if confidence >= CONFIDENCE_THRESHOLD or label in first_seen:
+                    continue
+                seen = hits.setdefault(label, [])
+                seen.append((index, confidence))
+                if len(seen) >= RECOGNITION_VOTES:
+                    first_seen[label] = seen[0]
+            index += 1
+    finally:
+        cam.release()
+    
+    return first_seen, processed
+
+
+class VideoAttendanceProcessor:
+    """Class for marking attendance from recorded videos."""
+    
+    def __init__(self, workers: int = VIDEO_WORKERS,
+                 chunk_seconds: float = VIDEO_CHUNK_SECONDS,
+                 frame_step: int = VIDEO_FRAME_STEP):
+        """
+        Initialize the processor.
+        
+        Args:
+            workers: Number of worker processes
+            chunk_seconds: Length of the chunks the videos are split into
+            frame_step: Run detection on every Nth frame
+        """
+        self.workers = max(1, workers)
+        self.chunk_seconds = chunk_seconds
+        self.frame_step = max(1, frame_step)
+        self.stats = {}
+        
+        # Loading a tracker checks the cascade, model and student details
+        tracker = AttendanceTracker()
+        self.matcher = tracker.matcher or LBPHMatcher.from_recognizer(tracker.recognizer)
+        self.students = tracker.students
+    
+    def _chunks(self, path: str) -> Tuple[List[Tuple[int, Optional[int]]], float, float]:
+        """
+        Split a video into frame ranges.
+        
+        Args:
+            path: Video file
+            
+        Returns:
+            Tuple of (list of (start, stop) frames, frames per second, duration in seconds)
+        """
+        cam = cv2.VideoCapture(path)
+        if not cam.isOpened():
+            raise FileNotFoundError(f"Could not open video {path}")
+        fps = cam.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cam.get(cv2.CAP_PROP_FRAME_COUNT))
+        cam.release()
+        
+        if frame_count <= 0:
+            # Unknown length, process the whole file as one chunk
+            return [(0, None)], fps, 0.0
+        
+        chunk_frames = max(self.frame_step, int(self.chunk_seconds * fps))
+        chunks = [
+            (start, min(start + chunk_frames, frame_count))
+            for start in range(0, frame_count, chunk_frames)
+        ]
+        return chunks, fps, frame_count / fps
+    
+    def process(self, paths: List[str], start_times: Optional[Dict[str, float]] = None,
+                save: bool = True) -> Tuple[bool, str, List]:
+        """
+        Mark attendance from one or more recordings.
+        
+        Args:
+            paths: Video files
+            start_times: Optional Unix time each recording started at. By
+                default a recording is assumed to end at its modification time.
+            save: Append the records to the attendance CSV of their day
+            
+        Returns:
+            Tuple of (success: bool, message: str, attendance_records: List)
+        """
+        start_times = dict(start_times or {})
+        tasks = []
+        duration = 0.0
+        fps_of = {}
+        for path in paths:
+            chunks, fps, length = self._chunks(path)
+            fps_of[path] = fps
+            duration += length
+            start_times.setdefault(path, os.path.getmtime(path) - length)
+            tasks.extend((path, start, stop) for start, stop in chunks)
+        
+        started = time.perf_counter()
+        first_seen = {}
+        processed = 0
+        model = SharedModel.create(self.matcher)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(tasks)),
+                mp_context=mp.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(model.spec,)
+            ) as pool:
+                futures = [
+                    (path, pool.submit(_process_chunk, path, start, stop, self.frame_step))
+                    for path, start, stop in tasks
+                ]
+                for path, future in futures:
+                    seen, count = future.result()
+                    processed += count
+                    for label, (index, confidence) in seen.items():
+                        ts = start_times[path] + index / fps_of[path]
+                        if label not in first_seen or ts < first_seen[label][0]:
+                            first_seen[label] = (ts, confidence)
+        finally:
+            model.unlink()
+        
+        elapsed = time.perf_counter() - started
+        self.stats = {
+            'videos': len(paths),
+            'chunks': len(tasks),
+            'frames_processed': processed,
+            'video_seconds': duration,
+            'elapsed_seconds': elapsed,
+            'speedup': duration / elapsed if elapsed > 0 else 0.0
+        }
+        
+        records = []
+        for label, (ts, _) in sorted(first_seen.items(), key=lambda item: item[1][0]):
+            student = self.students.get(label)
+            if student is None:
+                continue
+            records.append([student.student_id, '', student.name, '',
+                            format_date(ts), '', format_time(ts)])
+        
+        if not records:
+            return False, "No faces recognized", []
+        
+        if save:
+            # Records are grouped into the file of their own day
+            with AttendanceWriter() as writer:
+                for record in records:
+                    writer.append(record)
+        return True, "Attendance recorded successfully", records
@@ -0,0 +1,24 @@
+"""
+Shared fixtures for the attendance system tests.
+"""
+
+import sys
+from pathlib import Path
+import pytest
+
+# Add project root to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def attendance_row(student_id, date: str = '01-09-2025', time: str = '09:00:00'):
+    """Attendance row in the ATTENDANCE_COLUMNS layout."""
+    return [str(student_id), '', f"Student {student_id}", '', date, '', time]
+
+
+@pytest.fixture
+def attendance_dir(tmp_path):
+    """Empty attendance directory."""
+    directory = tmp_path / 'Attendance'
+    directory.mkdir()
+    return str(directory)
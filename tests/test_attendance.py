@@ -0,0 +1,28 @@
+"""
+Tests for the attendance tracker.
+"""
+
+from conftest import attendance_row
+from src import attendance
+from src.attendance import AttendanceTracker
+from src.storage import CSVStorage
+from src.utils import format_date, get_current_timestamp
+
+
+def test_today_attendance_reuses_one_storage(tmp_path, attendance_dir, monkeypatch):
+    storage = CSVStorage(str(tmp_path / 'StudentDetails.csv'), attendance_dir, durable=False)
+    opened, closed = [], []
+    storage.close = lambda: closed.append(storage)
+    monkeypatch.setattr(attendance, 'open_storage', lambda: opened.append(storage) or storage)
+    monkeypatch.setattr(AttendanceTracker, '_load_models', lambda self: None)
+    tracker = AttendanceTracker(target_fps=0)
+    
+    today = format_date(get_current_timestamp())
+    storage.add_attendance(today, [attendance_row(101, today)])
+    assert [row[0] for row in tracker.get_today_attendance()] == ['101']
+    storage.add_attendance(today, [attendance_row(102, today)])
+    assert [row[0] for row in tracker.get_today_attendance()] == ['101', '102']
+    assert len(opened) == 1
+    
+    tracker.close()
+    assert closed == [storage]
@@ -0,0 +1,127 @@
+"""
+Tests for the per-day index of marked students.
+"""
+
+import builtins
+import json
+import multiprocessing
+import pytest
+from conftest import attendance_row
+from config.config import ATTENDANCE_COLUMNS
+from src import attendance_log
+from src.attendance_log import (
+    AttendanceIndex, attendance_file, attendance_index_file, read_attendance_file
+)
+from src.storage import CSVStorage
+
+DATE = '01-09-2025'
+
+
+def mark_students(directory, student_ids):
+    """Append the students one by one, as a tracking process would."""
+    index = AttendanceIndex(DATE, directory)
+    for student_id in student_ids:
+        index.append([attendance_row(student_id)], durable=False)
+
+
+def test_append_skips_students_already_marked(attendance_dir):
+    index = AttendanceIndex(DATE, attendance_dir)
+    
+    assert index.append([attendance_row(1), attendance_row(2)], durable=False) == \
+        [attendance_row(1), attendance_row(2)]
+    assert index.append([attendance_row(2), attendance_row(3), attendance_row(3)],
+                        durable=False) == [attendance_row(3)]
+    assert [row[0] for row in read_attendance_file(
+        str(attendance_file(DATE, attendance_dir)))] == ['1', '2', '3']
+
+
+def test_sidecar_records_ids_and_offset(attendance_dir):
+    index = AttendanceIndex(DATE, attendance_dir)
+    index.append([attendance_row(1), attendance_row(2)], durable=False)
+    
+    with open(attendance_index_file(DATE, attendance_dir)) as f:
+        saved = json.load(f)
+    assert saved == {'offset': attendance_file(DATE, attendance_dir).stat().st_size,
+                     'ids': ['1', '2']}
+
+
+def test_new_session_reads_only_rows_after_the_offset(attendance_dir):
+    AttendanceIndex(DATE, attendance_dir).append([attendance_row(1)], durable=False)
+    path = attendance_file(DATE, attendance_dir)
+    
+    # A row appended without updating the sidecar, as by an older version
+    with open(path, 'a', newline='') as f:
+        f.write(','.join(attendance_row(2)) + '\r\n')
+    
+    index = AttendanceIndex(DATE, attendance_dir)
+    assert index.offset == path.stat().st_size
+    assert '1' in index and '2' in index
+    assert len(index) == 2
+
+
+def test_other_writers_are_seen_by_is_marked(attendance_dir):
+    first = AttendanceIndex(DATE, attendance_dir)
+    second = AttendanceIndex(DATE, attendance_dir)
+    second.append([attendance_row(7)], durable=False)
+    
+    assert '7' not in first
+    assert first.is_marked(7)
+    assert first.append([attendance_row(7)], durable=False) == []
+
+
+def test_unreadable_sidecar_is_rebuilt(attendance_dir):
+    AttendanceIndex(DATE, attendance_dir).append(
+        [attendance_row(1), attendance_row(2)], durable=False
+    )
+    attendance_index_file(DATE, attendance_dir).write_text('{"offset": ')
+    
+    index = AttendanceIndex(DATE, attendance_dir)
+    assert index.marked == {'1', '2'}
+
+
+def test_sidecar_past_the_end_of_a_rewritten_file_is_ignored(attendance_dir):
+    AttendanceIndex(DATE, attendance_dir).append(
+        [attendance_row(1), attendance_row(2)], durable=False
+    )
+    path = attendance_file(DATE, attendance_dir)
+    path.write_text(','.join(ATTENDANCE_COLUMNS) + '\n')
+    
+    index = AttendanceIndex(DATE, attendance_dir)
+    assert len(index) == 0
+    assert index.append([attendance_row(1)], durable=False) == [attendance_row(1)]
+
+
+def test_processes_never_mark_a_student_twice(attendance_dir):
+    # Every process tries to mark the same students
+    student_ids = list(range(40))
+    processes = [
+        multiprocessing.Process(target=mark_students, args=(attendance_dir, student_ids))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    
+    rows = read_attendance_file(str(attendance_file(DATE, attendance_dir)))
+    assert sorted(int(row[0]) for row in rows) == student_ids
+    assert AttendanceIndex(DATE, attendance_dir).marked == {str(s) for s in student_ids}
+
+
+def test_failed_write_does_not_mark_students(attendance_dir, tmp_path, monkeypatch):
+    # The first append to the day file fails, as on a full disk
+    def failing_open(path, mode='r', *args, **kwargs):
+        if mode == 'a':
+            monkeypatch.undo()
+            raise OSError("No space left on device")
+        return builtins.open(path, mode, *args, **kwargs)
+    
+    storage = CSVStorage(str(tmp_path / 'students.csv'), attendance_dir, durable=False)
+    monkeypatch.setattr(attendance_log, 'open', failing_open, raising=False)
+    with pytest.raises(OSError):
+        storage.add_attendance(DATE, [attendance_row(1)])
+    
+    assert not storage.is_marked(1, DATE)
+    assert storage.add_attendance(DATE, [attendance_row(1)]) == [attendance_row(1)]
+    assert read_attendance_file(str(attendance_file(DATE, attendance_dir))) == [attendance_row(1)]
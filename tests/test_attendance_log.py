@@ -0,0 +1,183 @@
+"""
+Tests for the durable attendance log.
+"""
+
+import builtins
+import csv
+from conftest import attendance_row
+from config.config import ATTENDANCE_COLUMNS
+from src import attendance_log
+from src.attendance_log import (
+    AttendanceSink, AttendanceWriter, attendance_file, read_attendance_file,
+    recover_attendance_file, tail_attendance_file
+)
+from src.storage import CSVStorage
+
+
+def write_day(path, rows, torn: str = ''):
+    """Write a day CSV, optionally ending in a partly written row."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(ATTENDANCE_COLUMNS)
+        writer.writerows(rows)
+        f.write(torn)
+
+
+class FailingStorage:
+    """Storage whose attendance writes fail until it is repaired."""
+    
+    def __init__(self):
+        self.failing = True
+        self.rows = []
+    
+    def add_attendance(self, date, records):
+        if self.failing:
+            raise OSError("No space left on device")
+        self.rows.extend(records)
+        return records
+    
+    def close(self):
+        pass
+
+
+def test_recover_removes_torn_tail(tmp_path):
+    path = tmp_path / 'Attendance_01-09-2025.csv'
+    write_day(path, [attendance_row(1)], torn='2,,Stud')
+    
+    assert recover_attendance_file(str(path)) == len('2,,Stud')
+    assert read_attendance_file(str(path)) == [attendance_row(1)]
+    assert recover_attendance_file(str(path)) == 0
+
+
+def test_tail_leaves_torn_row_for_next_call(tmp_path):
+    path = tmp_path / 'Attendance_01-09-2025.csv'
+    write_day(path, [attendance_row(1)], torn='2,,Student 2')
+    
+    rows, offset = tail_attendance_file(str(path))
+    assert rows == [attendance_row(1)]
+    
+    # The writer finishes the row, only it is read from the offset
+    with open(path, 'a', newline='') as f:
+        f.write(',,01-09-2025,,09:00:00\r\n')
+    rows, end = tail_attendance_file(str(path), offset)
+    assert rows == [attendance_row(2)]
+    assert end == path.stat().st_size
+    assert tail_attendance_file(str(path), end) == ([], end)
+
+
+def test_tail_rereads_a_truncated_file(tmp_path):
+    path = tmp_path / 'Attendance_01-09-2025.csv'
+    write_day(path, [attendance_row(1), attendance_row(2)])
+    _, offset = tail_attendance_file(str(path))
+    
+    write_day(path, [attendance_row(3)])
+    rows, _ = tail_attendance_file(str(path), offset)
+    assert rows == [attendance_row(3)]
+
+
+def test_writer_appends_after_torn_tail(tmp_path, attendance_dir):
+    path = attendance_file('01-09-2025', attendance_dir)
+    write_day(path, [attendance_row(1)], torn='2,,Stud')
+    storage = CSVStorage(str(tmp_path / 'students.csv'), attendance_dir, durable=False)
+    
+    with AttendanceWriter(storage=storage, commit_ms=0) as writer:
+        writer.append(attendance_row(3))
+        assert writer.flush(5)
+    
+    assert read_attendance_file(str(path)) == [attendance_row(1), attendance_row(3)]
+    assert writer.stats['records'] == 1
+
+
+def test_writer_groups_rows_into_commits(tmp_path, attendance_dir):
+    storage = CSVStorage(str(tmp_path / 'students.csv'), attendance_dir, durable=False)
+    
+    with AttendanceWriter(storage=storage, batch_size=4, commit_ms=60000) as writer:
+        for student_id in range(8):
+            writer.append(attendance_row(student_id))
+        assert writer.flush(5)
+    
+    path = attendance_file('01-09-2025', attendance_dir)
+    assert len(read_attendance_file(str(path))) == 8
+    assert writer.stats['commits'] == 2
+
+
+def test_failed_rows_are_retried_not_counted():
+    storage = FailingStorage()
+    writer = AttendanceWriter(storage=storage, commit_ms=0)
+    writer.append(attendance_row(1))
+    
+    assert not writer.flush(5)
+    assert writer.failed == 1
+    assert writer.stats['records'] == 0
+    
+    storage.failing = False
+    assert writer.flush(5)
+    assert writer.failed == 0
+    assert writer.stats['records'] == 1
+    assert storage.rows == [attendance_row(1)]
+    assert writer.close()
+
+
+def test_close_reports_rows_that_could_not_be_written():
+    storage = FailingStorage()
+    writer = AttendanceWriter(storage=storage, commit_ms=0)
+    writer.append(attendance_row(1))
+    
+    assert not writer.close()
+    assert writer.failed == 1
+    assert storage.rows == []
+
+
+def test_failed_csv_write_is_retried_on_flush(tmp_path, attendance_dir, monkeypatch):
+    failures = []
+    
+    # The first append to the day file fails, as on a full disk
+    def failing_open(path, mode='r', *args, **kwargs):
+        if mode == 'a' and not failures:
+            failures.append(path)
+            raise OSError("No space left on device")
+        return builtins.open(path, mode, *args, **kwargs)
+    
+    monkeypatch.setattr(attendance_log, 'open', failing_open, raising=False)
+    storage = CSVStorage(str(tmp_path / 'students.csv'), attendance_dir, durable=False)
+    writer = AttendanceWriter(storage=storage, commit_ms=0)
+    writer.append(attendance_row(1))
+    writer.append(attendance_row(2))
+    
+    # flush() retries the rows of the failed write
+    assert writer.flush(5)
+    assert writer.close()
+    assert len(failures) == 1
+    assert writer.failed == 0
+    assert writer.stats['records'] == 2
+    assert writer.stats['duplicates'] == 0
+    path = attendance_file('01-09-2025', attendance_dir)
+    assert sorted(read_attendance_file(str(path))) == [attendance_row(1), attendance_row(2)]
+
+
+def test_records_count_only_rows_written(tmp_path, attendance_dir):
+    storage = CSVStorage(str(tmp_path / 'students.csv'), attendance_dir, durable=False)
+    
+    with AttendanceWriter(storage=storage, commit_ms=0) as writer:
+        writer.append(attendance_row(1))
+        writer.append(attendance_row(1, time='09:05:00'))
+        assert writer.flush(5)
+    
+    assert writer.stats['records'] == 1
+    assert writer.stats['duplicates'] == 1
+
+
+def test_sink_marks_each_student_once(tmp_path, attendance_dir):
+    storage = CSVStorage(str(tmp_path / 'StudentDetails.csv'), attendance_dir, durable=False)
+    storage.add_attendance('01-09-2025', [attendance_row(101)])
+    shown = []
+    
+    with AttendanceWriter(storage=storage, commit_ms=0) as writer:
+        sink = AttendanceSink(lambda *fields: shown.append(fields), writer)
+        assert not sink.add(0, 1, attendance_row(101))
+        assert sink.add(1, 2, attendance_row(102))
+        assert not sink.add(0, 2, attendance_row(102))
+    
+    assert sink.records == [attendance_row(102)]
+    assert shown == [('102', 'Student 102', '01-09-2025', '09:00:00')]
+    assert [row[0] for row in storage.attendance_on('01-09-2025')] == ['101', '102']
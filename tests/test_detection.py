@@ -0,0 +1,63 @@
+"""
+Tests for downscaled face detection.
+"""
+
+import numpy as np
+from src.detection import CASCADE_WINDOW, FaceDetector, kiosk_face_size_range
+
+
+class RecordingCascade:
+    """Cascade stub returning fixed boxes and recording what it was given."""
+    
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.calls = []
+    
+    def detectMultiScale(self, image, scale_factor, min_neighbors, minSize, maxSize):
+        self.calls.append((image.shape, minSize, maxSize))
+        return self.boxes
+
+
+def detector_with(boxes, **kwargs):
+    detector = FaceDetector(**kwargs)
+    detector.cascade = RecordingCascade(boxes)
+    return detector
+
+
+def test_boxes_are_mapped_back_to_full_resolution():
+    detector = detector_with([(10, 20, 30, 30)], scale=0.5, distance_range=None)
+    
+    boxes = detector.detect(np.zeros((480, 640), dtype=np.uint8))
+    assert detector.cascade.calls[0][0] == (240, 320)
+    assert boxes.tolist() == [[20, 40, 60, 60]]
+
+
+def test_mapped_boxes_stay_inside_the_frame():
+    detector = detector_with([(300, 220, 40, 40)], scale=0.5, distance_range=None)
+    
+    x, y, w, h = detector.detect(np.zeros((480, 640), dtype=np.uint8))[0]
+    assert (x, y) == (600, 440)
+    assert x + w <= 640 and y + h <= 480
+
+
+def test_full_scale_passes_boxes_through():
+    detector = detector_with([(5, 6, 70, 80)], scale=1.0, distance_range=None)
+    
+    assert detector.detect(np.zeros((100, 120), dtype=np.uint8)).tolist() == [[5, 6, 70, 80]]
+    assert detector.cascade.calls[0][0] == (100, 120)
+
+
+def test_no_faces_gives_an_empty_array():
+    detector = detector_with((), scale=0.5)
+    
+    assert detector.detect(np.zeros((480, 640), dtype=np.uint8)).shape == (0, 4)
+
+
+def test_size_hints_are_scaled_with_the_frame():
+    detector = detector_with((), scale=0.5)
+    detector.detect(np.zeros((480, 640), dtype=np.uint8))
+    
+    min_size, max_size = kiosk_face_size_range(640)
+    _, hint_min, hint_max = detector.cascade.calls[0]
+    assert hint_min[0] == max(CASCADE_WINDOW, int(min_size * 0.5))
+    assert hint_max[0] >= max_size * 0.5
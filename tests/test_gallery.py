@@ -0,0 +1,43 @@
+"""
+Tests for the memory-mapped face gallery.
+"""
+
+import numpy as np
+from src import gallery
+from src.gallery import FaceGallery
+from src.image_store import read_pack, write_pack
+
+
+def crops(count, seed, shape=(40, 30)):
+    """Random grayscale face crops."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def test_build_normalizes_every_crop(tmp_path):
+    images = tmp_path / 'images'
+    images.mkdir()
+    write_pack(str(images / '101.1.pack'), crops(3, 0), 101, 1, '101', 'Asha')
+    write_pack(str(images / '102.2.pack'), crops(2, 1), 102, 2, '102', 'Ben')
+    
+    built, sources = FaceGallery.build(str(images), str(tmp_path / 'gallery'), (20, 20))
+    assert sources == {'101.1.pack': 3, '102.2.pack': 2}
+    assert len(built) == 5
+    assert [run.shape for run in built.samples(102)] == [(2, 20, 20)]
+
+
+def test_pack_growing_during_build_keeps_counted_crops(tmp_path, monkeypatch):
+    images = tmp_path / 'images'
+    images.mkdir()
+    path = str(images / '101.1.pack')
+    write_pack(path, crops(3, 0), 101, 1, '101', 'Asha')
+    
+    def read_after_capture(pack_path, start=0):
+        # A capture session appends between counting and decoding
+        write_pack(pack_path, crops(2, 1), 101, 1, '101', 'Asha')
+        return read_pack(pack_path, start)
+    monkeypatch.setattr(gallery, 'read_pack', read_after_capture)
+    
+    built, sources = FaceGallery.build(str(images), str(tmp_path / 'gallery'), (20, 20))
+    assert sources == {'101.1.pack': 3}
+    assert len(built) == 3
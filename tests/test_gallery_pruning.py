@@ -0,0 +1,48 @@
+"""
+Tests for pruning the LBPH gallery to a few samples per student.
+"""
+
+import numpy as np
+from src.gallery_pruning import farthest_point_selection, prune_gallery
+from src.recognition import LBPHMatcher
+
+
+def clustered_histograms(rng, centres, per_centre, bins=32):
+    """Normalized histograms spread around a few random centres."""
+    rows = []
+    for centre in rng.random((centres, bins)):
+        for _ in range(per_centre):
+            row = centre + rng.random(bins) * 0.05
+            rows.append(row / row.sum())
+    return np.array(rows, dtype=np.float32)
+
+
+def test_prune_keeps_at_most_the_limit_per_label():
+    rng = np.random.default_rng(0)
+    histograms = np.concatenate([clustered_histograms(rng, 2, 5),
+                                 clustered_histograms(rng, 1, 3)])
+    labels = [1] * 10 + [2] * 3
+    matcher = LBPHMatcher(histograms, labels, threshold=80.0)
+    
+    pruned = prune_gallery(matcher, 4)
+    assert sorted(pruned.labels.tolist()) == [1] * 4 + [2] * 3
+    assert pruned.threshold == 80.0
+    # Kept rows are copies of gallery rows, not averages
+    assert all(any(np.array_equal(row, original) for original in histograms)
+               for row in pruned.histograms)
+
+
+def test_prune_without_work_returns_the_same_matcher():
+    rng = np.random.default_rng(1)
+    matcher = LBPHMatcher(clustered_histograms(rng, 1, 3), [1, 1, 1])
+    
+    assert prune_gallery(matcher, 0) is matcher
+    assert prune_gallery(matcher, 3) is matcher
+
+
+def test_selection_covers_every_cluster():
+    rng = np.random.default_rng(2)
+    histograms = clustered_histograms(rng, 3, 6)
+    
+    picked = farthest_point_selection(histograms, 3)
+    assert sorted(index // 6 for index in picked) == [0, 1, 2]
@@ -0,0 +1,77 @@
+"""
+Tests for the adaptive performance governor.
+"""
+
+import pytest
+from src import governor
+from src.detection import FaceDetector
+from src.governor import PerformanceGovernor
+
+
+class Clock:
+    """Fake perf_counter advanced by hand."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(governor.time, 'perf_counter', clock)
+    return clock
+
+
+def make_governor(interval=2, scale=0.5, scale_factor=1.2):
+    detector = FaceDetector(scale=scale, scale_factor=scale_factor)
+    return PerformanceGovernor(detector, interval, target_fps=10, window=2,
+                               interval_range=(1, 4), scale_range=(0.3, 0.7),
+                               scale_factor_range=(1.1, 1.3))
+
+
+def run(gov, clock, latency, windows=1):
+    """Process whole measurement windows of frames taking latency seconds."""
+    for _ in range(windows * gov.window):
+        gov.frame_started()
+        clock.now += latency
+        gov.frame_finished()
+
+
+def test_slow_frames_step_down_in_order_and_stop_at_the_bounds(clock):
+    gov = make_governor()
+    
+    run(gov, clock, 0.2, windows=20)
+    assert gov.settings() == {'detection_interval': 4, 'detection_scale': 0.3,
+                              'scale_factor': 1.3}
+    assert [a['setting'] for a in gov.adjustments] == \
+        ['detection_interval'] * 2 + ['detection_scale'] * 2 + ['scale_factor'] * 2
+
+
+def test_fast_frames_step_up_in_order_and_stop_at_the_bounds(clock):
+    gov = make_governor()
+    
+    run(gov, clock, 0.01, windows=20)
+    assert gov.settings() == {'detection_interval': 1, 'detection_scale': 0.7,
+                              'scale_factor': 1.1}
+    assert [a['setting'] for a in gov.adjustments] == \
+        ['scale_factor'] * 2 + ['detection_scale'] * 2 + ['detection_interval']
+
+
+def test_frames_within_budget_change_nothing(clock):
+    gov = make_governor()
+    
+    run(gov, clock, 0.07, windows=5)
+    assert gov.adjustments == []
+
+
+def test_opposite_direction_retraces_the_last_step(clock):
+    gov = make_governor()
+    run(gov, clock, 0.2, windows=1)
+    assert gov.settings()['detection_interval'] == 3
+    
+    run(gov, clock, 0.01, windows=1)
+    assert gov.settings() == {'detection_interval': 2, 'detection_scale': 0.5,
+                              'scale_factor': 1.2}
@@ -0,0 +1,72 @@
+"""
+Tests for the packed training image store.
+"""
+
+import numpy as np
+import pytest
+from src.image_store import pack_sample_count, read_pack, read_pack_header, write_pack
+
+
+def crops(count, seed, shape=(40, 30)):
+    """Random grayscale face crops."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def assert_faces(pack, expected):
+    """Check a pack holds exactly the expected crops, in order."""
+    assert pack.count == len(pack.faces) == len(expected)
+    assert all(np.array_equal(face, crop) for face, crop in zip(pack.faces, expected))
+
+
+def test_append_keeps_earlier_samples(tmp_path):
+    path = str(tmp_path / '101.1.pack')
+    first, second = crops(3, 0), crops(2, 1, (20, 25))
+    
+    assert write_pack(path, first, 101, 1, '101', 'Asha') == 3
+    assert write_pack(path, second, 101, 1, '101', 'Asha') == 5
+    
+    assert_faces(read_pack(path), first + second)
+    tail = read_pack(path, start=3)
+    assert tail.count == 5
+    assert all(np.array_equal(face, crop) for face, crop in zip(tail.faces, second))
+    assert read_pack_header(path).name == 'Asha'
+
+
+def test_torn_append_falls_back_to_previous_footer(tmp_path):
+    path = str(tmp_path / '101.1.pack')
+    first = crops(3, 0)
+    write_pack(path, first, 101, 1, '101', 'Asha')
+    
+    # Samples and part of an index written, the footer never made it
+    with open(path, 'ab') as f:
+        f.write(crops(1, 2)[0].tobytes() + b'FPAK' + bytes(11))
+    
+    assert pack_sample_count(path) == 3
+    assert_faces(read_pack(path), first)
+    
+    # The next append replaces the torn tail
+    second = crops(2, 3)
+    assert write_pack(path, second, 101, 1, '101', 'Asha') == 5
+    assert_faces(read_pack(path), first + second)
+
+
+def test_torn_footer_falls_back_to_previous_footer(tmp_path):
+    path = tmp_path / '101.1.pack'
+    first = crops(2, 0)
+    write_pack(str(path), first, 101, 1, '101', 'Asha')
+    write_pack(str(path), crops(2, 1), 101, 1, '101', 'Asha')
+    
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    assert_faces(read_pack(str(path)), first)
+
+
+def test_file_without_footer_is_rejected(tmp_path):
+    path = tmp_path / 'broken.pack'
+    path.write_bytes(b'not a pack file')
+    
+    with pytest.raises(ValueError):
+        read_pack(str(path))
+    with pytest.raises(ValueError):
+        pack_sample_count(str(path))
@@ -0,0 +1,50 @@
+"""
+Tests for the staged frame processing pipeline queues.
+"""
+
+import pytest
+from src.pipeline import DROP_NEWEST, DROP_OLDEST, StageQueue
+
+
+def fill(queue, items):
+    """Put items and return which were queued."""
+    return [queue.put(item) for item in items]
+
+
+def drain(queue):
+    """Take every queued item."""
+    items = []
+    while queue.items:
+        items.append(queue.get(0)[1])
+    return items
+
+
+def test_drop_oldest_keeps_the_latest_items():
+    queue = StageQueue(2, DROP_OLDEST)
+    
+    assert fill(queue, [1, 2, 3, 4]) == [True] * 4
+    assert drain(queue) == [3, 4]
+    assert queue.stats() == {'depth': 0, 'max_depth': 2, 'enqueued': 4, 'dropped': 2}
+
+
+def test_drop_newest_keeps_the_queued_items():
+    queue = StageQueue(2, DROP_NEWEST)
+    
+    assert fill(queue, [1, 2, 3, 4]) == [True, True, False, False]
+    assert drain(queue) == [1, 2]
+    assert queue.stats() == {'depth': 0, 'max_depth': 2, 'enqueued': 2, 'dropped': 2}
+
+
+def test_closed_queue_refuses_items_and_ends_consumers():
+    queue = StageQueue(2)
+    queue.put(1)
+    queue.close()
+    
+    assert not queue.put(2)
+    assert queue.get() == (True, 1)
+    assert queue.get() == (False, None)
+
+
+def test_unknown_drop_policy_is_rejected():
+    with pytest.raises(ValueError):
+        StageQueue(2, 'drop_random')
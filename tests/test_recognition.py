@@ -0,0 +1,84 @@
+"""
+Parity tests of the NumPy LBPH matcher against OpenCV's recognizer.
+"""
+
+import cv2
+import numpy as np
+import pytest
+from src.recognition import LBPHMatcher
+
+
+def textures(count, seed, size=48):
+    """Smooth random textures, one per label."""
+    rng = np.random.default_rng(seed)
+    return [
+        cv2.GaussianBlur(rng.integers(0, 256, (size, size), dtype=np.uint8), (0, 0), 3)
+        for _ in range(count)
+    ]
+
+
+def noisy(base, rng):
+    """Variant of a texture with a little pixel noise."""
+    noise = rng.integers(-6, 7, base.shape)
+    return np.clip(base.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def gallery():
+    """Trained recognizer with 3 labels of 4 samples and 8 query faces."""
+    rng = np.random.default_rng(0)
+    bases = textures(3, 1)
+    faces, labels = [], []
+    for label, base in enumerate(bases, start=1):
+        for _ in range(4):
+            faces.append(noisy(base, rng))
+            labels.append(label)
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(faces, np.array(labels))
+    queries = [noisy(base, rng) for base in bases] + textures(5, 2)
+    return recognizer, queries
+
+
+def assert_same_predictions(recognizer, matcher, queries):
+    expected = [recognizer.predict(face) for face in queries]
+    actual = matcher.predict_batch(queries)
+    assert [label for label, _ in actual] == [label for label, _ in expected]
+    assert [dist for _, dist in actual] == pytest.approx([dist for _, dist in expected], rel=1e-4)
+
+
+def test_matches_opencv_predict(gallery):
+    recognizer, queries = gallery
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    
+    assert_same_predictions(recognizer, matcher, queries)
+    assert [matcher.predict(face) for face in queries] == matcher.predict_batch(queries)
+
+
+def test_matches_opencv_threshold(gallery):
+    recognizer, queries = gallery
+    # Between the distances of the noisy variants and the unrelated textures
+    distances = sorted(recognizer.predict(face)[1] for face in queries)
+    recognizer.setThreshold((distances[2] + distances[3]) / 2)
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    
+    results = matcher.predict_batch(queries)
+    assert [label for label, _ in results].count(-1) == 5
+    assert_same_predictions(recognizer, matcher, queries)
+
+
+def test_matches_opencv_on_empty_histograms(gallery):
+    recognizer, queries = gallery
+    # Faces smaller than the 8x8 grid have empty cells, every bin is NaN
+    tiny = [np.full((5, 5), 128, dtype=np.uint8), np.zeros((7, 30), dtype=np.uint8)]
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    assert_same_predictions(recognizer, matcher, tiny)
+    
+    # An empty histogram in the gallery matches every query at distance 0
+    recognizer.update([tiny[0]], np.array([9]))
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    assert_same_predictions(recognizer, matcher, queries + tiny)
+
+
+def test_empty_gallery_reports_unknown():
+    matcher = LBPHMatcher(np.empty((0, 8 * 8 * 256), dtype=np.float32), [])
+    assert matcher.predict(textures(1, 3)[0]) == (-1, float(np.finfo(np.float64).max))
@@ -0,0 +1,127 @@
+"""
+Tests for the student registry and its sidecar.
+"""
+
+import multiprocessing
+import os
+import pytest
+from config.config import STUDENT_DETAILS_COLUMNS
+from src.registry import StudentRegistry, registry_file
+from src.utils import count_csv_entries, get_next_serial_number
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Student details CSV path inside an existing directory."""
+    return str(tmp_path / 'StudentDetails' / 'StudentDetails.csv')
+
+
+def register(path, first, count):
+    """Register students one by one, as separate enrollments would."""
+    registry = StudentRegistry(path)
+    for i in range(first, first + count):
+        registry.append([[i, '', str(i), '', f"Student {i}"]])
+
+
+def touch_later(path):
+    """Move a file's modification time forward, as a later edit would."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_empty_registry(csv_path):
+    registry = StudentRegistry(csv_path)
+    
+    assert registry.count() == 0
+    assert registry.next_serial() == 1
+    assert registry.get('101') is None
+    assert count_csv_entries(csv_path) == 0
+
+
+def test_append_updates_count_serial_and_lookup(csv_path):
+    registry = StudentRegistry(csv_path)
+    registry.append([[1, '', '101', '', 'Asha'], [2, '', '102', '', 'Ben']])
+    registry.append([[3, '', '101', '', 'Asha K']])
+    
+    reopened = StudentRegistry(csv_path)
+    assert reopened.count() == 3
+    assert reopened.next_serial() == 4
+    assert reopened.get('101').name == 'Asha K'
+    assert '102' in reopened and '999' not in reopened
+    with open(csv_path) as f:
+        assert f.readline().rstrip('\r\n').split(',') == STUDENT_DETAILS_COLUMNS
+
+
+def test_missing_serials_are_allocated_on_append(csv_path):
+    registry = StudentRegistry(csv_path)
+    registry.append([[7, '', '107', '', 'Asha']])
+    
+    written = registry.append([[None, '', '108', '', 'Ben'], [None, '', '109', '', 'Chen']])
+    assert [row[0] for row in written] == [8, 9]
+    assert StudentRegistry(csv_path).get('109').serial == 9
+    assert registry.next_serial() == 10
+
+
+def test_stale_sidecar_is_rebuilt_after_hand_edit(csv_path):
+    register(csv_path, 1, 3)
+    with open(csv_path, 'a', newline='') as f:
+        f.write('9,,109,,Added By Hand\r\n')
+    
+    registry = StudentRegistry(csv_path)
+    assert registry.count() == 4
+    assert registry.next_serial() == 10
+    assert registry.get('109').name == 'Added By Hand'
+
+
+def test_edit_keeping_the_size_is_detected(csv_path):
+    register(csv_path, 1, 2)
+    with open(csv_path) as f:
+        content = f.read()
+    with open(csv_path, 'w', newline='') as f:
+        f.write(content.replace('Student 2', 'Student X'))
+    touch_later(csv_path)
+    
+    assert StudentRegistry(csv_path).get('2').name == 'Student X'
+
+
+def test_highest_serial_wins_over_row_count(csv_path):
+    os.makedirs(os.path.dirname(csv_path))
+    with open(csv_path, 'w', newline='') as f:
+        f.write('SERIAL NO.,,ID,,NAME\r\n1,,101,,A\r\n\r\n7,,102,,B\r\n\r\n3,,103,,C\r\n')
+    
+    registry = StudentRegistry(csv_path)
+    assert registry.count() == 3
+    assert registry.next_serial() == 8
+    assert get_next_serial_number(csv_path) == 8
+    assert count_csv_entries(csv_path) == 3
+
+
+def test_corrupt_sidecar_is_rebuilt(csv_path):
+    register(csv_path, 1, 3)
+    registry_file(csv_path).write_bytes(b'garbage')
+    
+    registry = StudentRegistry(csv_path)
+    assert registry.count() == 3
+    assert registry.get('3').serial == 3
+
+
+def test_processes_appending_together_keep_the_sidecar_in_step(csv_path):
+    processes = [
+        multiprocessing.Process(target=register, args=(csv_path, k * 100, 25))
+        for k in range(1, 5)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    
+    # The sidecar is trusted as is, it must match a fresh scan of the CSV
+    registry = StudentRegistry(csv_path)
+    assert (registry.count(), registry.next_serial()) == (100, 425)
+    assert all(registry.get(str(i)).name == f"Student {i}"
+               for k in range(1, 5) for i in range(k * 100, k * 100 + 25))
+    
+    registry_file(csv_path).unlink()
+    scanned = StudentRegistry(csv_path)
+    assert (scanned.count(), scanned.next_serial()) == (100, 425)
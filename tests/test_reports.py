@@ -0,0 +1,155 @@
+"""
+Tests for the attendance report cache.
+"""
+
+import pytest
+from conftest import attendance_row
+from config.config import ATTENDANCE_COLUMNS
+from src import reports
+from src.attendance_log import attendance_file
+from src.reports import AttendanceCache, month_range
+from src.storage import CSVStorage, SQLiteStorage
+
+STUDENTS = [[1, '', '101', '', 'Asha'], [2, '', '102', '', 'Ben'], [3, '', '103', '', 'Chen']]
+
+
+@pytest.fixture
+def storage(tmp_path, attendance_dir):
+    """CSV backend with three registered students."""
+    storage = CSVStorage(str(tmp_path / 'StudentDetails.csv'), attendance_dir, durable=False)
+    storage.add_students(STUDENTS)
+    return storage
+
+
+def mark(storage, date, *student_ids):
+    """Mark students present on a day."""
+    storage.add_attendance(date, [attendance_row(s, date) for s in student_ids])
+
+
+def attendance_of(cache, start='01-09-2025', end='30-09-2025'):
+    """Days present per student ID."""
+    return {student_id: days for student_id, _, days, _ in cache.student_summary(start, end)[1]}
+
+
+def test_refresh_builds_bitmap(tmp_path, storage):
+    mark(storage, '01-09-2025', 101, 102)
+    mark(storage, '02-09-2025', 101)
+    cache = AttendanceCache(storage, str(tmp_path / 'cache.npz'))
+    
+    assert cache.refresh() == 2
+    assert attendance_of(cache) == {'101': 2, '102': 1, '103': 0}
+    assert cache.head_counts('01-09-2025', '30-09-2025') == [('01-09-2025', 2),
+                                                              ('02-09-2025', 1)]
+
+
+def test_refresh_reads_only_new_marks_and_days(tmp_path, storage):
+    mark(storage, '01-09-2025', 101)
+    path = str(tmp_path / 'cache.npz')
+    AttendanceCache(storage, path).refresh()
+    
+    # A new session loads the saved cache and picks up what was added since
+    cache = AttendanceCache(storage, path)
+    assert cache.refresh() == 0
+    mark(storage, '01-09-2025', 103)
+    mark(storage, '03-09-2025', 102)
+    assert cache.refresh() == 2
+    assert attendance_of(cache) == {'101': 1, '102': 1, '103': 1}
+    assert list(cache.offsets) == [
+        attendance_file(date, storage.attendance_dir).stat().st_size
+        for date in ('01-09-2025', '03-09-2025')
+    ]
+
+
+def test_earlier_day_added_later_keeps_days_sorted(tmp_path, storage):
+    mark(storage, '05-09-2025', 101)
+    cache = AttendanceCache(storage, str(tmp_path / 'cache.npz'))
+    cache.refresh()
+    mark(storage, '02-09-2025', 102)
+    cache.refresh()
+    
+    assert [date for date, _ in cache.head_counts('01-09-2025', '30-09-2025')] == \
+        ['02-09-2025', '05-09-2025']
+    assert attendance_of(cache, '01-09-2025', '03-09-2025') == {'101': 0, '102': 1, '103': 0}
+
+
+def test_rewritten_day_is_read_again(tmp_path, storage):
+    mark(storage, '01-09-2025', 101, 102)
+    cache = AttendanceCache(storage, str(tmp_path / 'cache.npz'))
+    cache.refresh()
+    
+    path = attendance_file('01-09-2025', storage.attendance_dir)
+    path.write_text(','.join(ATTENDANCE_COLUMNS) + '\n' +
+                    ','.join(attendance_row(103, '01-09-2025')) + '\n')
+    assert cache.refresh() == 1
+    assert attendance_of(cache) == {'101': 0, '102': 0, '103': 1}
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path, storage):
+    mark(storage, '01-09-2025', 101)
+    path = tmp_path / 'cache.npz'
+    path.write_bytes(b'PK\x03\x04garbage')
+    
+    cache = AttendanceCache(storage, str(path))
+    assert len(cache.days) == 0
+    assert cache.refresh() == 1
+    assert attendance_of(AttendanceCache(storage, str(path))) == {'101': 1, '102': 0, '103': 0}
+
+
+def test_sqlite_backend_refresh(tmp_path):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        database.add_students(STUDENTS)
+        mark(database, '01-09-2025', 101)
+        cache = AttendanceCache(database, str(tmp_path / 'cache.npz'))
+        assert cache.refresh() == 1
+        assert cache.refresh() == 0
+        
+        mark(database, '01-09-2025', 102)
+        mark(database, '02-09-2025', 101)
+        assert cache.refresh() == 2
+        assert attendance_of(cache) == {'101': 2, '102': 1, '103': 0}
+
+
+def test_sqlite_earlier_day_added_later_is_read(tmp_path):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        database.add_students(STUDENTS)
+        mark(database, '05-09-2025', 101)
+        path = str(tmp_path / 'cache.npz')
+        AttendanceCache(database, path).refresh()
+        
+        cache = AttendanceCache(database, path)
+        mark(database, '02-09-2025', 102)
+        assert cache.refresh() == 1
+        assert cache.head_counts('01-09-2025', '30-09-2025') == [('02-09-2025', 1),
+                                                                  ('05-09-2025', 1)]
+        assert cache.refresh() == 0
+
+
+def test_cache_closes_only_storage_it_opened(tmp_path, storage, monkeypatch):
+    closed = []
+    storage.close = lambda: closed.append(storage)
+    with AttendanceCache(storage, str(tmp_path / 'cache.npz')):
+        pass
+    assert closed == []
+    
+    monkeypatch.setattr(reports, 'open_storage', lambda: storage)
+    with AttendanceCache(path=str(tmp_path / 'cache.npz')):
+        pass
+    assert closed == [storage]
+
+
+def test_defaulters_are_below_threshold_lowest_first(tmp_path, storage):
+    for day in range(1, 5):
+        date = f"{day:02d}-09-2025"
+        mark(storage, date, *([101, 102] if day > 1 else [101, 103]))
+    cache = AttendanceCache(storage, str(tmp_path / 'cache.npz'))
+    cache.refresh()
+    
+    assert [(s, p) for s, _, _, p in cache.defaulters('01-09-2025', '30-09-2025', 80.0)] == \
+        [('103', 25.0), ('102', 75.0)]
+
+
+def test_month_range():
+    assert month_range('2', '2024') == ('01-02-2024', '29-02-2024')
+    assert month_range('12', '2025') == ('01-12-2025', '31-12-2025')
+    with pytest.raises(ValueError):
+        month_range('13', '2025')
@@ -0,0 +1,93 @@
+"""
+Tests for the CSV and SQLite storage backends.
+"""
+
+import pytest
+from conftest import attendance_row
+from src.storage import CSVStorage, SQLiteStorage, Storage
+
+STUDENTS = [[1, '', '101', '', 'Asha'], [2, '', '102', '', 'Ben'], [5, '', '105', '', 'Chen']]
+
+
+@pytest.fixture
+def csv_storage(tmp_path, attendance_dir):
+    """CSV backend with three students and two days of attendance."""
+    storage = CSVStorage(str(tmp_path / 'StudentDetails.csv'), attendance_dir, durable=False)
+    storage.add_students(STUDENTS)
+    storage.add_attendance('01-09-2025', [attendance_row(101, '01-09-2025'),
+                                          attendance_row(102, '01-09-2025')])
+    storage.add_attendance('02-09-2025', [attendance_row(105, '02-09-2025', '10:30:00')])
+    return storage
+
+
+def test_backend_missing_a_method_fails_on_construction():
+    class Incomplete(Storage):
+        def add_students(self, rows):
+            pass
+    
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_import_copies_students_and_attendance(tmp_path, csv_storage):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        assert database.import_csv(csv_storage.students_csv,
+                                   csv_storage.attendance_dir) == (3, 3)
+        
+        assert database.student_count() == 3
+        assert database.next_serial() == 6
+        assert database.load_students().get(105).name == 'Chen'
+        assert database.attendance_between('01-09-2025', '02-09-2025') == \
+            csv_storage.attendance_between('01-09-2025', '02-09-2025')
+        assert database.attendance_between('01-09-2025', '30-09-2025', '105') == \
+            [('105', 'Student 105', '02-09-2025', '10:30:00')]
+
+
+def test_import_again_adds_nothing(tmp_path, csv_storage):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        database.import_csv(csv_storage.students_csv, csv_storage.attendance_dir)
+        assert database.import_csv(csv_storage.students_csv,
+                                   csv_storage.attendance_dir) == (3, 0)
+        assert len(database.attendance_between('01-09-2025', '02-09-2025')) == 3
+
+
+def test_import_skips_files_that_are_not_days(tmp_path, csv_storage):
+    (tmp_path / 'Attendance' / 'Attendance_backup.csv').write_text('Id,,Name\n9,,X\n')
+    
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        assert database.import_csv(csv_storage.students_csv,
+                                   csv_storage.attendance_dir) == (3, 3)
+
+
+def test_import_in_small_batches(tmp_path, csv_storage):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        assert database.import_csv(csv_storage.students_csv, csv_storage.attendance_dir,
+                                   batch_size=1) == (3, 3)
+
+
+def test_sqlite_marks_a_student_once_per_day(tmp_path):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        first = database.add_attendance('01-09-2025', [attendance_row(101)])
+        again = database.add_attendance('01-09-2025', [attendance_row(101, time='11:00:00')])
+        
+        assert first == [attendance_row(101)]
+        assert again == []
+        assert database.is_marked(101, '01-09-2025')
+        assert not database.is_marked(101, '02-09-2025')
+
+
+def test_sqlite_allocates_missing_serials(tmp_path):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        database.add_students(STUDENTS)
+        written = database.add_students([[None, '', '106', '', 'Dana'],
+                                          [None, '', '107', '', 'Eli']])
+        
+        assert [row[0] for row in written] == [6, 7]
+        assert database.load_students().get(107).serial == 7
+        assert database.next_serial() == 8
+
+
+def test_sqlite_without_students_raises_like_csv(tmp_path):
+    with SQLiteStorage(str(tmp_path / 'attendance.db'), durable=False) as database:
+        with pytest.raises(FileNotFoundError):
+            database.load_students()
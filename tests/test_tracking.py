@@ -0,0 +1,82 @@
+"""
+Tests for face tracking and per-track recognition voting.
+"""
+
+import numpy as np
+from config.config import RECOGNITION_MAX_PREDICTIONS, RECOGNITION_VOTES
+from src.tracking import FaceTrack, FaceTracker, box_iou
+
+
+def frame_with_face(x, y, size=240):
+    """Gray frame with a textured 60x60 'face' pasted at (x, y)."""
+    rng = np.random.default_rng(0)
+    frame = np.full((size, size), 100, dtype=np.uint8)
+    frame[y:y + 60, x:x + 60] = rng.integers(0, 256, (60, 60), dtype=np.uint8)
+    return frame
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == 50 / 150
+    assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+
+
+def test_overlapping_detection_continues_the_track():
+    tracker = FaceTracker()
+    first = tracker.update(frame_with_face(50, 50), [(50, 50, 60, 60)])[0]
+    first.label = 7
+    
+    tracks = tracker.update(frame_with_face(55, 52), [(55, 52, 60, 60), (150, 150, 60, 60)])
+    assert tracks[0] is first and first.label == 7 and first.box == (55, 52, 60, 60)
+    assert tracks[1].track_id == 2 and tracks[1].label is None
+    assert tracker.track_count == 2
+
+
+def test_follow_moves_the_track_with_the_face():
+    tracker = FaceTracker()
+    track = tracker.update(frame_with_face(50, 50), [(50, 50, 60, 60)])[0]
+    
+    assert tracker.follow(frame_with_face(58, 46))
+    x, y, _, _ = track.box
+    assert abs(x - 58) <= 2 and abs(y - 46) <= 2
+
+
+def test_track_is_lost_when_the_face_leaves():
+    tracker = FaceTracker()
+    tracker.update(frame_with_face(50, 50), [(50, 50, 60, 60)])
+    
+    assert not tracker.follow(np.full((240, 240), 100, dtype=np.uint8))
+    assert tracker.tracks == []
+
+
+def test_identity_settles_after_enough_agreeing_votes():
+    track = FaceTrack(1, (0, 0, 10, 10))
+    results = [track.add_vote(4, 40.0) for _ in range(RECOGNITION_VOTES - 1)]
+    assert results == [None] * (RECOGNITION_VOTES - 1)
+    assert track.add_vote(4, 42.0) == 4
+
+
+def test_disagreeing_vote_delays_the_identity():
+    track = FaceTrack(1, (0, 0, 10, 10))
+    labels = [4, 5] + [4] * (RECOGNITION_VOTES - 1)
+    results = [track.add_vote(label, 40.0) for label in labels]
+    
+    # The wrong vote does not count towards label 4
+    assert results == [None] * (len(labels) - 1) + [4]
+    assert track.predictions == len(labels)
+
+
+def test_identity_needs_more_votes_than_other_labels():
+    track = FaceTrack(1, (0, 0, 10, 10))
+    # Label 4 reaches two votes, but labels 5 and 6 have as many together
+    votes = [track.add_vote(label, 40.0, votes_needed=2) for label in (4, 5, 6, 4, 4)]
+    assert votes == [None, None, None, None, 4]
+
+
+def test_unknown_track_stops_asking_after_the_cap():
+    track = FaceTrack(1, (0, 0, 10, 10))
+    for _ in range(RECOGNITION_MAX_PREDICTIONS):
+        assert track.needs_prediction
+        assert track.add_vote(None, 0.0) is None
+    assert not track.needs_prediction
+    assert not track.identified
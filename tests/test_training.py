@@ -0,0 +1,68 @@
+"""
+Tests for incremental training from the training manifest.
+"""
+
+import numpy as np
+import pytest
+from src import training
+from src.image_store import write_pack
+from src.training import FaceTrainer, load_training_manifest
+
+
+def crops(count, seed, shape=(40, 40)):
+    """Random grayscale face crops."""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+@pytest.fixture(params=['binary', 'yaml'])
+def model_dir(request, tmp_path, monkeypatch):
+    """Training images and model files in a temporary directory."""
+    images = tmp_path / 'TrainingImage'
+    labels = tmp_path / 'TrainingImageLabel'
+    images.mkdir()
+    labels.mkdir()
+    monkeypatch.setattr(training, 'MODEL_FORMAT', request.param)
+    monkeypatch.setattr(training, 'TRAINING_IMAGE_DIR', images)
+    monkeypatch.setattr(training, 'TRAINING_LABEL_DIR', labels)
+    monkeypatch.setattr(training, 'TRAINER_FILE', labels / 'Trainner.yml')
+    monkeypatch.setattr(training, 'TRAINER_BINARY_FILE', labels / 'Trainner.npz')
+    monkeypatch.setattr(training, 'TRAINING_MANIFEST_FILE', labels / 'manifest.json')
+    return images
+
+
+def model_labels():
+    """Labels of the saved model, one per sample."""
+    trainer = FaceTrainer(use_gallery=False, max_per_label=0)
+    if training.MODEL_FORMAT == 'binary':
+        return sorted(training.load_model(str(training.TRAINER_BINARY_FILE)).labels.tolist())
+    trainer.recognizer.read(str(training.TRAINER_FILE))
+    return sorted(np.asarray(trainer.recognizer.getLabels()).ravel().tolist())
+
+
+def test_update_adds_only_new_samples(model_dir):
+    write_pack(str(model_dir / '101.1.pack'), crops(3, 0), 101, 1, '101', 'Asha')
+    assert FaceTrainer(use_gallery=False, max_per_label=0).train_model()[0]
+    assert load_training_manifest() == {'101.1.pack': 3}
+    
+    # Two more samples of one student and a new student
+    write_pack(str(model_dir / '101.1.pack'), crops(2, 1), 101, 1, '101', 'Asha')
+    write_pack(str(model_dir / '102.2.pack'), crops(2, 2), 102, 2, '102', 'Ben')
+    trainer = FaceTrainer(use_gallery=False, max_per_label=0)
+    success, _, registrations = trainer.train_model()
+    
+    assert success and registrations == 2
+    assert trainer.load_stats['faces'] == 4
+    assert model_labels() == [101] * 5 + [102] * 2
+    assert load_training_manifest() == {'101.1.pack': 5, '102.2.pack': 2}
+
+
+def test_update_without_new_samples_keeps_the_model(model_dir):
+    write_pack(str(model_dir / '101.1.pack'), crops(3, 0), 101, 1, '101', 'Asha')
+    FaceTrainer(use_gallery=False, max_per_label=0).train_model()
+    
+    success, message, registrations = FaceTrainer(use_gallery=False,
+                                                  max_per_label=0).train_model()
+    assert success and registrations == 1
+    assert message == "Profile already up to date!"
+    assert model_labels() == [101] * 3
@@ -0,0 +1,54 @@
+"""
+Tests for offline attendance processing of recorded videos.
+"""
+
+import cv2
+import numpy as np
+import pytest
+from config.config import CONFIDENCE_THRESHOLD
+from src import video_batch
+
+
+class OneFaceDetector:
+    """Detector that finds the same face in every frame."""
+    
+    def detect(self, gray):
+        return np.array([[0, 0, 16, 16]], dtype=np.int32)
+
+
+class ScriptedMatcher:
+    """Matcher returning one prediction per frame from a script."""
+    
+    def __init__(self, predictions):
+        self.predictions = iter(predictions)
+    
+    def predict_batch(self, crops):
+        return [next(self.predictions) for _ in crops]
+
+
+@pytest.fixture
+def video(tmp_path):
+    """Short grayscale-friendly video of 8 frames."""
+    path = str(tmp_path / 'lecture.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (32, 32))
+    for i in range(8):
+        writer.write(np.full((32, 32, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def run_chunk(monkeypatch, video, predictions):
+    monkeypatch.setitem(video_batch._worker, 'detector', OneFaceDetector())
+    monkeypatch.setitem(video_batch._worker, 'matcher', ScriptedMatcher(predictions))
+    return video_batch._process_chunk(video, 0, None, 1)
+
+
+def test_student_needs_enough_votes_in_chunk(monkeypatch, video):
+    good, bad = CONFIDENCE_THRESHOLD - 10, CONFIDENCE_THRESHOLD + 10
+    # Student 7 is seen in one frame only, student 3 from frame 1 on
+    script = [(7, good), (3, good), (3, bad), (3, good)] + [(3, good)] * 4
+    
+    first_seen, processed = run_chunk(monkeypatch, video, script)
+    assert processed == 8
+    assert 7 not in first_seen
+    assert first_seen[3] == (1, good)